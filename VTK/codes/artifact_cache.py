@@ -0,0 +1,172 @@
+import os
+import json
+import hashlib
+import inspect
+import numpy as np
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def bytes_hash(data):
+    """sha256 of contents already read, equal to file_hash() of their file."""
+    return hashlib.sha256(data).hexdigest()
+
+def files_hash(paths, contents=None):
+    """
+    sha256 over the names and contents of several files (e.g. a .pth folder).
+    contents: optional {path: bytes} already read; other files are read here.
+    """
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(os.path.basename(path).encode())
+        data = contents.get(path) if contents else None
+        h.update((file_hash(path) if data is None else bytes_hash(data)).encode())
+    return h.hexdigest()
+
+def _param_repr(value):
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return repr(value)
+
+def resolve_params(func, overrides=None, skip=("points", "polydata")):
+    """
+    Keyword parameters of func with defaults filled in, so an explicit default
+    and an omitted one give the same cache key.
+    """
+    params = {
+        name: p.default
+        for name, p in inspect.signature(func).parameters.items()
+        if name not in skip and p.default is not inspect.Parameter.empty
+    }
+    params.update(overrides or {})
+    return params
+
+def _numbers_as_float(value):
+    """value with every int and NumPy number made a float, so dz=1 and dz=1.0 key the same."""
+    if isinstance(value, dict):
+        return {k: _numbers_as_float(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_numbers_as_float(v) for v in value]
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_)):
+        return float(value)
+    return value
+
+def make_key(*parts):
+    """Stable hex key from strings, numbers and parameter dicts (numbers compared as floats)."""
+    blob = json.dumps(_numbers_as_float(parts), sort_keys=True, default=_param_repr)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+# Per cache folder written by this process: [size at the last listing plus
+# this process's writes since, bytes written since that listing], so a put
+# does not have to list the whole folder
+_folder_sizes = {}
+
+class ArtifactCache:
+    """
+    Content-addressed on-disk store of NumPy arrays, one .npz per key, with
+    least-recently-used eviction once the folder grows beyond max_bytes.
+    Eviction then drops entries down to low_water * max_bytes, so the folder
+    is only listed once per that much written rather than on every put.
+    Safe to share between worker processes: writes are atomic renames. Each
+    process counts its own writes and lists the folder again (evicting if it
+    is over max_bytes) once its count passes max_bytes or it has written
+    (1 - low_water) * max_bytes since its last listing, so N processes
+    overshoot by at most about N times that.
+    """
+    def __init__(self, root, max_bytes=10 * 1024 ** 3, low_water=0.9):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".npz")
+
+    def get(self, key):
+        """Return the stored dict of arrays, or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            # mtime doubles as the last access time for LRU eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return arrays
+
+    def put(self, key, **arrays):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        # Sized before the rename: another process may evict the file right after it
+        size = os.stat(tmp).st_size
+        try:
+            replaced = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, path)
+        self._grow(size - replaced)
+
+    def _grow(self, nbytes):
+        """
+        Add nbytes to the running folder size. List the folder again once the
+        count passes max_bytes or enough was written since the last listing
+        (other processes write too), evicting if the listing is over max_bytes.
+        """
+        root = os.path.abspath(self.root)
+        if root not in _folder_sizes:
+            # First write of this process: one listing, which already includes the new file
+            _folder_sizes[root] = [sum(size for _, size, _ in self.entries()), 0]
+        else:
+            _folder_sizes[root][0] += nbytes
+            _folder_sizes[root][1] += nbytes
+        size, written = _folder_sizes[root]
+        if size > self.max_bytes or written > (1 - self.low_water) * self.max_bytes:
+            size = sum(size for _, size, _ in self.entries())
+            if size > self.max_bytes:
+                size = self.evict(self.low_water * self.max_bytes)
+            _folder_sizes[root] = [size, 0]
+
+    def entries(self):
+        """(mtime, size, path) of every cached file."""
+        out = []
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(".npz"):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    out.append((st.st_mtime, st.st_size, entry.path))
+        return out
+
+    def evict(self, target_bytes=None):
+        """
+        Drop least recently used entries until the cache fits in target_bytes
+        (default max_bytes). Return the size left.
+        """
+        target_bytes = self.max_bytes if target_bytes is None else target_bytes
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
@@ -0,0 +1,152 @@
+import queue
+import threading
+import numpy as np
+import vtk
+from vtk.util.numpy_support import vtk_to_numpy, numpy_to_vtk
+from make_mesh import make_polyline
+
+# name: (camera direction from the focal point, view up)
+DEFAULT_VIEWS = {
+    "axial": ((0, 0, 1), (0, 1, 0)),
+    "coronal": ((0, -1, 0), (0, 0, 1)),
+    "sagittal": ((1, 0, 0), (0, 0, 1)),
+}
+
+def write_png(pixels, out_path, compression=5):
+    """Write an (H, W, C) uint8 array, row 0 at the bottom as VTK returns it, to a PNG."""
+    height, width, components = pixels.shape
+    image = vtk.vtkImageData()
+    image.SetDimensions(width, height, 1)
+    scalars = numpy_to_vtk(pixels.reshape(-1, components), deep=True, array_type=vtk.VTK_UNSIGNED_CHAR)
+    image.GetPointData().SetScalars(scalars)
+    writer = vtk.vtkPNGWriter()
+    writer.SetCompressionLevel(compression)
+    writer.SetFileName(out_path)
+    writer.SetInputData(image)
+    writer.Write()
+    # vtkPNGWriter only logs a failed write, it does not raise
+    if writer.GetErrorCode():
+        raise OSError(f"Could not write {out_path}")
+
+class BatchRenderer:
+    """
+    Headless thumbnail renderer for many models.
+    One offscreen window, renderer, mappers and actors live for the whole
+    batch; render() only swaps the mesh and centerline data, takes one frame
+    per camera view and hands the pixels to a background thread that writes
+    the PNGs, so rendering the next model overlaps with the file I/O.
+
+    with BatchRenderer() as renderer:
+        for ...:
+            renderer.render(polydata, centerline, "out/0140_2001_centerline")
+    writes out/0140_2001_centerline_axial.png, ..._coronal.png, ..._sagittal.png.
+    views: {name: (direction, view up)}; distance: camera distance from the
+    mesh center (None fits the mesh); max_pending: frames queued for writing
+    before render() waits on the writer.
+    close() (or leaving the with block) raises OSError when any PNG could not be
+    written; the failures are in errors as (path, exception) pairs.
+    """
+    def __init__(self, size=(800, 800), views=None, distance=300.0, opacity=0.5, line_width=8, max_pending=16,
+                 compression=5):
+        self.views = DEFAULT_VIEWS if views is None else views
+        self.distance = distance
+        self.compression = compression
+
+        self.mesh_mapper = vtk.vtkPolyDataMapper()
+        self.mesh_actor = vtk.vtkActor()
+        self.mesh_actor.SetMapper(self.mesh_mapper)
+        self.mesh_actor.GetProperty().SetOpacity(opacity)
+
+        self.center_mapper = vtk.vtkPolyDataMapper()
+        self.center_actor = vtk.vtkActor()
+        self.center_actor.SetMapper(self.center_mapper)
+        self.center_actor.GetProperty().SetColor(0, 1, 0)
+        self.center_actor.GetProperty().SetLineWidth(line_width)
+
+        self.renderer = vtk.vtkRenderer()
+        self.renderer.SetBackground(1, 1, 1)
+        self.renderer.AddActor(self.mesh_actor)
+        self.renderer.AddActor(self.center_actor)
+
+        self.window = vtk.vtkRenderWindow()
+        self.window.SetOffScreenRendering(1)
+        self.window.AddRenderer(self.renderer)
+        self.window.SetSize(*size)
+
+        self.grabber = vtk.vtkWindowToImageFilter()
+        self.grabber.SetInput(self.window)
+        self.grabber.ReadFrontBufferOff()
+
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.errors = []
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def _write_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            pixels, out_path = item
+            try:
+                write_png(pixels, out_path, self.compression)
+            except Exception as e:
+                self.errors.append((out_path, e))
+                print(f"Failed to write {out_path}: {e}")
+
+    def set_camera(self, bounds, direction, view_up):
+        center = np.array([(bounds[1] + bounds[0]) / 2, (bounds[3] + bounds[2]) / 2, (bounds[5] + bounds[4]) / 2])
+        direction = np.asarray(direction, dtype=np.float64)
+        direction /= np.linalg.norm(direction)
+        self.renderer.ResetCamera(bounds)
+        camera = self.renderer.GetActiveCamera()
+        distance = self.distance if self.distance is not None else camera.GetDistance()
+        camera.SetFocalPoint(*center)
+        camera.SetPosition(*(center + distance * direction))
+        camera.SetViewUp(*view_up)
+        self.renderer.ResetCameraClippingRange()
+
+    def grab(self):
+        """Pixels of the last rendered frame as an (H, W, 3) uint8 array."""
+        self.grabber.Modified()
+        self.grabber.Update()
+        image = self.grabber.GetOutput()
+        width, height, _ = image.GetDimensions()
+        pixels = vtk_to_numpy(image.GetPointData().GetScalars())
+        return pixels.reshape(height, width, -1).copy()
+
+    def render(self, polydata, centerline, out_stem):
+        """Render every view of one model and queue <out_stem>_<view>.png for writing."""
+        self.mesh_mapper.SetInputData(polydata)
+        self.center_mapper.SetInputData(make_polyline(centerline))
+        bounds = polydata.GetBounds()
+        out_paths = []
+        for name, (direction, view_up) in self.views.items():
+            self.set_camera(bounds, direction, view_up)
+            self.window.Render()
+            out_path = f"{out_stem}_{name}.png"
+            self.pending.put((self.grab(), out_path))
+            out_paths.append(out_path)
+        return out_paths
+
+    def close(self):
+        """Wait for the queued PNGs and release the window. Raise OSError if any PNG failed."""
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+        self.window.Finalize()
+        if self.errors:
+            out_path, e = self.errors[0]
+            raise OSError(f"{len(self.errors)} thumbnails could not be written, the first {out_path}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except OSError as e:
+            # Do not hide the error that ended the batch behind the thumbnail summary
+            if exc_type is None:
+                raise
+            print(e)
\ No newline at end of file
@@ -0,0 +1,134 @@
+import os
+import zipfile
+import numpy as np
+
+CENTERLINE_FORMATS = ("npy", "csv")
+READ_HEADER = {(1, 0): np.lib.format.read_array_header_1_0, (2, 0): np.lib.format.read_array_header_2_0}
+
+def save_centerline_csv(centerline, out_path):
+    np.savetxt(out_path, centerline, delimiter=",", header="x,y,z", comments='')
+
+def save_centerline(centerline, out_path):
+    """Write an (N, 3) centerline as .npy (binary, exact) or .csv (x,y,z header), chosen by extension."""
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext == ".npy":
+        np.save(out_path, np.asarray(centerline, dtype=np.float64))
+    elif ext == ".csv":
+        save_centerline_csv(centerline, out_path)
+    else:
+        raise ValueError(f"Unsupported centerline file type: {out_path}")
+    return out_path
+
+def centerline_file(output_folder, stem, centerline_format="npy"):
+    """<output_folder>/<stem>.<npy|csv>"""
+    if centerline_format not in CENTERLINE_FORMATS:
+        raise ValueError(f"Unknown centerline format: {centerline_format}, expected one of {CENTERLINE_FORMATS}")
+    return os.path.join(output_folder, f"{stem}.{centerline_format}")
+
+def load_centerline(path, case=None, mmap=True):
+    """
+    Read a centerline written by save_centerline() or a cohort archive member.
+    .npy files are memory-mapped read-only unless mmap=False; .csv files are parsed.
+    For a .npz cohort archive pass the case name.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        return np.load(path, mmap_mode='r' if mmap else None)
+    if ext in (".csv", ".txt"):
+        return np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)  # skip header
+    if ext == ".npz":
+        if case is None:
+            raise ValueError(f"{path} is a cohort archive, pass the case to load")
+        array = open_cohort(path)[case]
+        return array if mmap else np.array(array)
+    raise ValueError(f"Unsupported centerline file type: {path}")
+
+class CohortWriter:
+    """
+    Uncompressed .npz with one (N, 3) array per case, written one case at a
+    time (np.load reads it like any .npz). Stored uncompressed so open_cohort()
+    can memory-map every member instead of reading the archive.
+    """
+    def __init__(self, out_path):
+        self.out_path = out_path
+        self.zip = zipfile.ZipFile(out_path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        self.names = set()
+
+    def add(self, name, array):
+        if name in self.names:
+            raise ValueError(f"Case {name} is already in {self.out_path}")
+        self.names.add(name)
+        with self.zip.open(f"{name}.npy", 'w', force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asanyarray(array), allow_pickle=False)
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_cohort(centerlines, out_path):
+    """Write {case: centerline} to a cohort archive."""
+    with CohortWriter(out_path) as writer:
+        for name, centerline in centerlines.items():
+            writer.add(name, centerline)
+    return out_path
+
+def _member_offset(f, info):
+    """File offset of the data of a stored zip member (after its local header)."""
+    f.seek(info.header_offset)
+    header = f.read(30)
+    if header[:4] != b"PK\x03\x04":
+        raise ValueError(f"Bad zip entry {info.filename}")
+    name_len = int.from_bytes(header[26:28], "little")
+    extra_len = int.from_bytes(header[28:30], "little")
+    return info.header_offset + 30 + name_len + extra_len
+
+def member_layout(path):
+    """
+    {member name: (offset, shape, fortran_order, dtype)} of the arrays in an
+    .npz, offset being where the data of an uncompressed member starts in the
+    file; None for members that are compressed and cannot be mapped.
+    """
+    layout = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            version = None
+            if info.compress_type == zipfile.ZIP_STORED:
+                f.seek(_member_offset(f, info))
+                version = np.lib.format.read_magic(f)
+            if version not in READ_HEADER:
+                layout[name] = None
+                continue
+            shape, fortran_order, dtype = READ_HEADER[version](f)
+            if dtype.hasobject:
+                raise ValueError(f"Case {name} in {path} holds Python objects")
+            layout[name] = (f.tell(), shape, fortran_order, dtype)
+    return layout
+
+def open_cohort(path):
+    """
+    {case: array} for a cohort archive. Uncompressed members are read-only
+    memory maps of the archive file, so opening a cohort reads only the headers;
+    compressed members (np.savez_compressed) are loaded into memory.
+    """
+    cases = {}
+    layout = member_layout(path)
+    with zipfile.ZipFile(path) as archive:
+        for name, member in layout.items():
+            if member is None:
+                filename = f"{name}.npy" if f"{name}.npy" in archive.NameToInfo else name
+                with archive.open(filename) as f:
+                    cases[name] = np.lib.format.read_array(f, allow_pickle=False)
+                continue
+            offset, shape, fortran_order, dtype = member
+            if np.prod(shape) == 0:
+                cases[name] = np.empty(shape, dtype=dtype)
+                continue
+            cases[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                                    order='F' if fortran_order else 'C')
+    return cases
\ No newline at end of file
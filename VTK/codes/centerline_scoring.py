@@ -1,3 +1,4 @@
+import itertools
 import numpy as np
 from scipy.spatial import cKDTree
 from scipy.interpolate import interp1d
@@ -11,6 +12,24 @@ def resample_line(line, num=100):
     new_dists = np.linspace(0, dists[-1], num)
     return interp(new_dists)
 
+def resample_branches(branches, num=100):
+    """
+    Every branch resampled on its own, num points in all split by branch length
+    (at least two per branch), concatenated. Unlike resample_line of the
+    concatenated branches, no points land on the jumps between them.
+    """
+    lines = [np.asarray(line, dtype=np.float64) for line in branches]
+    lengths = np.array([np.sum(np.linalg.norm(np.diff(line, axis=0), axis=1)) for line in lines])
+    if lengths.sum() == 0:
+        lengths = np.ones(len(lines))
+    share = num * lengths / lengths.sum()
+    counts = np.maximum(2, np.floor(share).astype(int))
+    # The points flooring left over go to the largest remainders
+    left = num - counts.sum()
+    if left > 0:
+        counts[np.argsort(np.floor(share) - share, kind='stable')[:left]] += 1
+    return np.concatenate([resample_line(line, n) for line, n in zip(lines, counts)])
+
 def mean_closest_distance(pred, gt):
     tree = cKDTree(gt)
     dists, _ = tree.query(pred)
@@ -39,11 +58,197 @@ def hausdorff95_distance(pred, gt):
     hd95_gt = np.percentile(dists_gt_to_pred, 95)
     return max(hd95_pred, hd95_gt)
 
+def accuracy_curve(dists, tolerances):
+    """
+    Fraction of dists <= tol for every tolerance (np.mean(dists <= tol), same
+    values). One sort, then a binary search per tolerance, so fine tolerance
+    grids cost O(log n) each instead of a pass over dists.
+    """
+    tolerances = np.asarray(tolerances, dtype=np.float64)
+    dists = np.asarray(dists).ravel()
+    if len(dists) == 0:
+        return np.full(tolerances.shape, np.nan)
+    counts = np.searchsorted(np.sort(dists), tolerances, side='right')
+    return counts / len(dists)
+
 def accuracy_over_tolerance(pred, gt, tolerances):
     tree_gt = cKDTree(gt)
     dists_pred_to_gt, _ = tree_gt.query(pred)
-    accuracies = []
-    for tol in tolerances:
-        acc = np.mean(dists_pred_to_gt <= tol)
-        accuracies.append(acc)
-    return np.array(tolerances), np.array(accuracies)
\ No newline at end of file
+    return np.array(tolerances), accuracy_curve(dists_pred_to_gt, tolerances)
+
+def directed_distances(pred, gt, workers=1):
+    """
+    Closest point distances in both directions, building each KD-tree once.
+    Return (dists_pred_to_gt, dists_gt_to_pred).
+    """
+    dists_pred_to_gt, _ = cKDTree(gt).query(pred, workers=workers)
+    dists_gt_to_pred, _ = cKDTree(pred).query(gt, workers=workers)
+    return dists_pred_to_gt, dists_gt_to_pred
+
+def scores_from_distances(dists_pred_to_gt, dists_gt_to_pred, tolerances):
+    """
+    Every metric of this module from the two directed distance vectors,
+    computed the same way as the individual functions.
+    """
+    return {
+        "mean_closest": np.mean(dists_pred_to_gt),
+        "hausdorff": max(np.max(dists_pred_to_gt), np.max(dists_gt_to_pred)),
+        "avg_symmetric": (np.mean(dists_pred_to_gt) + np.mean(dists_gt_to_pred)) / 2,
+        "hausdorff95": max(np.percentile(dists_pred_to_gt, 95), np.percentile(dists_gt_to_pred, 95)),
+        "tolerances": np.array(tolerances),
+        "accuracy": accuracy_curve(dists_pred_to_gt, tolerances),
+    }
+
+class CohortScores:
+    """
+    Running sums of the per-model scores and accuracy curves for cohort
+    averages: memory stays at one curve however many models are added.
+    """
+    METRICS = ("mean_closest", "hausdorff", "avg_symmetric", "hausdorff95")
+
+    def __init__(self, tolerances):
+        self.tolerances = np.asarray(tolerances, dtype=np.float64)
+        self.count = 0
+        self.metric_sums = np.zeros(len(self.METRICS))
+        self.curve_sum = np.zeros(len(self.tolerances))
+
+    def add(self, scores, accuracy):
+        """scores: the METRICS values in order; accuracy: the model's curve over self.tolerances."""
+        self.metric_sums += scores
+        self.curve_sum += accuracy
+        self.count += 1
+
+    def means(self):
+        """{metric: cohort mean} plus "accuracy", the mean curve; NaN before any model was added."""
+        n = self.count if self.count else np.nan
+        out = dict(zip(self.METRICS, self.metric_sums / n))
+        out["accuracy"] = self.curve_sum / n
+        return out
+
+def score_all(pred, gt, tolerances, workers=-1):
+    """
+    mean_closest_distance, hausdorff_distance, average_symmetric_distance,
+    hausdorff95_distance and accuracy_over_tolerance in one go: two trees, two
+    queries (parallel over all cores with workers=-1). Results are identical
+    to calling the functions one by one.
+    """
+    dists_pred_to_gt, dists_gt_to_pred = directed_distances(pred, gt, workers)
+    return scores_from_distances(dists_pred_to_gt, dists_gt_to_pred, tolerances)
+
+
+def point_segment_distances(points, seg_a, seg_b):
+    """Distance from each point to the matching segment [seg_a, seg_b]."""
+    ab = seg_b - seg_a
+    len2 = np.einsum('ij,ij->i', ab, ab)
+    t = np.einsum('ij,ij->i', points - seg_a, ab) / np.where(len2 > 0, len2, 1.0)
+    closest = seg_a + np.clip(t, 0.0, 1.0)[:, None] * ab
+    return np.linalg.norm(points - closest, axis=1)
+
+class PolylineIndex:
+    """
+    Segment index over one or more (optionally labelled) polylines for exact
+    point-to-polyline distances.
+    Every segment is bounded by a sphere around its midpoint. A query takes the
+    nearest vertex distance as an upper bound and only measures the segments
+    whose sphere lies within it, so the cost does not grow with resampling.
+    """
+    def __init__(self, polylines, labels=None):
+        if isinstance(polylines, np.ndarray) and polylines.ndim == 2:
+            polylines = [polylines]
+        polylines = list(polylines)
+        self.labels = list(labels) if labels is not None else list(range(len(polylines)))
+        starts, ends, owners = [], [], []
+        for line_id, line in enumerate(polylines):
+            line = np.asarray(line, dtype=np.float64)
+            if len(line) == 1:
+                # A lone point is a zero length segment
+                line = np.repeat(line, 2, axis=0)
+            starts.append(line[:-1])
+            ends.append(line[1:])
+            owners.append(np.full(max(len(line) - 1, 0), line_id, dtype=np.intp))
+        self.segment_line = np.concatenate(owners)
+        self.seg_a = np.concatenate(starts)
+        self.seg_b = np.concatenate(ends)
+        if len(self.seg_a) == 0:
+            raise ValueError("PolylineIndex needs at least one point")
+        self.radius = np.linalg.norm(self.seg_b - self.seg_a, axis=1) / 2
+        self.max_radius = np.max(self.radius)
+        self.segment_tree = cKDTree((self.seg_a + self.seg_b) / 2)
+        self.vertex_tree = cKDTree(np.concatenate([self.seg_a, self.seg_b]))
+
+    def query(self, points, workers=1, chunk=65536):
+        """Return (distances, segment indices) of the closest point on the polylines."""
+        points = np.asarray(points, dtype=np.float64)
+        dists = np.empty(len(points))
+        segments = np.empty(len(points), dtype=np.intp)
+        for lo in range(0, len(points), chunk):
+            pts = points[lo:lo + chunk]
+            upper, vertex = self.vertex_tree.query(pts, workers=workers)
+            # A segment can only beat the nearest vertex if its midpoint is within upper + radius;
+            # padded so rounding cannot leave the point on the ball boundary without candidates
+            reach = (upper + self.max_radius) * (1 + 1e-9) + 1e-12
+            candidates = self.segment_tree.query_ball_point(pts, reach, workers=workers)
+            counts = np.fromiter(map(len, candidates), dtype=np.intp, count=len(pts))
+            # The segment owning the nearest vertex is always a candidate, so no point goes without one
+            seg = np.concatenate([np.fromiter(itertools.chain.from_iterable(candidates), dtype=np.intp, count=counts.sum()),
+                                  vertex % len(self.seg_a)])
+            owner = np.concatenate([np.repeat(np.arange(len(pts)), counts), np.arange(len(pts))])
+            d = point_segment_distances(pts[owner], self.seg_a[seg], self.seg_b[seg])
+            order = np.lexsort((d, owner))
+            first = order[np.searchsorted(owner[order], np.arange(len(pts)))]
+            dists[lo:lo + chunk] = d[first]
+            segments[lo:lo + chunk] = seg[first]
+        return dists, segments
+
+    def query_branch(self, points, workers=1):
+        """Return (distances, branch labels) of the closest polyline for each point."""
+        dists, segments = self.query(points, workers)
+        line_ids = self.segment_line[segments]
+        return dists, np.array(self.labels, dtype=object)[line_ids]
+
+def directed_polyline_distances(pred, gt, workers=1):
+    """
+    Exact counterpart of directed_distances: pred vertices against the gt
+    segments and gt vertices against the pred segments. pred and gt may each be
+    one (N, 3) polyline or a list of polylines (kept apart, no bridging segments).
+    """
+    pred_lines = [pred] if isinstance(pred, np.ndarray) else list(pred)
+    gt_lines = [gt] if isinstance(gt, np.ndarray) else list(gt)
+    dists_pred_to_gt, _ = PolylineIndex(gt_lines).query(np.concatenate(pred_lines), workers)
+    dists_gt_to_pred, _ = PolylineIndex(pred_lines).query(np.concatenate(gt_lines), workers)
+    return dists_pred_to_gt, dists_gt_to_pred
+
+def score_all_exact(pred, gt, tolerances, workers=-1):
+    """
+    score_all without resampling: distances are measured to the polylines
+    themselves, so the result does not depend on a resampling density.
+    """
+    dists_pred_to_gt, dists_gt_to_pred = directed_polyline_distances(pred, gt, workers)
+    return scores_from_distances(dists_pred_to_gt, dists_gt_to_pred, tolerances)
+
+
+def score_branches(pred, branches, tolerance=2.0, workers=-1):
+    """
+    Per-branch report against a {label: polyline} GT (see load_path.load_branches).
+    For each branch: how much of it the prediction covers (GT vertices within
+    `tolerance` of the predicted polyline) and the prediction points whose
+    nearest GT branch it is. Return a list of dict rows, one per branch.
+    """
+    labels = list(branches)
+    gt_index = PolylineIndex([branches[label] for label in labels], labels)
+    pred_index = PolylineIndex(pred)
+    dists_pred, nearest = gt_index.query_branch(pred, workers)
+    rows = []
+    for label in labels:
+        dists_gt, _ = pred_index.query(branches[label], workers)
+        assigned = dists_pred[nearest == label]
+        rows.append({
+            "branch": label,
+            "gt_points": len(dists_gt),
+            "coverage": np.mean(dists_gt <= tolerance),
+            "gt_to_pred_mean": np.mean(dists_gt),
+            "gt_to_pred_hd95": np.percentile(dists_gt, 95),
+            "pred_points": len(assigned),
+            "pred_to_branch_mean": np.mean(assigned) if len(assigned) else np.nan,
+        })
+    return rows
@@ -0,0 +1,285 @@
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+from scipy.spatial import cKDTree
+from manhattan_center import iter_slices
+from slice_clustering import get_cluster_backend
+from centerline_scoring import PolylineIndex
+
+def slice_clusters(points, axis=2, dz=1.0, eps=0.5, min_samples=5, cluster_backend="grid"):
+    """
+    Every DBSCAN cluster of every slice, none discarded.
+    Return a list with one entry per non-empty slice: (slice index, centroids,
+    sizes, list of the cluster point arrays).
+    """
+    cluster = get_cluster_backend(cluster_backend)
+    axes = [i for i in range(3) if i != axis]
+    out = []
+    for k, slice_pts in enumerate(iter_slices(points, axis, dz)):
+        if len(slice_pts) == 0:
+            continue
+        labels = cluster(slice_pts[:, axes].astype(np.float64), eps, min_samples)
+        valid_labels = [label for label in np.unique(labels) if label != -1]
+        if not valid_labels:
+            continue
+        members = [slice_pts[labels == label] for label in valid_labels]
+        centroids = np.array([np.mean(m, axis=0, dtype=np.float64) for m in members])
+        sizes = np.array([len(m) for m in members])
+        out.append((k, centroids, sizes, members))
+    return out
+
+def link_clusters(slices, link_dist=2.0):
+    """
+    Connect clusters of consecutive slices that touch: some point of one lies
+    within link_dist of some point of the other.
+    Clusters are numbered globally in slice order. Return (centroids, sizes,
+    slice_of, edges) with edges an (E, 2) array of (lower slice node, upper slice node).
+    """
+    centroids, sizes, slice_of, edges = [], [], [], []
+    first_node = 0
+    prev = None
+    for k, c, s, members in slices:
+        labels = np.repeat(np.arange(len(members)), [len(m) for m in members])
+        pts = np.concatenate(members).astype(np.float64)
+        if prev is not None and prev[0] == k - 1:
+            _, prev_first, prev_labels, prev_tree = prev
+            dist, nearest = prev_tree.query(pts, distance_upper_bound=link_dist)
+            hit = np.isfinite(dist)
+            pairs = np.unique(np.stack([prev_labels[nearest[hit]] + prev_first, labels[hit] + first_node], axis=1), axis=0)
+            edges.append(pairs)
+        prev = (k, first_node, labels, cKDTree(pts))
+        centroids.append(c)
+        sizes.append(s)
+        slice_of.append(np.full(len(c), k))
+        first_node += len(c)
+    if not centroids:
+        return np.empty((0, 3)), np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty((0, 2), dtype=np.intp)
+    edges = np.concatenate(edges) if edges else np.empty((0, 2), dtype=np.intp)
+    return np.concatenate(centroids), np.concatenate(sizes), np.concatenate(slice_of), edges.astype(np.intp)
+
+class ChainGraph:
+    """
+    Cluster graph cut into chains (runs of nodes linked one-to-one).
+    chains: {chain id: node list in slice order}, chain_of: node -> chain,
+    junctions: set of (node, node) edges between different chains, lower slice first.
+    """
+    def __init__(self, centroids, sizes, slice_of, edges):
+        self.centroids = list(centroids)
+        self.sizes = list(sizes)
+        self.slice_of = list(slice_of)
+        n_nodes = len(self.centroids)
+        out_deg = np.bincount(edges[:, 0], minlength=n_nodes)
+        in_deg = np.bincount(edges[:, 1], minlength=n_nodes)
+        pred = np.full(n_nodes, -1)
+        pred[edges[:, 1]] = edges[:, 0]
+        self.chain_of = {}
+        self.chains = {}
+        # Nodes are numbered in slice order, so a predecessor is always assigned first
+        for node in range(n_nodes):
+            p = pred[node]
+            if in_deg[node] == 1 and out_deg[p] == 1:
+                c = self.chain_of[p]
+                self.chains[c].append(node)
+            else:
+                c = len(self.chains)
+                self.chains[c] = [node]
+            self.chain_of[node] = c
+        self.junctions = {(int(a), int(b)) for a, b in edges if self.chain_of[a] != self.chain_of[b]}
+
+    def links(self):
+        """(upstream chain, downstream chain) pairs."""
+        return {(self.chain_of[a], self.chain_of[b]) for a, b in self.junctions}
+
+    def ups(self, c):
+        return {self.chain_of[a] for a, b in self.junctions if self.chain_of[b] == c}
+
+    def downs(self, c):
+        return {self.chain_of[b] for a, b in self.junctions if self.chain_of[a] == c}
+
+    def fuse(self, a, b, at=None):
+        """Append downstream chain b to chain a, dropping the nodes of a after node `at`."""
+        if at is not None:
+            cut = self.chains[a].index(at) + 1
+            for node in self.chains[a][cut:]:
+                del self.chain_of[node]
+            self.chains[a] = self.chains[a][:cut]
+        for node in self.chains[b]:
+            self.chain_of[node] = a
+        self.chains[a] = self.chains[a] + self.chains.pop(b)
+        self.junctions = {(x, y) for x, y in self.junctions
+                          if x in self.chain_of and y in self.chain_of and self.chain_of[x] != self.chain_of[y]}
+
+    def remove(self, c):
+        for node in self.chains.pop(c):
+            del self.chain_of[node]
+        self.junctions = {(x, y) for x, y in self.junctions if x in self.chain_of and y in self.chain_of}
+
+    def collapse_short(self, min_nodes):
+        """
+        Junctions and ragged cross-sections split a vessel into a braid of short
+        chains. Replace every connected group of chains shorter than min_nodes
+        by one chain of per-slice, size-weighted centroids.
+        """
+        short = [c for c, nodes in self.chains.items() if len(nodes) < min_nodes]
+        parent = {c: c for c in short}
+
+        def find(c):
+            while parent[c] != c:
+                parent[c] = parent[parent[c]]
+                c = parent[c]
+            return c
+        for a, b in self.links():
+            if a in parent and b in parent:
+                parent[find(a)] = find(b)
+        groups = {}
+        for c in short:
+            groups.setdefault(find(c), []).append(c)
+
+        node_map = {}
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            nodes = [n for c in members for n in self.chains.pop(c)]
+            target = min(members)
+            merged = []
+            for k in sorted({self.slice_of[n] for n in nodes}):
+                at_k = [n for n in nodes if self.slice_of[n] == k]
+                w = np.array([self.sizes[n] for n in at_k], dtype=np.float64)
+                self.centroids.append(np.average([self.centroids[n] for n in at_k], axis=0, weights=w))
+                self.sizes.append(int(w.sum()))
+                self.slice_of.append(k)
+                new = len(self.centroids) - 1
+                merged.append(new)
+                self.chain_of[new] = target
+                for n in at_k:
+                    node_map[n] = new
+                    del self.chain_of[n]
+            self.chains[target] = merged
+        self.junctions = {(node_map.get(a, a), node_map.get(b, b)) for a, b in self.junctions}
+        self.junctions = {(a, b) for a, b in self.junctions if self.chain_of[a] != self.chain_of[b]}
+
+    def prune(self, min_nodes):
+        """Drop leaf chains shorter than min_nodes (noise clusters, wall fragments)."""
+        leaves = [c for c, nodes in self.chains.items()
+                  if len(nodes) < min_nodes and (not self.ups(c) or not self.downs(c))]
+        for c in leaves:
+            if len(self.chains) > 1:
+                self.remove(c)
+
+    def _length(self, c):
+        return len(self.chains[c])
+
+    def split(self, c, node):
+        """Cut chain c before `node`; the nodes from there on become a new chain linked to the rest."""
+        nodes = self.chains[c]
+        cut = nodes.index(node)
+        new = max(self.chains) + 1
+        self.chains[c] = nodes[:cut]
+        self.chains[new] = nodes[cut:]
+        for n in self.chains[new]:
+            self.chain_of[n] = new
+        self.junctions.add((nodes[cut - 1], node))
+        return new
+
+    def split_merges(self):
+        """
+        A side vessel met from its free end runs on as the chain it merges
+        into, so the trunk ending there enters that chain in the middle. Cut
+        such chains at the junction, so join_trunks picks the trunk by length.
+        """
+        for x, y in sorted(self.junctions):
+            c = self.chain_of[y]
+            if y != self.chains[c][0]:
+                self.split(c, y)
+
+    def join_trunks(self, min_nodes):
+        """
+        Fuse chains across splits and merges: a chain continues into the
+        longest (most slices) of the chains starting at its end when it is
+        also the longest chain ending there, so a trunk stays one branch and
+        side vessels start at their junction. Cluster size would misjudge
+        vessels running in the slice plane, which are cut lengthwise.
+        "End" allows a tail shorter than min_nodes after the junction, which
+        is dropped (braid leftovers). One-to-one junctions are fused as well.
+        """
+        changed = True
+        while changed:
+            changed = False
+            ends = {}
+            for x, y in self.junctions:
+                a, b = self.chain_of[x], self.chain_of[y]
+                nodes = self.chains[a]
+                if y == self.chains[b][0] and len(nodes) - 1 - nodes.index(x) < min_nodes:
+                    ends[(a, b)] = max(ends.get((a, b), x), x, key=nodes.index)
+            for a in sorted(self.chains, key=lambda c: self.slice_of[self.chains[c][0]]):
+                downs = sorted(b for x, b in ends if x == a)
+                if not downs:
+                    continue
+                b = max(downs, key=self._length)
+                ups = sorted(x for x, y in ends if y == b)
+                if max(ups, key=self._length) == a:
+                    self.fuse(a, b, ends[(a, b)])
+                    changed = True
+                    break
+
+def extract_centerline_tree(points, axis=2, dz=1.0, eps=0.5, min_samples=5, link_dist=2.0, min_branch_points=5, sigma=1.0,
+                            cluster_backend="grid"):
+    """
+    Multi-branch counterpart of compute_slice_centerline: every cluster of
+    every slice is kept, clusters that touch across neighbouring slices are
+    linked, and the resulting graph is cut into branches. A trunk continues
+    through a junction into its longest continuation; the other vessels become
+    branches of their own.
+    Return (branches, links): branches {"branch_<i>": (N, 3) polyline} ordered
+    along axis, each smoothed like compute_slice_centerline and starting or
+    ending at its junction with the parent branch; links the (upstream,
+    downstream) label pairs.
+    Vessels running inside the slice plane (e.g. renals with axis=2) only show
+    up as short branches; slice them along their own direction if needed.
+    """
+    slices = slice_clusters(points, axis, dz, eps, min_samples, cluster_backend)
+    centroids, sizes, slice_of, edges = link_clusters(slices, link_dist)
+    if len(centroids) == 0:
+        return {}, []
+    graph = ChainGraph(centroids, sizes, slice_of, edges)
+    graph.collapse_short(min_branch_points)
+    graph.prune(min_branch_points)
+    graph.split_merges()
+    graph.join_trunks(min_branch_points)
+
+    order = sorted(graph.chains, key=lambda c: (graph.slice_of[graph.chains[c][0]], c))
+    labels = {c: f"branch_{i}" for i, c in enumerate(order)}
+    branches = {}
+    for c in order:
+        nodes = graph.chains[c]
+        line = np.array([graph.centroids[n] for n in nodes])
+        if sigma > 0 and len(line) > 1:
+            line = gaussian_filter1d(line, sigma=sigma, axis=0)
+        # Attach to the parent branch at the junction node
+        enter = [a for a, b in graph.junctions if b == nodes[0]]
+        leave = [b for a, b in graph.junctions if a == nodes[-1]]
+        if len(enter) == 1:
+            line = np.concatenate([[graph.centroids[enter[0]]], line])
+        if len(leave) == 1:
+            line = np.concatenate([line, [graph.centroids[leave[0]]]])
+        branches[labels[c]] = line
+    links = sorted((labels[a], labels[b]) for a, b in graph.links())
+    return branches, links
+
+def label_branches(branches, gt_branches, workers=1):
+    """
+    Rename extracted branches after the GT branch (load_path.load_branches)
+    most of their points are closest to. Repeated names get a _2, _3 suffix.
+    Return {new label: polyline} and the {old label: new label} mapping.
+    """
+    index = PolylineIndex(list(gt_branches.values()), list(gt_branches))
+    renamed, mapping, used = {}, {}, {}
+    for label, line in branches.items():
+        _, nearest = index.query_branch(line, workers)
+        names, counts = np.unique(nearest.astype(str), return_counts=True)
+        name = str(names[np.argmax(counts)])
+        used[name] = used.get(name, 0) + 1
+        if used[name] > 1:
+            name = f"{name}_{used[name]}"
+        mapping[label] = name
+        renamed[name] = line
+    return renamed, mapping
\ No newline at end of file
@@ -0,0 +1,148 @@
+import os
+import glob
+import json
+from functools import lru_cache
+import numpy as np
+from read_file import read_file
+from make_mesh import make_mesh
+from inside_mesh import mesh_triangles
+from load_path import load_branches
+from artifact_cache import file_hash
+from centerline_io import CohortWriter, member_layout
+
+STORE_VERSION = 2
+
+def index_path(store_path):
+    """The JSON index next to a cohort store: <store>.json for <store>.npz."""
+    return os.path.splitext(store_path)[0] + ".json"
+
+def pth_stamp(model_pth_dir):
+    """{.pth file name: [size, mtime]} of a model's paths folder, or None without the folder."""
+    if not os.path.isdir(model_pth_dir):
+        return None
+    stats = {os.path.basename(path): os.stat(path) for path in sorted(glob.glob(os.path.join(model_pth_dir, "*.pth")))}
+    return {name: [stat.st_size, stat.st_mtime] for name, stat in stats.items()}
+
+def ingest_cohort(input_folder, pth_folder, store_path):
+    """
+    Pack every model of input_folder into one cohort store: the vertices
+    (<basename>/points, in the dtype of the .vtp), the surface triangles
+    (<basename>/triangles) and the .pth branches (<basename>/gt/<label>) as
+    uncompressed members of an .npz, plus a JSON index of where every array
+    starts in the file. Run once; CohortStore then maps it without parsing.
+    The index keeps the size and mtime of the .vtp and of every .pth so stale
+    cases are detected (CohortStore.is_current, gt_is_current). A model whose
+    .pth files fail to load is stored without ground truth.
+    """
+    vtp_files = sorted(glob.glob(os.path.join(input_folder, "*.vtp")))
+    print(f"Ingesting {len(vtp_files)} .vtp files from {input_folder}")
+    cases = {}
+    with CohortWriter(store_path) as writer:
+        for vtp_file in vtp_files:
+            basename = os.path.splitext(os.path.basename(vtp_file))[0]
+            polydata = read_file(vtp_file)
+            writer.add(f"{basename}/points", make_mesh(polydata))
+            writer.add(f"{basename}/triangles", mesh_triangles(polydata))
+            stat = os.stat(vtp_file)
+            case = {"vtp": os.path.abspath(vtp_file), "size": stat.st_size, "mtime": stat.st_mtime,
+                    "vtp_hash": file_hash(vtp_file), "gt": None}
+            model_pth_dir = os.path.join(pth_folder, basename, "paths")
+            case["pths"] = pth_stamp(model_pth_dir)
+            if case["pths"] is not None:
+                try:
+                    branches = load_branches(model_pth_dir)
+                except Exception as e:
+                    print(f"Failed to load segments for {basename}, storing it without ground truth: {e}")
+                    branches = None
+                if branches is not None:
+                    for label, branch in branches.items():
+                        writer.add(f"{basename}/gt/{label}", branch)
+                    case["gt"] = list(branches)
+            cases[basename] = case
+
+    layout = member_layout(store_path)
+    for name, member in layout.items():
+        offset, shape, fortran_order, dtype = member
+        basename, key = name.split("/", 1)
+        cases[basename].setdefault("arrays", {})[key] = {
+            "offset": offset, "shape": list(shape), "fortran_order": fortran_order, "dtype": dtype.str}
+    with open(index_path(store_path), 'w') as f:
+        json.dump({"version": STORE_VERSION, "store": os.path.basename(store_path), "cases": cases}, f, indent=1)
+    print(f"Saved {len(cases)} cases to {store_path}")
+    return store_path
+
+class CohortStore:
+    """
+    Read-only view of a store written by ingest_cohort(). The whole file is
+    memory-mapped once and every array is a zero-copy NumPy view into it, so
+    worker processes attaching to the same store share the pages through the
+    OS file cache instead of each parsing the .vtp files.
+
+    store = CohortStore(path)
+    points = store.points("0140_2001")       # (N, 3) read-only view
+    branches = store.branches("0140_2001")   # {label: (M, 3)} or None
+    Check is_current / gt_is_current first, the files may have changed since.
+    """
+    def __init__(self, store_path):
+        with open(index_path(store_path)) as f:
+            index = json.load(f)
+        if index.get("version") != STORE_VERSION:
+            raise ValueError(f"{store_path} has store version {index.get('version')}, expected {STORE_VERSION}")
+        self.store_path = store_path
+        self.cases = index["cases"]
+        self.buffer = np.memmap(store_path, dtype=np.uint8, mode='r')
+
+    def __contains__(self, basename):
+        return basename in self.cases
+
+    def __len__(self):
+        return len(self.cases)
+
+    def _array(self, basename, key):
+        member = self.cases[basename]["arrays"][key]
+        dtype = np.dtype(member["dtype"])
+        shape = tuple(member["shape"])
+        if np.prod(shape) == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.ndarray(shape, dtype=dtype, buffer=self.buffer, offset=member["offset"],
+                          order='F' if member["fortran_order"] else 'C')
+
+    def is_current(self, basename, vtp_file):
+        """Whether vtp_file still has the size and modification time it had when ingested."""
+        if basename not in self.cases:
+            return False
+        stat = os.stat(vtp_file)
+        return stat.st_size == self.cases[basename]["size"] and stat.st_mtime == self.cases[basename]["mtime"]
+
+    def gt_is_current(self, basename, model_pth_dir):
+        """Whether model_pth_dir holds the same .pth files, with the same sizes and mtimes, as when ingested."""
+        return basename in self.cases and pth_stamp(model_pth_dir) == self.cases[basename]["pths"]
+
+    def vtp_hash(self, basename):
+        """sha256 of the ingested .vtp, as artifact_cache.file_hash() gives it."""
+        return self.cases[basename]["vtp_hash"]
+
+    def points(self, basename):
+        return self._array(basename, "points")
+
+    def triangles(self, basename):
+        return self._array(basename, "triangles")
+
+    def mesh(self, basename):
+        """(points, triangles), e.g. for section_slicing.cross_sections()."""
+        return self.points(basename), self.triangles(basename)
+
+    def branches(self, basename):
+        """
+        {label: polyline} like load_path.load_branches(), or None when the model
+        had no .pth folder or its .pth files failed to load at ingest.
+        """
+        labels = self.cases[basename]["gt"]
+        if labels is None:
+            return None
+        return {label: self._array(basename, f"gt/{label}") for label in labels}
+
+@lru_cache(maxsize=4)
+def attach(store_path):
+    """The CohortStore of store_path, opened once per process."""
+    return CohortStore(store_path)
\ No newline at end of file
@@ -0,0 +1,117 @@
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+from scipy.spatial import cKDTree
+from centerline_scoring import resample_line
+from manhattan_center import compute_slice_centerline, filter_points_inside_mesh
+from slice_clustering import get_cluster_backend
+
+def line_length(line):
+    return float(np.sum(np.linalg.norm(np.diff(line, axis=0), axis=1)))
+
+def extend_line(line, length):
+    """Prolong a polyline by `length` mm straight along its end tangents."""
+    if length <= 0 or len(line) < 2:
+        return line
+    head = line[0] - line[1]
+    tail = line[-1] - line[-2]
+    head *= length / max(np.linalg.norm(head), 1e-12)
+    tail *= length / max(np.linalg.norm(tail), 1e-12)
+    return np.concatenate([[line[0] + head], line, [line[-1] + tail]])
+
+def make_stations(line, spacing=1.0):
+    """
+    Resample a centerline every `spacing` mm and attach a cutting plane to each
+    station. Return (stations, frames): frames[i] holds the rows (u, v, t) with
+    t the unit tangent at station i and u, v spanning the cross-section plane.
+    """
+    line = np.asarray(line, dtype=np.float64)
+    num = max(2, int(round(line_length(line) / spacing)) + 1)
+    stations = resample_line(line, num)
+    tangents = np.gradient(stations, axis=0)
+    tangents /= np.maximum(np.linalg.norm(tangents, axis=1, keepdims=True), 1e-12)
+    # u from the coordinate axis least aligned with each tangent
+    ref = np.eye(3)[np.argmin(np.abs(tangents), axis=1)]
+    u = np.cross(tangents, ref)
+    u /= np.linalg.norm(u, axis=1, keepdims=True)
+    v = np.cross(tangents, u)
+    return stations, np.stack([u, v, tangents], axis=1)
+
+def station_blocks(points, stations, frames, thickness, workers=-1):
+    """
+    Assign each point to its nearest station and keep it if it lies within
+    thickness / 2 of that station's plane. Return (order, bounds, local): the
+    points of station i are order[bounds[i]:bounds[i + 1]] (original index
+    order) and local[order] their (u, v, t) coordinates relative to the station.
+    """
+    _, nearest = cKDTree(stations).query(points, workers=workers)
+    offsets = points - stations[nearest]
+    local = np.einsum('nij,nj->ni', frames[nearest], offsets)
+    keep = np.nonzero(np.abs(local[:, 2]) <= thickness / 2)[0]
+    order = keep[np.argsort(nearest[keep], kind='stable')]
+    bounds = np.searchsorted(nearest[order], np.arange(len(stations) + 1), side='left')
+    return order, bounds, local
+
+def reslice_centerline(points, line, spacing=1.0, thickness=None, eps=0.5, min_samples=5, max_jump=10.0,
+                       cluster_backend="grid", extend=0.0, workers=-1):
+    """
+    One fine pass: cut the mesh with planes perpendicular to `line` every
+    `spacing` mm, cluster each cross-section in its own plane and keep the
+    cluster nearest to the station (the slice cluster nearest to the previous
+    center when the station has drifted further than max_jump).
+    The line is first prolonged by `extend` mm at both ends, so vessel ends the
+    coarse pass stopped short of are still cut; stations past the mesh are empty.
+    Return the unsmoothed centers in station order.
+    """
+    cluster = get_cluster_backend(cluster_backend)
+    points = np.asarray(points)
+    if thickness is None:
+        thickness = spacing
+    stations, frames = make_stations(extend_line(line, extend), spacing)
+    order, bounds, local = station_blocks(np.asarray(points, dtype=np.float64), stations, frames, thickness, workers)
+    centers = []
+    prev_center = None
+    for i in range(len(stations)):
+        idx = order[bounds[i]:bounds[i + 1]]
+        if len(idx) == 0:
+            continue
+        labels = cluster(local[idx, :2], eps, min_samples)
+        valid_labels = [label for label in np.unique(labels) if label != -1]
+        if not valid_labels:
+            continue
+        centroids = np.array([np.mean(points[idx[labels == label]], axis=0, dtype=np.float64) for label in valid_labels])
+        dists = np.linalg.norm(centroids - stations[i], axis=1)
+        chosen = np.argmin(dists)
+        if prev_center is not None and dists[chosen] > max_jump:
+            chosen = np.argmin(np.linalg.norm(centroids - prev_center, axis=1))
+        centers.append(centroids[chosen])
+        prev_center = centroids[chosen]
+    return np.array(centers)
+
+def compute_curved_centerline(points, polydata=None, axis=2, coarse_dz=4.0, spacing=1.0, thickness=None, eps=0.5,
+                              min_samples=5, max_jump=10.0, sigma=1.0, passes=1, cluster_backend="grid", workers=-1):
+    """
+    Coarse-to-fine centerline for tortuous vessels.
+    1. compute_slice_centerline() along `axis` with thick coarse_dz slices.
+    2. Re-slice the mesh perpendicular to that line every `spacing` mm
+       (passes times, each pass following the previous result) and cluster
+       each cross-section in its own plane.
+    3. Gaussian smoothing and optional clipping to polydata, as in
+       compute_slice_centerline().
+    Cross-sections stay round where axis-aligned slices cut the vessel
+    obliquely, so a coarse spacing gives the accuracy a much finer dz would.
+    Each pass prolongs the previous line by coarse_dz at both ends to reach
+    the vessel ends.
+    """
+    line = compute_slice_centerline(points, axis=axis, dz=coarse_dz, eps=eps, min_samples=min_samples,
+                                    max_jump=max_jump, sigma=sigma, cluster_backend=cluster_backend)
+    for _ in range(passes):
+        if len(line) < 2:
+            break
+        centers = reslice_centerline(points, line, spacing, thickness, eps, min_samples, max_jump, cluster_backend,
+                                     coarse_dz, workers)
+        if len(centers) < 2:
+            break
+        line = gaussian_filter1d(centers, sigma=sigma, axis=0) if sigma > 0 else centers
+    if polydata is not None and len(line) > 0:
+        line = filter_points_inside_mesh(line, polydata)
+    return line
\ No newline at end of file
@@ -0,0 +1,169 @@
+import numpy as np
+import vtk
+from vtk.util.numpy_support import vtk_to_numpy
+from make_mesh import make_mesh, make_vtk_points
+
+def enclosed_points_mask(points, polydata):
+    """
+    Reference inside test with vtkSelectEnclosedPoints, points bulk-loaded in one copy.
+    Builds a new cell locator on every call; InsideTester reuses its index.
+    """
+    points = np.asarray(points)
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    enclosed = vtk.vtkSelectEnclosedPoints()
+    enclosed.SetSurfaceData(polydata)
+    test_poly = vtk.vtkPolyData()
+    test_poly.SetPoints(make_vtk_points(points))
+    enclosed.SetInputData(test_poly)
+    enclosed.Update()
+    return vtk_to_numpy(enclosed.GetOutput().GetPointData().GetArray("SelectedPoints")).astype(bool)
+
+def mesh_triangles(polydata):
+    """(M, 3) vertex indices of the surface triangles, triangulating other polygons first."""
+    polys = polydata.GetPolys()
+    offsets = vtk_to_numpy(polys.GetOffsetsArray())
+    if len(offsets) > 1 and not np.all(np.diff(offsets) == 3):
+        triangulate = vtk.vtkTriangleFilter()
+        triangulate.SetInputData(polydata)
+        triangulate.PassLinesOff()
+        triangulate.PassVertsOff()
+        triangulate.Update()
+        polys = triangulate.GetOutput().GetPolys()
+    return vtk_to_numpy(polys.GetConnectivityArray()).reshape(-1, 3)
+
+def _edge_sides(a, b, ia, ib, pu, pv):
+    """
+    Side of p relative to the edge a -> b in the projection plane (> 0 left),
+    returned as (side with ties resolved, raw side).
+    The orientation is always evaluated from the lower vertex index, so the two
+    triangles sharing an edge see bit-identical values, and exact zeros are
+    resolved by nudging p by an infinitesimal (+u, then +v). A ray through an
+    edge or vertex is therefore counted by exactly one triangle.
+    """
+    flip = ia > ib
+    a, b = np.where(flip[:, None], b, a), np.where(flip[:, None], a, b)
+    du = b[:, 0] - a[:, 0]
+    dv = b[:, 1] - a[:, 1]
+    side = du * (pv - a[:, 1]) - dv * (pu - a[:, 0])
+    tie = np.where(dv != 0, -dv, du)
+    resolved = np.where(side == 0, tie, side)
+    return np.where(flip, -resolved, resolved), np.where(flip, -side, side)
+
+class InsideTester:
+    """
+    Reusable inside/outside test for a closed triangle surface.
+    The triangles are bucketed once on a 2D grid perpendicular to the ray axis
+    (the shortest side of the bounding box); a query casts one ray per point and
+    counts the surface crossings above it, odd meaning inside.
+    Deterministic, unlike the random rays of vtkSelectEnclosedPoints; the two
+    only disagree for points within a rounding error of the surface.
+
+    tester = InsideTester(polydata)
+    mask = tester(points)   # (N,) bool
+    """
+    def __init__(self, polydata, cell_size=None, max_cells=1 << 20):
+        vertices = np.asarray(make_mesh(polydata), dtype=np.float64)
+        triangles = mesh_triangles(polydata)
+        extent = vertices.max(axis=0) - vertices.min(axis=0) if len(vertices) else np.zeros(3)
+        self.axis = int(np.argmin(extent))
+        self.plane_axes = [i for i in range(3) if i != self.axis]
+
+        tri = vertices[triangles]
+        uv = tri[:, :, self.plane_axes]
+        area = (uv[:, 1, 0] - uv[:, 0, 0]) * (uv[:, 2, 1] - uv[:, 0, 1]) - (uv[:, 1, 1] - uv[:, 0, 1]) * (uv[:, 2, 0] - uv[:, 0, 0])
+        # Triangles parallel to the ray have no inside in the projection
+        keep = area != 0
+        self.triangles = np.ascontiguousarray(triangles[keep])
+        self.uv = np.ascontiguousarray(uv[keep])
+        self.height = np.ascontiguousarray(tri[keep][:, :, self.axis])
+        self.area_sign = np.sign(area[keep])
+
+        lo = self.uv.min(axis=1)
+        hi = self.uv.max(axis=1)
+        if len(self.uv) == 0:
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0
+            self.shape = np.zeros(2, dtype=np.intp)
+            self.cell_start = np.zeros(1, dtype=np.intp)
+            self.cell_triangles = np.empty(0, dtype=np.intp)
+            return
+        self.origin = lo.min(axis=0)
+        span = hi.max(axis=0) - self.origin
+        if cell_size is None:
+            # About half a triangle: few candidates per ray without a huge grid
+            cell_size = 0.5 * np.median(np.max(hi - lo, axis=1))
+        # Keep the grid at most max_cells cells
+        cell_size = max(cell_size, np.sqrt(span[0] * span[1] / max_cells), 1e-12)
+        self.cell_size = cell_size
+        self.shape = np.floor(span / cell_size).astype(np.intp) + 1
+
+        c0 = self._cell_coords(lo)
+        c1 = self._cell_coords(hi)
+        nu = c1[:, 0] - c0[:, 0] + 1
+        nv = c1[:, 1] - c0[:, 1] + 1
+        counts = nu * nv
+        tri_idx = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(len(tri_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cu = c0[tri_idx, 0] + local // nv[tri_idx]
+        cv = c0[tri_idx, 1] + local % nv[tri_idx]
+        cell = cu * self.shape[1] + cv
+        order = np.argsort(cell, kind='stable')
+        self.cell_triangles = tri_idx[order]
+        self.cell_start = np.searchsorted(cell[order], np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def _cell_coords(self, uv):
+        cells = np.floor((uv - self.origin) / self.cell_size).astype(np.intp)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def __call__(self, points, chunk=1 << 20):
+        """Boolean mask of the points inside the surface."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        inside = np.zeros(len(points), dtype=bool)
+        if len(points) == 0 or len(self.cell_triangles) == 0:
+            return inside
+        puv = points[:, self.plane_axes]
+        cells = np.floor((puv - self.origin) / self.cell_size).astype(np.intp)
+        in_grid = np.all((cells >= 0) & (cells < self.shape), axis=1)
+        query = np.nonzero(in_grid)[0]
+        cell = cells[query, 0] * self.shape[1] + cells[query, 1]
+        starts = self.cell_start[cell]
+        counts = self.cell_start[cell + 1] - starts
+
+        # Process the (point, candidate triangle) pairs in bounded batches
+        ends = np.cumsum(counts)
+        first = 0
+        while first < len(query):
+            last = int(np.searchsorted(ends, ends[first] - counts[first] + chunk, side='right'))
+            last = max(last, first + 1)
+            crossings = self._crossings(points[query[first:last]], starts[first:last], counts[first:last])
+            inside[query[first:last]] = crossings % 2 == 1
+            first = last
+        return inside
+
+    def _crossings(self, points, starts, counts):
+        """Number of surface crossings on the ray from each point along +axis."""
+        pair_point = np.repeat(np.arange(len(points)), counts)
+        local = np.arange(len(pair_point)) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = self.cell_triangles[starts[pair_point] + local]
+        pu = points[pair_point, self.plane_axes[0]]
+        pv = points[pair_point, self.plane_axes[1]]
+        uv = self.uv[t]
+        ids = self.triangles[t]
+        sign = self.area_sign[t]
+
+        # s_k: side of p to the edge opposite vertex k, oriented like the triangle
+        s0, w0 = _edge_sides(uv[:, 1], uv[:, 2], ids[:, 1], ids[:, 2], pu, pv)
+        s1, w1 = _edge_sides(uv[:, 2], uv[:, 0], ids[:, 2], ids[:, 0], pu, pv)
+        s2, w2 = _edge_sides(uv[:, 0], uv[:, 1], ids[:, 0], ids[:, 1], pu, pv)
+        hit = (s0 * sign > 0) & (s1 * sign > 0) & (s2 * sign > 0)
+        if not np.any(hit):
+            return np.zeros(len(points), dtype=np.intp)
+        pair_point = pair_point[hit]
+        h = self.height[t[hit]]
+        w0, w1, w2 = w0[hit], w1[hit], w2[hit]
+
+        # Height of the triangle plane at p from the barycentric weights
+        crossing_h = (w0 * h[:, 0] + w1 * h[:, 1] + w2 * h[:, 2]) / (w0 + w1 + w2)
+        above = crossing_h > points[pair_point, self.axis]
+        return np.bincount(pair_point[above], minlength=len(points))
\ No newline at end of file
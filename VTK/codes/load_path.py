@@ -1,19 +1,139 @@
+import os
+import re
+import glob
 import numpy as np
 
-def load_pth_centerline(pth_file):
+PTH_FIELDS = ("pos", "tangent", "rotation")
+_PATH_POINT_RE = re.compile(rb'<path_point[\s>]')
+_FIELD_RES = {
+    field: re.compile(rb'<' + field.encode() + rb'\s+x="([^"]*)"\s+y="([^"]*)"\s+z="([^"]*)"')
+    for field in PTH_FIELDS
+}
+
+def _scan_pth(content):
+    """
+    Byte scanner for the usual SimVascular layout (<pos x= y= z= /> per path_point).
+    Return None if the file does not follow it, so the XML parser can take over.
+    """
+    n_points = len(_PATH_POINT_RE.findall(content))
+    arrays = {}
+    for field, regex in _FIELD_RES.items():
+        values = regex.findall(content)
+        if len(values) != n_points:
+            return None
+        arrays[field] = np.array(values, dtype=np.float64).reshape(-1, 3)
+    return arrays
+
+def _iterparse_pth(content, pth_file):
+    """Streaming XML fallback, one path_point element in memory at a time."""
     import xml.etree.ElementTree as ET
-    with open(pth_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    start = content.find("<path")
-    end = content.rfind("</path>") + len("</path>")
-    xml_str = content[start:end]
-    root = ET.fromstring(xml_str)
-
-    points = []
-    for path_point in root.findall(".//path_points/path_point"):
-        pos = path_point.find("pos")
-        x = float(pos.attrib['x'])
-        y = float(pos.attrib['y'])
-        z = float(pos.attrib['z'])
-        points.append([x, y, z])
-    return np.array(points)
\ No newline at end of file
+    start = content.find(b"<path")
+    end = content.rfind(b"</path>")
+    if start == -1 or end == -1:
+        raise ValueError(f"Could not find <path> in {pth_file}")
+    parser = ET.XMLPullParser(events=("end",))
+    parser.feed(content[start:end + len(b"</path>")])
+    values = {field: [] for field in PTH_FIELDS}
+    for _, elem in parser.read_events():
+        if elem.tag != "path_point":
+            continue
+        for field in PTH_FIELDS:
+            child = elem.find(field)
+            if child is None:
+                values[field].append([np.nan] * 3)
+            else:
+                values[field].append([float(child.attrib[axis]) for axis in "xyz"])
+        elem.clear()
+    parser.close()
+    return {field: np.array(v, dtype=np.float64).reshape(-1, 3) for field, v in values.items()}
+
+def parse_pth(pth_file, content=None):
+    """
+    Parse a .pth file without the cache.
+    Return a dict with 'pos', 'tangent' and 'rotation' as contiguous (N, 3) arrays.
+    content: the file bytes if already read.
+    """
+    if content is None:
+        with open(pth_file, 'rb') as f:
+            content = f.read()
+    arrays = _scan_pth(content)
+    if arrays is None:
+        arrays = _iterparse_pth(content, pth_file)
+    return arrays
+
+def _cache_path(pth_file):
+    return pth_file + ".npy"
+
+def _read_cache(pth_file, stat):
+    cache_file = _cache_path(pth_file)
+    try:
+        # The sidecar carries the mtime of the .pth it was built from
+        if os.stat(cache_file).st_mtime_ns != stat.st_mtime_ns:
+            return None
+        stacked = np.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    if stacked.ndim != 3 or stacked.shape[0] != len(PTH_FIELDS):
+        return None
+    return dict(zip(PTH_FIELDS, stacked))
+
+def _write_cache(pth_file, stat, arrays):
+    cache_file = _cache_path(pth_file)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            np.save(f, np.stack([arrays[field] for field in PTH_FIELDS]))
+        os.utime(tmp_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # Read-only data folders just go without a cache
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+def load_pth_arrays(pth_file, use_cache=True, content=None):
+    """
+    Load pos/tangent/rotation of a .pth file as (N, 3) arrays.
+    With use_cache the arrays are kept in a '<file>.pth.npy' sidecar stamped with
+    the .pth mtime, so later runs skip the XML entirely.
+    content: the file bytes if already read (parsed when there is no sidecar).
+    """
+    if not use_cache:
+        return parse_pth(pth_file, content)
+    stat = os.stat(pth_file)
+    arrays = _read_cache(pth_file, stat)
+    if arrays is None:
+        arrays = parse_pth(pth_file, content)
+        _write_cache(pth_file, stat, arrays)
+    return arrays
+
+def load_pth_centerline(pth_file, use_cache=True, content=None):
+    """Load the path_point positions of a .pth file as an (N, 3) array."""
+    return load_pth_arrays(pth_file, use_cache, content)["pos"]
+
+def load_branches(model_pth_dir, contents=None):
+    """
+    Load every .pth file of a model as its own branch polyline.
+    Return a dict {branch label: (N, 3) array}, label = file name without .pth,
+    in sorted file order.
+    contents: optional {.pth path: bytes} already read (prefetch.read_pth_dir).
+    """
+    segment_files = sorted(glob.glob(os.path.join(model_pth_dir, "*.pth")))
+    if not segment_files:
+        raise FileNotFoundError(f"No .pth files found in {model_pth_dir}")
+    branches = {}
+    for seg in segment_files:
+        try:
+            content = contents.get(seg) if contents else None
+            branches[os.path.splitext(os.path.basename(seg))[0]] = load_pth_centerline(seg, content=content)
+        except Exception as e:
+            print(f"Failed to load {seg}: {e}")
+    if not branches:
+        raise ValueError(f"No valid centerline points loaded from {model_pth_dir}")
+    return branches
+
+def load_all_segments(model_pth_dir, contents=None):
+    """
+    Load and concatenate all .pth files in a directory.
+    Return a single (N,3) array of all .pth points.
+    """
+    return np.concatenate(list(load_branches(model_pth_dir, contents).values()), axis=0)
@@ -1,164 +1,368 @@
 import os
 import glob
+from contextlib import nullcontext
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 from read_file import read_file
 from make_mesh import make_mesh
 from make_endpoints import make_endpoints
 from manhattan_center import compute_slice_centerline
-import xml.etree.ElementTree as ET
+from load_path import load_branches
+from artifact_cache import ArtifactCache, bytes_hash, file_hash, files_hash, make_key, resolve_params
+from profiling import StageProfiler, get_profiler, profiling, append_jsonl
+from centerline_io import CohortWriter, centerline_file, load_centerline, save_centerline
+from prefetch import prefetch, read_bytes, read_pth_dir
+from subsample import subsample_points
+from cohort_store import attach
 
 from centerline_scoring import (
     resample_line,
-    mean_closest_distance,
-    hausdorff_distance,
-    average_symmetric_distance,
-    hausdorff95_distance,
-    accuracy_over_tolerance,
+    resample_branches,
+    score_all,
+    score_all_exact,
+    score_branches,
+    CohortScores,
 )
 
-def save_centerline_csv(centerline, out_path):
-    np.savetxt(out_path, centerline, delimiter=",", header="x,y,z", comments='')
+def save_branch_scores_csv(rows, out_path):
+    columns = list(rows[0])
+    with open(out_path, 'w') as f:
+        f.write(",".join(columns) + "\n")
+        for row in rows:
+            f.write(",".join(str(row[c]) for c in columns) + "\n")
 
-def load_pth_centerline(pth_file):
+def compute_model_centerline(vtp_file, centerline_params, cache=None, vtp_data=None, subsample=None, store=None, vtp_hash=None):
     """
-    load .pth files as ground truth centerline.
+    read_file -> make_mesh -> make_endpoints -> [subsample_points] ->
+    compute_slice_centerline, with the intermediate arrays taken from / stored
+    in an ArtifactCache when given.
+    Mesh points and endpoints are keyed by the .vtp contents, the centerline by
+    the contents plus the compute_slice_centerline (and subsample) parameters.
+    vtp_data: the .vtp contents if already read.
+    vtp_hash: their file_hash() if already computed (load_model_inputs does it in the background).
+    subsample: optional subsample_points() keyword arguments, e.g. {"method": "voxel", "spacing": 0.2}.
+    store: optional CohortStore holding this model; its points are used instead
+    of reading the .vtp (no endpoints then, compute_slice_centerline does not need them).
     """
-    with open(pth_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    start = content.find("<path")
-    end = content.rfind("</path>") + len("</path>")
-    if start == -1 or end == -1:
-        raise ValueError(f"Could not find <path> in {pth_file}")
-    xml_str = content[start:end]
-    root = ET.fromstring(xml_str)
-
-    points = []
-    for path_point in root.findall(".//path_points/path_point"):
-        pos = path_point.find("pos")
-        x = float(pos.attrib['x'])
-        y = float(pos.attrib['y'])
-        z = float(pos.attrib['z'])
-        points.append([x, y, z])
-    return np.array(points)
-
-def load_all_segments(model_pth_dir):
+    profiler = get_profiler()
+    params = resolve_params(compute_slice_centerline, centerline_params)
+    basename = os.path.splitext(os.path.basename(vtp_file))[0]
+    if cache is None:
+        if store is not None:
+            return centerline_from_points(store.points(basename), params, subsample)
+        points, start, end = load_model_mesh(vtp_file, vtp_data)
+        return centerline_from_points(points, params, subsample)
+
+    with profiler.stage("cache"):
+        if store is not None:
+            vtp_hash = store.vtp_hash(basename)
+        elif vtp_hash is None:
+            vtp_hash = bytes_hash(vtp_data) if vtp_data is not None else file_hash(vtp_file)
+        key_parts = ("centerline", vtp_hash, params)
+        if subsample is not None:
+            key_parts += (resolve_params(subsample_points, subsample),)
+        centerline_key = make_key(*key_parts)
+        cached = cache.get(centerline_key)
+    if cached is not None:
+        profiler.count("cache_hits")
+        return cached["centerline"]
+    mesh_key = make_key("mesh", vtp_hash)
+    with profiler.stage("cache"):
+        mesh = cache.get(mesh_key) if store is None else None
+    if store is not None:
+        points = store.points(basename)
+    elif mesh is None:
+        points, start, end = load_model_mesh(vtp_file, vtp_data)
+        with profiler.stage("cache"):
+            cache.put(mesh_key, points=points, endpoints=np.array([start, end]))
+    else:
+        profiler.count("cache_hits")
+        points = mesh["points"]
+    centerline = centerline_from_points(points, params, subsample)
+    with profiler.stage("cache"):
+        cache.put(centerline_key, centerline=centerline)
+    return centerline
+
+def centerline_from_points(points, params, subsample=None):
+    profiler = get_profiler()
+    if subsample is not None:
+        with profiler.stage("subsample"):
+            points = subsample_points(points, **subsample)
+    with profiler.stage("centerline"):
+        return compute_slice_centerline(points, **params)
+
+def load_model_mesh(vtp_file, vtp_data=None):
+    """read_file -> make_mesh -> make_endpoints, timed on the active profiler."""
+    profiler = get_profiler()
+    with profiler.stage("read_file"):
+        polydata = read_file(vtp_file, vtp_data)
+    with profiler.stage("make_mesh"):
+        points = make_mesh(polydata)
+    with profiler.stage("make_endpoints"):
+        start, end = make_endpoints(points)
+    return points, start, end
+
+def load_model_branches(model_pth_dir, cache=None, contents=None):
+    """
+    load_branches() through the artifact cache, keyed by the .pth contents
+    (hashed from `contents` when the files were already read).
+    """
+    profiler = get_profiler()
+    if cache is None:
+        with profiler.stage("load_gt"):
+            return load_branches(model_pth_dir, contents)
+    with profiler.stage("cache"):
+        key = make_key("gt", files_hash(glob.glob(os.path.join(model_pth_dir, "*.pth")), contents))
+        cached = cache.get(key)
+    if cached is not None:
+        profiler.count("cache_hits")
+        # The .npz keeps the order the branches were stored in, load_branches' order
+        return cached
+    with profiler.stage("load_gt"):
+        branches = load_branches(model_pth_dir, contents)
+    with profiler.stage("cache"):
+        cache.put(key, **branches)
+    return branches
+
+def load_model_inputs(vtp_file, pth_folder, read_vtp=True, hash_vtp=False):
+    """
+    The file contents process_model() reads, for prefetching: {"vtp": bytes or
+    None, "pth": {.pth path: bytes} or None when the model has no GT folder,
+    "vtp_hash": file_hash() of the .vtp or None}.
+    hash_vtp: also hash the .vtp (the cache key), from the bytes when read_vtp.
+    """
+    basename = os.path.splitext(os.path.basename(vtp_file))[0]
+    model_pth_dir = os.path.join(pth_folder, basename, "paths")
+    vtp = read_bytes(vtp_file) if read_vtp else None
+    vtp_hash = None
+    if hash_vtp:
+        vtp_hash = bytes_hash(vtp) if vtp is not None else file_hash(vtp_file)
+    return {
+        "vtp": vtp,
+        "pth": read_pth_dir(model_pth_dir) if os.path.isdir(model_pth_dir) else None,
+        "vtp_hash": vtp_hash,
+    }
+
+def process_model(vtp_file, pth_folder, output_folder, tolerances, scoring="resampled", cache_dir=None, centerline_params=None,
+                  profile=False, centerline_format="npy", inputs=None, subsample=None, cohort_store=None):
+    """
+    Run the full pipeline for a single .vtp model.
+    Return (basename, scores, accuracy_curve, profile_record); scores is None when the model
+    could not be scored, otherwise (mean_closest, hausdorff, avg_symmetric, hausdorff95).
+    Runs in a worker process when main() is called with workers > 1.
+    scoring: "resampled" compares both lines resampled to 100 points (the GT split over its branches by length),
+    "exact" measures point-to-segment distances against every .pth polyline.
+    cache_dir: optional ArtifactCache folder, reused across runs.
+    centerline_params: keyword overrides for compute_slice_centerline.
+    profile: collect per-stage times, counters and the peak memory (of this model,
+    and of the process so far) into profile_record (a StageProfiler.record() dict); None when off.
+    centerline_format: "npy" (default) or "csv" for the saved centerlines.
+    inputs: file contents already read by load_model_inputs().
+    subsample: optional subsample_points() arguments applied to the mesh points first.
+    cohort_store: optional path of a cohort_store.ingest_cohort() store to take
+    the mesh points and GT branches from instead of the files.
+    """
+    args = (vtp_file, pth_folder, output_folder, tolerances, scoring, cache_dir, centerline_params, centerline_format, inputs,
+            subsample, cohort_store)
+    if not profile:
+        return run_model(*args) + (None,)
+    profiler = StageProfiler()
+    with profiling(profiler), profiler.stage("total"):
+        basename, scores, accs = run_model(*args)
+    return basename, scores, accs, profiler.record(model=basename, scored=scores is not None)
+
+def run_model(vtp_file, pth_folder, output_folder, tolerances, scoring="resampled", cache_dir=None, centerline_params=None,
+              centerline_format="npy", inputs=None, subsample=None, cohort_store=None):
+    """process_model() without the profiling: return (basename, scores, accuracy_curve)."""
+    profiler = get_profiler()
+    print(f"Processing: {vtp_file}")
+    inputs = inputs or {}
+    cache = ArtifactCache(cache_dir) if cache_dir else None
+    basename = os.path.splitext(os.path.basename(vtp_file))[0]
+    store = attach(cohort_store) if cohort_store else None
+    if store is not None and not store.is_current(basename, vtp_file):
+        print(f"{basename} is missing or outdated in {cohort_store}, reading the files")
+        store = None
+    centerline = compute_model_centerline(vtp_file, centerline_params, cache, inputs.get("vtp"), subsample, store,
+                                          inputs.get("vtp_hash"))
+
+    with profiler.stage("write_centerline"):
+        save_centerline(centerline, centerline_file(output_folder, f"{basename}_centerline", centerline_format))
+
+    # An earlier run's GT and branch scores must not be taken for this one's
+    # (main() archives whatever GT is there)
+    gt_file = centerline_file(output_folder, f"{basename}_centerline_gt", centerline_format)
+    branch_csv = os.path.join(output_folder, f"{basename}_branch_scores.csv")
+    for stale in (gt_file, branch_csv):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    model_pth_dir = os.path.join(pth_folder, basename, "paths")
+    # The files decide when the store has no usable GT: missing dir and load errors are reported there
+    gt_stored = (store is not None and store.gt_is_current(basename, model_pth_dir)
+                 and store.branches(basename) is not None)
+    if not gt_stored and not os.path.exists(model_pth_dir):
+        print(f"Ground truth dir not found for {basename}")
+        return basename, None, None
+    try:
+        if gt_stored:
+            gt_branches = store.branches(basename)
+        else:
+            gt_branches = load_model_branches(model_pth_dir, cache, inputs.get("pth"))
+        gt_centerline = np.concatenate(list(gt_branches.values()), axis=0)
+    except Exception as e:
+        print(f"Failed to load segments for {basename}: {e}")
+        return basename, None, None
+
+    with profiler.stage("write_centerline"):
+        save_centerline(gt_centerline, gt_file)
+    profiler.count("gt_points", len(gt_centerline))
+
+    num_points = 100
+    try:
+        with profiler.stage("scoring"):
+            if scoring == "exact":
+                scores = score_all_exact(centerline, list(gt_branches.values()), tolerances, workers=1)
+            else:
+                pred_rs = resample_line(centerline, num_points)
+                # Per branch, so the jumps between the .pth files get no GT points
+                gt_rs = resample_branches(gt_branches.values(), num_points)
+                # 100 points per line, threaded queries would only add overhead here
+                scores = score_all(pred_rs, gt_rs, tolerances, workers=1)
+        mean_c = scores["mean_closest"]
+        haus = scores["hausdorff"]
+        avg_sym = scores["avg_symmetric"]
+        hd95 = scores["hausdorff95"]
+        tols, accs = scores["tolerances"], scores["accuracy"]
+
+        print(f"Scores for {basename}: mean={mean_c:.3f}, hausdorff={haus:.3f}, avg_sym={avg_sym:.3f}, hd95={hd95:.3f}")
+
+        # Uncomment this if you need to check the acc over tolerance plot for every model
+        # plt.figure()
+        # plt.plot(tols, accs, marker='o')
+        # plt.xlabel('Tolerance (mm)')
+        # plt.ylabel('Accuracy (fraction within tolerance)')
+        # plt.title(f'{basename}: Accuracy vs. Tolerance')
+        # plt.grid(True)
+        # plt.show()
+
+    except Exception as e:
+        print(f"Scoring failed for {vtp_file}: {e}")
+        return basename, None, None
+
+    # Which vessels the prediction covers, one row per .pth branch; the main scores stand without it
+    try:
+        with profiler.stage("branch_scores"):
+            branch_rows = score_branches(centerline, gt_branches, workers=1)
+        save_branch_scores_csv(branch_rows, branch_csv)
+    except Exception as e:
+        print(f"Branch scoring failed for {vtp_file}: {e}")
+
+    return basename, (mean_c, haus, avg_sym, hd95), accs
+
+def iter_model_results(vtp_files, pth_folder, output_folder, tolerances, workers=1, prefetch_depth=2, prefetch_max_bytes=None,
+                       **options):
     """
-    Load and concatenate all .pth files in a directory.
-    Return a single (N,3) array of all .pth points.
+    Yield process_model() results in the order of vtp_files.
+    With workers > 1 the models are processed concurrently in a process pool,
+    results are still streamed back in input order.
+    Serially, the files of the next prefetch_depth models are read in a
+    background thread while the current one is computed (at most
+    prefetch_max_bytes held ahead, see prefetch.prefetch).
+    options are passed on to process_model().
     """
-    segment_files = sorted(glob.glob(os.path.join(model_pth_dir, "*.pth")))
-    if not segment_files:
-        raise FileNotFoundError(f"No .pth files found in {model_pth_dir}")
-    all_points = []
-    for seg in segment_files:
-        try:
-            seg_points = load_pth_centerline(seg)
-            all_points.append(seg_points)
-        except Exception as e:
-            print(f"Failed to load {seg}: {e}")
-    if not all_points:
-        raise ValueError(f"No valid centerline points loaded from {model_pth_dir}")
-    return np.concatenate(all_points, axis=0)
-
-def main(input_folder, pth_folder, output_folder, output_scores_csv):
+    run = partial(process_model, pth_folder=pth_folder, output_folder=output_folder, tolerances=tolerances, **options)
+    if options.get("cohort_store") and (workers is None or workers <= 1):
+        # Models come from the memory-mapped store, there is nothing to read ahead
+        yield from map(run, vtp_files)
+        return
+    if workers is None or workers <= 1:
+        # With a cache the .vtp is usually not needed, only prefetch the GT and the .vtp hash (the cache key) then
+        cached = bool(options.get("cache_dir"))
+        load = partial(load_model_inputs, pth_folder=pth_folder, read_vtp=not cached, hash_vtp=cached)
+        for vtp_file, future in prefetch(vtp_files, load, prefetch_depth, prefetch_max_bytes):
+            # A failed read is retried (and reported) by process_model itself
+            yield run(vtp_file, inputs=future.result() if future.exception() is None else None)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(run, vtp_files)
+
+def main(input_folder, pth_folder, output_folder, output_scores_csv, workers=1, scoring="resampled", cache_dir=None, centerline_params=None,
+         profile=False, centerline_format="npy", cohort_archive=None, prefetch_depth=2, prefetch_max_bytes=None, subsample=None,
+         cohort_store=None):
     """
     1. Create an output folder
     2. Find all .vtp files in the 'models' directory'.
     3. Make mesh of a chosen file.
     4. Get endpoints.
-    5. Compute the centerline and save to CSV.
+    5. Compute the centerline and save it (.npy, or .csv with centerline_format="csv").
     6. Locate and compute corresponding ground truth.
-    7. Resample both centerlines to match in num_points.
+    7. Resample both centerlines to match in num_points (the GT branch by branch).
     8. Compare using mean_closest_distance, hausdorff_distance, average_symmetric_distance, hausdorff95.
     9. Plot accuracy curves.
-    10. Add the scores to CSV.
+    10. Add the scores to CSV (per-branch scores go to <basename>_branch_scores.csv).
     11. Display average of all distances after computing each .vtp file.
+
+    Steps 3-8 run per model in process_model(); set workers > 1 to run them in a
+    process pool. Rows are written in the same order as a serial run.
+    scoring="exact" skips step 7 and scores against the .pth polylines directly.
+    cache_dir keeps meshes, centerlines and GT arrays between runs, so re-scoring
+    a cohort only recomputes what the changed parameters affect.
+    profile=True writes one JSON line per model (stage seconds, call counts,
+    slice/cluster/point counters, peak RSS of the model and of the process so far) to profile.jsonl next to output_scores_csv.
+    cohort_archive: optional .npz path collecting every saved centerline as
+    case <basename> (and <basename>_gt), see centerline_io.open_cohort().
+    prefetch_depth / prefetch_max_bytes: serial runs read the files of the next
+    models in the background while computing (0 turns it off).
+    subsample: thin the mesh points before step 5, e.g. {"method": "voxel", "spacing": 0.2}
+    (see subsample.py and test_codes/subsample_report.py for choosing the spacing).
+    cohort_store: .npz written once by cohort_store.ingest_cohort(); worker processes
+    then map the mesh points and GT from it instead of parsing the .vtp/.pth files
+    (models missing from it or changed since are still read from the files).
     """
     os.makedirs(output_folder, exist_ok=True)
-    vtp_files = glob.glob(os.path.join(input_folder, "*.vtp"))
+    vtp_files = sorted(glob.glob(os.path.join(input_folder, "*.vtp")))
     print(f"Found {len(vtp_files)} .vtp files in {input_folder}")
 
-    all_mean = []
-    all_haus = []
-    all_avg_sym = []
-    all_hd95 = []
-    all_accuracy_curves = []
-    n_scored = 0
-
-
     tolerances = np.linspace(0.5, 10, 20)  # 0.5mm to 10mm
+    cohort = CohortScores(tolerances)
+    profile_jsonl = os.path.join(os.path.dirname(os.path.abspath(output_scores_csv)), "profile.jsonl")
+    if profile:
+        open(profile_jsonl, 'w').close()
 
-    with open(output_scores_csv, 'w') as score_file:
+    archive = CohortWriter(cohort_archive) if cohort_archive else nullcontext()
+    with open(output_scores_csv, 'w') as score_file, archive:
         score_file.write("filename,mean_closest,hausdorff,avg_symmetric,hausdorff95\n")
-        for vtp_file in vtp_files:
-            print(f"Processing: {vtp_file}")
-            polydata = read_file(vtp_file)
-            points = make_mesh(polydata)
-            start, end = make_endpoints(points)
-            centerline = compute_slice_centerline(points)
-            basename = os.path.splitext(os.path.basename(vtp_file))[0]
-
-            out_csv = os.path.join(output_folder, f"{basename}_centerline.csv")
-            save_centerline_csv(centerline, out_csv)
-
-            model_pth_dir = os.path.join(pth_folder, basename, "paths")
-            if not os.path.exists(model_pth_dir):
-                print(f"Ground truth dir not found for {basename}")
-                score_file.write(f"{basename},,,,\n")
-                continue
-            try:
-                gt_centerline = load_all_segments(model_pth_dir)
-            except Exception as e:
-                print(f"Failed to load segments for {basename}: {e}")
+        results = iter_model_results(vtp_files, pth_folder, output_folder, tolerances, workers, scoring=scoring,
+                                     cache_dir=cache_dir, centerline_params=centerline_params, profile=profile,
+                                     centerline_format=centerline_format, prefetch_depth=prefetch_depth,
+                                     prefetch_max_bytes=prefetch_max_bytes, subsample=subsample, cohort_store=cohort_store)
+        for basename, scores, accs, record in results:
+            if record is not None:
+                append_jsonl([record], profile_jsonl)
+            if cohort_archive:
+                archive.add(basename, load_centerline(centerline_file(output_folder, f"{basename}_centerline", centerline_format)))
+                gt_path = centerline_file(output_folder, f"{basename}_centerline_gt", centerline_format)
+                # Only there when this run wrote it, run_model removes any older one first
+                if os.path.exists(gt_path):
+                    archive.add(f"{basename}_gt", load_centerline(gt_path))
+            if scores is None:
                 score_file.write(f"{basename},,,,\n")
                 continue
+            mean_c, haus, avg_sym, hd95 = scores
+            score_file.write(f"{basename},{mean_c},{haus},{avg_sym},{hd95}\n")
+            cohort.add(scores, accs)
 
-            gt_csv = os.path.join(output_folder, f"{basename}_centerline_gt.csv")
-            save_centerline_csv(gt_centerline, gt_csv)
-
-            num_points = 100
-            try:
-                pred_rs = resample_line(centerline, num_points)
-                gt_rs = resample_line(gt_centerline, num_points)
-
-                mean_c = mean_closest_distance(pred_rs, gt_rs)
-                haus = hausdorff_distance(pred_rs, gt_rs)
-                avg_sym = average_symmetric_distance(pred_rs, gt_rs)
-                hd95 = hausdorff95_distance(pred_rs, gt_rs)
-
-
-                tols, accs = accuracy_over_tolerance(pred_rs, gt_rs, tolerances)
-                all_accuracy_curves.append(accs)
-
-                print(f"Scores for {basename}: mean={mean_c:.3f}, hausdorff={haus:.3f}, avg_sym={avg_sym:.3f}, hd95={hd95:.3f}")
-                score_file.write(f"{basename},{mean_c},{haus},{avg_sym},{hd95}\n")
-                all_mean.append(mean_c)
-                all_haus.append(haus)
-                all_avg_sym.append(avg_sym)
-                all_hd95.append(hd95)
-                n_scored += 1
-
-                # Uncomment this if you need to check the acc over tolerance plot for every model
-                # plt.figure()
-                # plt.plot(tols, accs, marker='o')
-                # plt.xlabel('Tolerance (mm)')
-                # plt.ylabel('Accuracy (fraction within tolerance)')
-                # plt.title(f'{basename}: Accuracy vs. Tolerance')
-                # plt.grid(True)
-                # plt.show()
-
-            except Exception as e:
-                print(f"Scoring failed for {vtp_file}: {e}")
-                score_file.write(f"{basename},,,,\n")
-
-        if n_scored:
-            avg_mean = np.mean(all_mean)
-            avg_haus = np.mean(all_haus)
-            avg_avg_sym = np.mean(all_avg_sym)
-            avg_hd95 = np.mean(all_hd95)
+        if cohort.count:
+            averages = cohort.means()
+            avg_mean = averages["mean_closest"]
+            avg_haus = averages["hausdorff"]
+            avg_avg_sym = averages["avg_symmetric"]
+            avg_hd95 = averages["hausdorff95"]
 
-            avg_acc_curve = np.mean(all_accuracy_curves, axis=0) * 100
+            avg_acc_curve = averages["accuracy"] * 100
 
             print(f"\nAverage scores for all models:")
             print(f"  Mean Closest Distance: {avg_mean:.3f} mm")
@@ -183,4 +387,16 @@ if __name__ == "__main__":
     pth_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\pths"
     output_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\centerlines_auto"
     output_scores_csv = os.path.join(output_folder, "accuracy_scores_vs_pth.csv")
-    main(input_folder, pth_folder, output_folder, output_scores_csv)
\ No newline at end of file
+    workers = 1  # >1 runs the models in a process pool
+    scoring = "resampled"  # or "exact" for point-to-polyline distances without resampling
+    cache_dir = None  # e.g. r"C:\Users\robik\PyCharmMiscProject\VTK\cache" to reuse results between runs
+    profile = False  # True writes per-model stage timings to profile.jsonl next to the scores CSV
+    centerline_format = "npy"  # or "csv" for text files
+    cohort_archive = os.path.join(output_folder, "centerlines.npz")  # None to skip the per-cohort archive
+    prefetch_depth = 2  # models read ahead in serial runs, 0 to read each model when it is processed
+    prefetch_max_bytes = 1 << 30  # cap on file contents held ahead
+    subsample = None  # e.g. {"method": "voxel", "spacing": 0.2} for dense meshes
+    cohort_store = None  # e.g. os.path.join(output_folder, "cohort_store.npz") after cohort_store.ingest_cohort()
+    main(input_folder, pth_folder, output_folder, output_scores_csv, workers=workers, scoring=scoring, cache_dir=cache_dir,
+         profile=profile, centerline_format=centerline_format, cohort_archive=cohort_archive, prefetch_depth=prefetch_depth,
+         prefetch_max_bytes=prefetch_max_bytes, subsample=subsample, cohort_store=cohort_store)
\ No newline at end of file
@@ -1,8 +1,9 @@
 import vtk
-import numpy as np
-import xml.etree.ElementTree as ET
 import glob
 import os
+from make_mesh import make_polyline
+from load_path import load_pth_centerline
+from centerline_io import load_centerline
 
 def load_vtk_model(filename):
     if filename.endswith('.vtp'):
@@ -16,25 +17,8 @@ def load_vtk_model(filename):
     return reader.GetOutput()
 
 def load_csv_centerline(filename):
-    return np.loadtxt(filename, delimiter=',', skiprows=1)  # skip header
-
-def load_pth_centerline(pth_file):
-    with open(pth_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    start = content.find("<path")
-    end = content.rfind("</path>") + len("</path>")
-    if start == -1 or end == -1:
-        raise ValueError(f"Could not find <path> block in {pth_file}")
-    xml_str = content[start:end]
-    root = ET.fromstring(xml_str)
-    points = []
-    for path_point in root.findall(".//path_points/path_point"):
-        pos = path_point.find("pos")
-        x = float(pos.attrib['x'])
-        y = float(pos.attrib['y'])
-        z = float(pos.attrib['z'])
-        points.append([x, y, z])
-    return np.array(points)
+    """Read a saved centerline, .npy (memory-mapped) or .csv."""
+    return load_centerline(filename)
 
 def filter_points_by_bounds(points, bounds):
     mask = (
@@ -45,17 +29,7 @@ def filter_points_by_bounds(points, bounds):
     return points[mask]
 
 def make_polydata_from_points(pts):
-    vtk_points = vtk.vtkPoints()
-    for pt in pts:
-        vtk_points.InsertNextPoint(pt)
-    lines = vtk.vtkCellArray()
-    lines.InsertNextCell(len(pts))
-    for j in range(len(pts)):
-        lines.InsertCellPoint(j)
-    poly_data = vtk.vtkPolyData()
-    poly_data.SetPoints(vtk_points)
-    poly_data.SetLines(lines)
-    return poly_data
+    return make_polyline(pts)
 
 def show_model_with_centerlines(model_file, manual_csv, pth_gt_dir):
     model = load_vtk_model(model_file)
@@ -119,6 +93,6 @@ def show_model_with_centerlines(model_file, manual_csv, pth_gt_dir):
 
 if __name__ == "__main__":
     model_file = r"C:\Users\robik\PyCharmMiscProject\VTK\models\0140_2001.vtp"
-    manual_csv = r"C:\Users\robik\PyCharmMiscProject\VTK\centerlines_manual\0140_2001_centerline.csv"
+    manual_csv = r"C:\Users\robik\PyCharmMiscProject\VTK\centerlines_manual\0140_2001_centerline.npy"  # .csv files from older runs work too
     pth_gt_dir = r"C:\Users\robik\PyCharmMiscProject\VTK\pths\0140_2001\paths"
     show_model_with_centerlines(model_file, manual_csv, pth_gt_dir)
\ No newline at end of file
@@ -1,6 +1,10 @@
 import numpy as np
+from scipy.spatial import ConvexHull, QhullError
 
-def make_endpoints(points):
+def make_endpoints_bruteforce(points):
+    """
+    Reference O(N^2) farthest pair search, kept for validation and benchmarks.
+    """
     max_dist = 0
     start, end = 0, 0
     n = len(points)
@@ -12,4 +16,78 @@ def make_endpoints(points):
         if dists[j] > max_dist:
             max_dist = dists[j]
             start, end = i, i + 1 + j
-    return start, end
\ No newline at end of file
+    return start, end
+
+def _farthest_pair_among(points, candidates):
+    """
+    Same scan as make_endpoints_bruteforce, restricted to the sorted candidate
+    indices, so ties resolve to the same (start, end) pair.
+    """
+    cand_pts = points[candidates]
+    max_dist = 0
+    start, end = 0, 0
+    for k in range(len(candidates) - 1):
+        dists = np.linalg.norm(cand_pts[k+1:] - cand_pts[k], axis=1)
+        j = np.argmax(dists)
+        if dists[j] > max_dist:
+            max_dist = dists[j]
+            start, end = candidates[k], candidates[k + 1 + j]
+    return int(start), int(end)
+
+def _with_duplicates(points, candidates):
+    """
+    Add every point whose coordinates equal a candidate point. Qhull keeps only
+    one index per duplicated vertex, the brute force scan prefers the lowest one.
+    """
+    cand_pts = points[candidates]
+    maybe = np.nonzero(np.isin(points[:, 0], cand_pts[:, 0]))[0]
+    same = np.isin(_row_keys(points[maybe]), _row_keys(cand_pts))
+    return np.union1d(candidates, maybe[same])
+
+def _row_keys(points):
+    points = np.ascontiguousarray(points)
+    return points.view(np.dtype((np.void, points.dtype.itemsize * points.shape[1]))).ravel()
+
+def _grid_representatives(points, rel_err):
+    """
+    Keep one point per grid cell. The cell size is chosen so that the farthest
+    pair of the representatives is at least (1 - rel_err) times the diameter.
+    """
+    lo = points.min(axis=0)
+    extent = points.max(axis=0) - lo
+    # diameter >= bbox diagonal / sqrt(3); each endpoint moves at most one cell diagonal
+    cell = rel_err * np.linalg.norm(extent) / 6.0
+    if cell <= 0:
+        return np.arange(len(points))
+    cells = ((points - lo) / cell).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, reps = np.unique(keys, return_index=True)
+    return np.sort(reps)
+
+def _hull_vertices(points, subset):
+    return np.sort(subset[ConvexHull(points[subset]).vertices])
+
+def make_endpoints(points, approx=None, min_hull_points=64):
+    """
+    Find the two mesh vertices farthest apart (the point cloud diameter).
+    The exact search only scans the convex hull vertices, which always contain
+    the farthest pair, and returns the same (start, end) as the brute force loop.
+    approx: optional relative error bound (e.g. 0.01). The hull is then built on
+    one point per grid cell and the returned pair is guaranteed to be at least
+    (1 - approx) times the true diameter. Ties are not matched in this mode.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    if n < min_hull_points:
+        return make_endpoints_bruteforce(points)
+    try:
+        if approx is not None:
+            reps = _grid_representatives(points, approx)
+            return _farthest_pair_among(points, _hull_vertices(points, reps))
+        candidates = _hull_vertices(points, np.arange(n))
+    except QhullError:
+        # Flat or degenerate cloud, no 3D hull
+        return make_endpoints_bruteforce(points)
+    candidates = _with_duplicates(points, candidates)
+    return _farthest_pair_among(points, candidates)
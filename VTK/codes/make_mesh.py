@@ -1,6 +1,43 @@
 import numpy as np
+import vtk
+from vtk.util.numpy_support import vtk_to_numpy, numpy_to_vtk, numpy_to_vtkIdTypeArray, get_numpy_array_type
 
-def make_mesh(polydata):
+VTK_ID_DTYPE = get_numpy_array_type(vtk.VTK_ID_TYPE)
+
+def make_mesh(polydata, copy=False):
+    """
+    Return the mesh vertices as an (N, 3) array.
+    By default this is a zero-copy view of the vtkPoints data in the dtype it is
+    stored in (float32 or float64), so writes go through to the mesh.
+    Pass copy=True for an independent array.
+    """
     points = polydata.GetPoints()
-    np_points = np.array([points.GetPoint(i) for i in range(points.GetNumberOfPoints())])
-    return np_points
\ No newline at end of file
+    if points is None:
+        return np.empty((0, 3))
+    np_points = vtk_to_numpy(points.GetData())
+    if copy:
+        np_points = np_points.copy()
+    return np_points
+
+def make_vtk_points(points):
+    """Bulk-load an (N, 3) array into vtkPoints (one copy, no per-point calls)."""
+    points = np.asarray(points)
+    if points.dtype not in (np.float32, np.float64):
+        points = points.astype(np.float64)
+    vtk_points = vtk.vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(np.ascontiguousarray(points).reshape(-1, 3), deep=True))
+    return vtk_points
+
+def make_polyline(points):
+    """Polydata with a single polyline through all points, in order."""
+    n = len(points)
+    lines = vtk.vtkCellArray()
+    # A single point still gets its (one-point) line cell, so it renders
+    if n >= 1:
+        offsets = numpy_to_vtkIdTypeArray(np.array([0, n], dtype=VTK_ID_DTYPE), deep=True)
+        connectivity = numpy_to_vtkIdTypeArray(np.arange(n, dtype=VTK_ID_DTYPE), deep=True)
+        lines.SetData(offsets, connectivity)
+    poly_data = vtk.vtkPolyData()
+    poly_data.SetPoints(make_vtk_points(points))
+    poly_data.SetLines(lines)
+    return poly_data
@@ -1,62 +1,269 @@
+import os
+import tempfile
+import collections
 import numpy as np
-from sklearn.cluster import DBSCAN
 from scipy.ndimage import gaussian_filter1d
-import vtk
+from slice_clustering import get_cluster_backend
+from slice_tracking import get_tracker
+from inside_mesh import InsideTester
+from profiling import get_profiler
 
 def filter_points_inside_mesh(points, polydata):
-    enclosed = vtk.vtkSelectEnclosedPoints()
-    enclosed.SetSurfaceData(polydata)
-    vtk_points = vtk.vtkPoints()
-    for pt in points:
-        vtk_points.InsertNextPoint(pt)
-    test_poly = vtk.vtkPolyData()
-    test_poly.SetPoints(vtk_points)
-    enclosed.SetInputData(test_poly)
-    enclosed.Update()
-    mask = [enclosed.IsInside(i) for i in range(points.shape[0])]
-    return points[mask]
-
-def compute_slice_centerline(points, polydata=None, axis=2, dz=1.0, eps=0.5, min_samples=5, max_jump=10.0, sigma=1.0):
-    centerline = []
-    coord = points[:, axis]
-    zmin, zmax = np.min(coord), np.max(coord)
-    slices = np.arange(zmin, zmax, dz)
-    prev_center = None
+    """
+    Keep the points inside the closed surface.
+    polydata may be a vtkPolyData or an InsideTester built once for the mesh,
+    which makes repeated calls on the same mesh almost free.
+    """
+    tester = polydata if isinstance(polydata, InsideTester) else InsideTester(polydata)
+    return points[tester(points)]
+
+def slice_index(coord, slices, dz):
+    """
+    Slice of each coordinate for the slices [z, z + dz).
+    Return (k, inside, overlap): point i belongs to slice k[i] when inside[i],
+    and also to slice k[i] - 1 when overlap[i] (slice ends can overlap the next
+    slice start by one ulp).
+    """
+    ends = slices + dz
+    k = np.searchsorted(slices, coord, side='right') - 1
+    inside = coord < ends[k]
+    overlap = (k > 0) & (coord < ends[np.maximum(k - 1, 0)])
+    return k, inside, overlap
+
+def slice_blocks(coord, dz):
+    """
+    Bin points into the slices [z, z + dz) with z = arange(min, max, dz).
+    Return (slices, order, bounds, extra): the points of slice k are
+    order[bounds[k]:bounds[k + 1]], in their original index order, so taking
+    points[order] once makes every slice a contiguous view.
+    Matches the per-slice mask (coord >= z) & (coord < z + dz) exactly; the rare
+    points that also fall in the previous slice through rounding are listed in
+    extra[k] for that slice.
+    """
+    slices = np.arange(np.min(coord), np.max(coord), dz)
+    if len(slices) == 0:
+        return slices, np.empty(0, dtype=np.intp), np.zeros(1, dtype=np.intp), {}
+    k, inside, overlap = slice_index(coord, slices, dz)
+    extra = {}
+    for i in np.nonzero(overlap)[0]:
+        extra.setdefault(int(k[i]) - 1, []).append(i)
+    idx = np.nonzero(inside)[0]
+    order = idx[np.argsort(k[idx], kind='stable')]
+    bounds = np.searchsorted(k[order], np.arange(len(slices) + 1), side='left')
+    return slices, order, bounds, extra
+
+def iter_slices(points, axis=2, dz=1.0):
+    """Yield the points of every slice along axis, in slice order (empty slices included)."""
+    # Slice bounds in float64 even when the mesh is stored as float32
+    coord = np.asarray(points[:, axis], dtype=np.float64)
+    slices, order, bounds, extra = slice_blocks(coord, dz)
+    sorted_pts = points[order]
+    for k in range(len(slices)):
+        if k in extra:
+            yield points[np.union1d(order[bounds[k]:bounds[k + 1]], extra[k])]
+        else:
+            yield sorted_pts[bounds[k]:bounds[k + 1]]
+
+def _chunks(n, chunk_size):
+    for start in range(0, n, chunk_size):
+        yield start, min(start + chunk_size, n)
+
+def iter_slices_external(points, axis=2, dz=1.0, chunk_size=1 << 20, tmp_dir=None):
+    """
+    iter_slices() for point arrays that do not fit in memory, e.g. an np.memmap
+    or the path of an (N, 3) .npy file.
+    The points are read chunk_size rows at a time and counting-sorted by slice
+    into a temporary file in tmp_dir, so peak memory is one chunk plus one slice
+    whatever the mesh size. Yields the same arrays, in the same point
+    order, as iter_slices().
+    """
+    if isinstance(points, (str, os.PathLike)):
+        points = np.load(points, mmap_mode='r')
+    n = len(points)
+    if n == 0:
+        return
+    lo, hi = np.inf, -np.inf
+    for a, b in _chunks(n, chunk_size):
+        coord = np.asarray(points[a:b, axis], dtype=np.float64)
+        lo, hi = min(lo, coord.min()), max(hi, coord.max())
+    slices = np.arange(lo, hi, dz)
+    if len(slices) == 0:
+        return
+
+    def chunk_entries(a, b):
+        # (slice, row) pairs of one chunk, sorted by slice then row
+        k, inside, overlap = slice_index(np.asarray(points[a:b, axis], dtype=np.float64), slices, dz)
+        rows = np.concatenate([np.nonzero(inside)[0], np.nonzero(overlap)[0]])
+        keys = np.concatenate([k[inside], k[overlap] - 1])
+        order = np.lexsort((rows, keys))
+        return keys[order], rows[order]
+
+    counts = np.zeros(len(slices), dtype=np.int64)
+    for a, b in _chunks(n, chunk_size):
+        keys, _ = chunk_entries(a, b)
+        counts += np.bincount(keys, minlength=len(slices))
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    row_bytes = 3 * points.dtype.itemsize
+    fd, path = tempfile.mkstemp(suffix=".slices", dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'w+b') as f:
+            f.truncate(int(bounds[-1]) * row_bytes)
+            filled = bounds[:-1].copy()
+            # Chunks come in row order, so every slice stays in original point order
+            for a, b in _chunks(n, chunk_size):
+                keys, rows = chunk_entries(a, b)
+                if len(keys) == 0:
+                    continue
+                chunk = np.ascontiguousarray(np.asarray(points[a:b])[rows])
+                runs = np.flatnonzero(np.diff(keys)) + 1
+                for lo, hi in zip(np.concatenate([[0], runs]), np.concatenate([runs, [len(keys)]])):
+                    f.seek(int(filled[keys[lo]]) * row_bytes)
+                    f.write(chunk[lo:hi].tobytes())
+                filled += np.bincount(keys, minlength=len(slices))
+            for k in range(len(slices)):
+                f.seek(int(bounds[k]) * row_bytes)
+                yield np.fromfile(f, dtype=points.dtype, count=3 * int(counts[k])).reshape(-1, 3)
+    finally:
+        os.remove(path)
+
+def cluster_centroids(slice_pts, labels):
+    """(centroids, sizes) of the clusters of one slice, noise (label -1) left out."""
+    valid_labels = [label for label in np.unique(labels) if label != -1]
+    centroids = [np.mean(slice_pts[labels == label], axis=0, dtype=np.float64) for label in valid_labels]
+    sizes = [np.sum(labels == label) for label in valid_labels]
+    return np.array(centroids).reshape(-1, 3), sizes
+
+def track_slice_centers(slice_iter, axis=2, eps=0.5, min_samples=5, max_jump=10.0, cluster_backend="grid", tracker="greedy"):
+    """
+    Cluster every slice in 2D and yield one center per slice, following the
+    cluster closest to the previous center (the largest cluster to start).
+    Slices without a cluster are skipped.
+    cluster_backend: name in slice_clustering.CLUSTER_BACKENDS or a callable
+    (points2d, eps, min_samples) -> labels. "sklearn" is the reference DBSCAN.
+    tracker: name in slice_tracking.TRACKERS or a callable(slice_clusters, max_jump, axis);
+    "viterbi" picks the globally cheapest track and may skip stray slices.
+    Counts slices, points and clusters and times the clustering on the active
+    profiler (profiling.get_profiler()).
+    """
+    cluster = get_cluster_backend(cluster_backend)
+    track = get_tracker(tracker)
+    profiler = get_profiler()
     axes = [i for i in range(3) if i != axis]
-    for slice in slices:
-        mask = (coord >= slice) & (coord < slice + dz)
-        slice_pts = points[mask]
-        if len(slice_pts) == 0:
-            continue
-        y = slice_pts[:, axes]
-        clustering = DBSCAN(eps=eps, min_samples=min_samples).fit(y)
-        labels = clustering.labels_
-        valid_labels = [label for label in np.unique(labels) if label != -1]
-        if not valid_labels:
+
+    def slice_clusters():
+        for slice_pts in slice_iter:
+            if len(slice_pts) == 0:
+                continue
+            y = slice_pts[:, axes].astype(np.float64)
+            with profiler.stage("cluster"):
+                labels = cluster(y, eps, min_samples)
+            centroids, sizes = cluster_centroids(slice_pts, labels)
+            profiler.count("slices")
+            profiler.count("slice_points", len(y))
+            profiler.count("clusters", len(sizes))
+            yield centroids, sizes
+
+    yield from track(slice_clusters(), max_jump, axis)
+
+def smooth_centers(centers, sigma=1.0):
+    """
+    Online gaussian_filter1d(axis=0) over a stream of points.
+    Each output only needs the int(4 * sigma + 0.5) neighbours on either side, so
+    it is computed from that window as soon as they have arrived; the results
+    are bit-identical to filtering the whole array. Like compute_slice_centerline,
+    a single point is passed through unsmoothed.
+    """
+    if sigma <= 0:
+        yield from centers
+        return
+    radius = int(4.0 * float(sigma) + 0.5)
+    window = collections.deque()
+    first = 0  # stream index of window[0]
+    nxt = 0  # next stream index to emit
+    n = 0
+    for center in centers:
+        window.append(center)
+        n += 1
+        if n < 2:
             continue
-        centroids = []
-        for label in valid_labels:
-            cluster_pts = slice_pts[labels == label]
-            center = np.mean(cluster_pts, axis=0)
-            centroids.append(center)
-        centroids = np.array(centroids)
-        if prev_center is None:
-            sizes = [np.sum(labels == label) for label in valid_labels]
-            chosen = np.argmax(sizes)
-        else:
-            dists = np.linalg.norm(centroids - prev_center, axis=1)
-            close_clusters = np.where(dists < max_jump)[0]
-            if len(close_clusters) > 0:
-                chosen = close_clusters[np.argmin(dists[close_clusters])]
-            else:
-                chosen = np.argmin(dists)
-        chosen_center = centroids[chosen]
-        centerline.append(chosen_center)
-        prev_center = chosen_center
-    centerline = np.array(centerline)
+        while nxt + radius < n:
+            lo = max(0, nxt - radius)
+            while first < lo:
+                window.popleft()
+                first += 1
+            yield gaussian_filter1d(np.array(window), sigma=sigma, axis=0)[nxt - first]
+            nxt += 1
+    if n == 1:
+        yield window[0]
+        return
+    while nxt < n:
+        lo = max(0, nxt - radius)
+        while first < lo:
+            window.popleft()
+            first += 1
+        yield gaussian_filter1d(np.array(window), sigma=sigma, axis=0)[nxt - first]
+        nxt += 1
+
+def iter_slice_centerline(points, polydata=None, axis=2, dz=1.0, eps=0.5, min_samples=5, max_jump=10.0, sigma=1.0,
+                          cluster_backend="grid", chunk_size=1 << 20, tmp_dir=None, tracker="greedy"):
+    """
+    Streaming compute_slice_centerline: yield the centerline points one by one
+    with O(chunk + slice) memory, for meshes given as an np.memmap or .npy path.
+    np.array(list(iter_slice_centerline(...))) equals compute_slice_centerline(...).
+    """
+    slice_iter = iter_slices_external(points, axis, dz, chunk_size, tmp_dir)
+    centers = track_slice_centers(slice_iter, axis, eps, min_samples, max_jump, cluster_backend, tracker)
+    if polydata is not None and not isinstance(polydata, InsideTester):
+        polydata = InsideTester(polydata)
+    for center in smooth_centers(centers, sigma):
+        if polydata is None or polydata(center[None])[0]:
+            yield center
+
+def slice_frame(direction):
+    """
+    Orthonormal rows (u, v, w) with w along direction, for slicing along an
+    arbitrary direction: points @ frame.T are coordinates with axis 2 = w.
+    """
+    w = np.asarray(direction, dtype=np.float64)
+    norm = np.linalg.norm(w)
+    if w.shape != (3,) or norm == 0:
+        raise ValueError(f"direction must be a non-zero 3-vector, got {direction}")
+    w = w / norm
+    # Start from the coordinate axis least aligned with w
+    u = np.cross(w, np.eye(3)[np.argmin(np.abs(w))])
+    u /= np.linalg.norm(u)
+    return np.array([u, np.cross(w, u), w])
+
+def compute_slice_centerline(points, polydata=None, axis=2, dz=1.0, eps=0.5, min_samples=5, max_jump=10.0, sigma=1.0,
+                             cluster_backend="grid", direction=None, tracker="greedy"):
+    """
+    polydata: optional vtkPolyData or InsideTester; centerline points outside it are dropped.
+    cluster_backend: name in slice_clustering.CLUSTER_BACKENDS or a callable
+    (points2d, eps, min_samples) -> labels. "sklearn" is the reference DBSCAN.
+    direction: optional 3-vector to slice along instead of the coordinate axis.
+    tracker: "greedy" follows the nearest cluster slice by slice, "viterbi"
+    finds the cheapest track over all slices and bridges stray or empty
+    slices (slice_tracking.TRACKERS, or a callable).
+    See iter_slice_centerline() for meshes that do not fit in memory and
+    curved_slicing.compute_curved_centerline() for slices that follow the vessel.
+    """
+    profiler = get_profiler()
+    profiler.count("points", len(points))
+    frame = None
+    if direction is not None:
+        frame = slice_frame(direction)
+        points = np.asarray(points, dtype=np.float64) @ frame.T
+        axis = 2
+    centers = track_slice_centers(iter_slices(points, axis, dz), axis, eps, min_samples, max_jump, cluster_backend, tracker)
+    centerline = np.array(list(centers))
     if sigma > 0 and len(centerline) > 1:
         centerline = gaussian_filter1d(centerline, sigma=sigma, axis=0)
+    if frame is not None and len(centerline) > 0:
+        centerline = centerline @ frame
     # Remove any points outside the mesh surface
     if polydata is not None and len(centerline) > 0:
-        centerline = filter_points_inside_mesh(centerline, polydata)
+        with profiler.stage("inside_mesh"):
+            centerline = filter_points_inside_mesh(centerline, polydata)
+    profiler.count("centerline_points", len(centerline))
     return centerline
\ No newline at end of file
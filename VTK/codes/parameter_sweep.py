@@ -0,0 +1,188 @@
+import os
+import glob
+import time
+import itertools
+from functools import partial, lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+from read_file import read_file
+from make_mesh import make_mesh
+from load_path import load_branches
+from artifact_cache import resolve_params
+from cohort_store import attach
+from manhattan_center import compute_slice_centerline, iter_slices, cluster_centroids
+from slice_tracking import get_tracker
+from slice_clustering import grid_neighbor_pairs, labels_from_pairs
+from centerline_scoring import resample_branches, resample_line, score_all, score_all_exact
+
+SWEEP_PARAMS = ("dz", "eps", "min_samples", "max_jump", "sigma")
+METRICS = ("mean_closest", "hausdorff", "avg_symmetric", "hausdorff95")
+
+def parameter_grid(**values):
+    """
+    Every combination of the given compute_slice_centerline parameters, e.g.
+    parameter_grid(dz=[0.5, 1.0], eps=[0.3, 0.5]); the others keep their defaults.
+    Return a list of {dz, eps, min_samples, max_jump, sigma} dicts.
+    """
+    unknown = set(values) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Cannot sweep {sorted(unknown)}, expected some of {SWEEP_PARAMS}")
+    defaults = resolve_params(compute_slice_centerline)
+    axes = [np.atleast_1d(values.get(name, defaults[name])).tolist() for name in SWEEP_PARAMS]
+    return [dict(zip(SWEEP_PARAMS, combo)) for combo in itertools.product(*axes)]
+
+def _groups(grid, name):
+    """Split grid into runs of equal `name` (grid sorted by SWEEP_PARAMS)."""
+    for value, group in itertools.groupby(grid, key=lambda params: params[name]):
+        yield value, list(group)
+
+def sweep_centerlines(points, grid, axis=2, tracker="greedy"):
+    """
+    Yield (params, centerline) for every parameter set in grid, equal to
+    compute_slice_centerline(points, axis=axis, tracker=tracker, **params) but sharing the work:
+    slices are binned once per dz, neighbour pairs found once per slice at the
+    largest eps (smaller eps keep the pairs within reach), DBSCAN labels and
+    cluster centroids computed once per (dz, eps, min_samples), tracking once
+    per max_jump, so only the smoothing runs for every sigma.
+    """
+    axes = [i for i in range(3) if i != axis]
+    track = get_tracker(tracker)
+    grid = sorted(grid, key=lambda params: tuple(params[name] for name in SWEEP_PARAMS))
+    for dz, dz_grid in _groups(grid, "dz"):
+        slices = [s for s in iter_slices(points, axis, dz) if len(s)]
+        max_eps = max(params["eps"] for params in dz_grid)
+        pairs = [grid_neighbor_pairs(s[:, axes].astype(np.float64), max_eps, return_distances=True) for s in slices]
+        for eps, eps_grid in _groups(dz_grid, "eps"):
+            within = [d2 <= eps * eps for _, _, d2 in pairs]
+            eps_pairs = [(src[w], dst[w]) for (src, dst, _), w in zip(pairs, within)]
+            for min_samples, ms_grid in _groups(eps_grid, "min_samples"):
+                clusters = [cluster_centroids(s, labels_from_pairs(len(s), src, dst, min_samples))
+                            for s, (src, dst) in zip(slices, eps_pairs)]
+                for max_jump, jump_grid in _groups(ms_grid, "max_jump"):
+                    centers = np.array(list(track(clusters, max_jump, axis))).reshape(-1, 3)
+                    for params in jump_grid:
+                        centerline = centers
+                        if params["sigma"] > 0 and len(centers) > 1:
+                            centerline = gaussian_filter1d(centers, sigma=params["sigma"], axis=0)
+                        yield params, centerline
+
+def score_centerline(centerline, gt_branches, tolerances, scoring="resampled"):
+    """centerline_scoring metrics as main_auto_gt computes them, plus the mean of the accuracy curve."""
+    if len(centerline) < 2:
+        return None
+    if scoring == "exact":
+        scores = score_all_exact(centerline, list(gt_branches.values()), tolerances, workers=1)
+    else:
+        scores = score_all(resample_line(centerline, 100), resample_branches(gt_branches.values(), 100), tolerances, workers=1)
+    row = {metric: float(scores[metric]) for metric in METRICS}
+    row["mean_accuracy"] = float(np.mean(scores["accuracy"]))
+    return row
+
+@lru_cache(maxsize=1)
+def load_case(vtp_file, pth_folder, cohort_store=None):
+    """
+    Mesh points and .pth branches of one model, or None without ground truth.
+    The last case is kept, so the tasks of one model running in the same
+    process (or serially) read it once. With a cohort_store path (see
+    cohort_store.ingest_cohort) both are zero-copy views of the mapped store,
+    each read from the files instead when it changed since the ingest.
+    """
+    basename = os.path.splitext(os.path.basename(vtp_file))[0]
+    model_pth_dir = os.path.join(pth_folder, basename, "paths")
+    store = attach(cohort_store) if cohort_store else None
+    points = branches = None
+    if store is not None and store.is_current(basename, vtp_file):
+        points = store.points(basename)
+        if store.gt_is_current(basename, model_pth_dir):
+            branches = store.branches(basename)
+    if branches is None:
+        if not os.path.exists(model_pth_dir):
+            print(f"Ground truth dir not found for {basename}")
+            return None
+        branches = load_branches(model_pth_dir)
+    if points is None:
+        print(f"Sweeping: {vtp_file}")
+        points = make_mesh(read_file(vtp_file), copy=True)
+    return points, branches
+
+def sweep_case(vtp_file, pth_folder, grid, tolerances, scoring="resampled", axis=2, cohort_store=None, tracker="greedy"):
+    """Score every parameter set in grid on one model. Return the table rows."""
+    case = load_case(vtp_file, pth_folder, cohort_store)
+    if case is None:
+        return []
+    points, gt_branches = case
+    basename = os.path.splitext(os.path.basename(vtp_file))[0]
+    rows = []
+    t0 = time.perf_counter()
+    for params, centerline in sweep_centerlines(points, grid, axis, tracker):
+        row = {"case": basename, **params, "centerline_points": len(centerline)}
+        scores = score_centerline(centerline, gt_branches, tolerances, scoring)
+        row.update(scores or {metric: np.nan for metric in METRICS + ("mean_accuracy",)})
+        rows.append(row)
+    print(f"{basename}: {len(rows)} parameter sets in {time.perf_counter() - t0:.2f} s")
+    return rows
+
+def save_rows_csv(rows, out_path):
+    """Tidy table: one row per (case, parameter set), one column per parameter and metric."""
+    columns = ["case", *SWEEP_PARAMS, "centerline_points", *METRICS, "mean_accuracy"]
+    with open(out_path, 'w') as f:
+        f.write(",".join(columns) + "\n")
+        for row in rows:
+            f.write(",".join("" if isinstance(row[c], float) and np.isnan(row[c]) else str(row[c]) for c in columns) + "\n")
+
+def rank_params(rows, metric="hausdorff95"):
+    """Parameter sets sorted by their mean `metric` over the cases (lower is better), as (mean, params) pairs."""
+    by_params = {}
+    for row in rows:
+        key = tuple(row[name] for name in SWEEP_PARAMS)
+        by_params.setdefault(key, []).append(row[metric])
+    ranked = [(float(np.mean(values)), dict(zip(SWEEP_PARAMS, key))) for key, values in by_params.items()]
+    return sorted(ranked, key=lambda item: np.inf if np.isnan(item[0]) else item[0])
+
+def main(input_folder, pth_folder, output_csv, grid=None, workers=1, scoring="resampled", axis=2, metric="hausdorff95",
+         cohort_store=None, tracker="greedy"):
+    """
+    Score every compute_slice_centerline parameter set in grid (see
+    parameter_grid) on every model with ground truth, without rerunning
+    main_auto_gt per combination: each model is read once and the slicing and
+    clustering are shared between parameter sets (see sweep_centerlines).
+    With workers > 1 the (model, dz) pairs are swept in a process pool, the
+    parameter sets of one dz share their slices so they stay in one task.
+    cohort_store: optional store from cohort_store.ingest_cohort(), so the
+    workers map the models instead of each parsing them.
+    tracker: slice tracker used for every parameter set ("greedy" or "viterbi").
+    Writes the tidy table to output_csv and returns the ranked parameter sets.
+    """
+    grid = parameter_grid() if grid is None else grid
+    vtp_files = sorted(glob.glob(os.path.join(input_folder, "*.vtp")))
+    print(f"Found {len(vtp_files)} .vtp files in {input_folder}, {len(grid)} parameter sets")
+    tolerances = np.linspace(0.5, 10, 20)  # 0.5mm to 10mm
+    run = partial(sweep_case, pth_folder=pth_folder, tolerances=tolerances, scoring=scoring, axis=axis,
+                  cohort_store=cohort_store, tracker=tracker)
+    dz_grids = [dz_grid for _, dz_grid in _groups(sorted(grid, key=lambda params: params["dz"]), "dz")]
+    tasks = [(vtp_file, dz_grid) for vtp_file in vtp_files for dz_grid in dz_grids]
+    if workers is None or workers <= 1:
+        task_rows = [run(vtp_file, grid=dz_grid) for vtp_file, dz_grid in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run, vtp_file, grid=dz_grid) for vtp_file, dz_grid in tasks]
+            task_rows = [future.result() for future in futures]
+    rows = [row for rows in task_rows for row in rows]
+    out_dir = os.path.dirname(os.path.abspath(output_csv))
+    os.makedirs(out_dir, exist_ok=True)
+    save_rows_csv(rows, output_csv)
+
+    ranked = rank_params(rows, metric)
+    print(f"\nBest parameter sets by mean {metric}:")
+    for value, params in ranked[:5]:
+        print(f"  {value:.3f}  " + ", ".join(f"{name}={params[name]}" for name in SWEEP_PARAMS))
+    return ranked
+
+if __name__ == "__main__":
+    input_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\models"
+    pth_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\pths"
+    output_csv = r"C:\Users\robik\PyCharmMiscProject\VTK\centerlines_auto\parameter_sweep.csv"
+    grid = parameter_grid(dz=[0.5, 1.0, 2.0], eps=[0.3, 0.5, 1.0], min_samples=[3, 5, 10], max_jump=[5.0, 10.0],
+                          sigma=[0.0, 1.0, 2.0])
+    main(input_folder, pth_folder, output_csv, grid, workers=4)
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os
+import glob
+import collections
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+
+_END = object()
+
+def nbytes(obj):
+    """Rough memory held by a loaded case: arrays, bytes, vtk data objects and containers of them."""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes(v) for v in obj)
+    if hasattr(obj, "GetActualMemorySize"):
+        return obj.GetActualMemorySize() * 1024
+    return 0
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def read_pth_dir(model_pth_dir):
+    """{.pth path: contents} of a model's paths folder (see load_path.load_branches(contents=...))."""
+    return {path: read_bytes(path) for path in sorted(glob.glob(os.path.join(model_pth_dir, "*.pth")))}
+
+def prefetch(items, load, depth=2, max_bytes=None):
+    """
+    Yield (item, future) in the order of items, with load(item) already
+    running in a background thread for up to `depth` items ahead of the one
+    being processed. future.result() returns load(item) or raises its error.
+    max_bytes: stop loading ahead while the finished, not yet consumed loads
+    hold this much (nbytes()); the next item is always loaded.
+    depth=0 loads every item on demand in the calling thread.
+
+    Python file reads release the GIL, parsing mostly does not (VTK readers
+    included), so load() should do the I/O (e.g. read_bytes) and leave the
+    parsing to the consumer for the reads to overlap with compute.
+    """
+    items = iter(items)
+    if depth <= 0:
+        for item in items:
+            future = Future()
+            try:
+                future.set_result(load(item))
+            except Exception as e:
+                future.set_exception(e)
+            yield item, future
+        return
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+    lock = threading.RLock()
+    pending = collections.deque()
+    state = {"exhausted": False, "closed": False, "buffered": 0}
+
+    def fill():
+        # Loads run one at a time: the next one starts when the last has finished
+        # and its size is known, or right away for the item handed out next
+        with lock:
+            if state["closed"] or state["exhausted"] or len(pending) >= depth:
+                return
+            if pending:
+                last = pending[-1][1]
+                if not last.done():
+                    return
+                if max_bytes is not None and state["buffered"] >= max_bytes:
+                    return
+            item = next(items, _END)
+            if item is _END:
+                state["exhausted"] = True
+                return
+            future = pool.submit(load, item)
+            pending.append((item, future))
+        future.add_done_callback(loaded)
+
+    def loaded(future):
+        with lock:
+            if future.exception() is None:
+                future.size = nbytes(future.result())
+                state["buffered"] += future.size
+        fill()
+
+    try:
+        while True:
+            fill()
+            with lock:
+                if not pending:
+                    return
+                item, future = pending[0]
+            future.exception()  # wait for it
+            with lock:
+                pending.popleft()
+                state["buffered"] -= getattr(future, "size", 0)
+            fill()
+            yield item, future
+    finally:
+        with lock:
+            state["closed"] = True
+        pool.shutdown(wait=True, cancel_futures=True)
\ No newline at end of file
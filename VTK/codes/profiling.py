@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+def process_peak_rss_mb():
+    """
+    Peak resident memory of this process so far in MB, or None if it cannot
+    be read. A process-lifetime peak, not one model's: a pool worker carries
+    it over from the models it ran before.
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        # ru_maxrss is in kB on Linux, in bytes on macOS
+        scale = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    try:
+        # Windows has no resource module; psutil reports the peak working set there
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2 ** 20
+    except (ImportError, AttributeError):
+        return None
+
+def current_rss_mb():
+    """Resident memory of this process now in MB, or None if it cannot be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        return None
+
+class RssSampler:
+    """
+    Highest resident memory between start() and stop(), read every interval
+    seconds by a daemon thread (and at both ends), so it is the peak of that
+    span alone and not of the process lifetime.
+    """
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak = rss if self.peak is None else max(self.peak, rss)
+        return rss
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        if self._sample() is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the peak in MB (None if RSS cannot be read)."""
+        if self._thread is not None:
+            self._done.set()
+            self._thread.join()
+            self._thread = None
+        self._sample()
+        return self.peak
+
+class StageProfiler:
+    """
+    Per-stage wall time and counters for one model, plus its peak memory:
+    the resident memory is sampled while an outermost stage (e.g. "total")
+    runs. The process peak so far is recorded as well. Stages may nest (e.g.
+    "cluster" inside "centerline"); each name keeps its own total time and
+    call count.
+    """
+    def __init__(self, sample_memory=True):
+        self.sample_memory = sample_memory
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+        self.peak_rss_mb = None
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name):
+        sampler = RssSampler().start() if self.sample_memory and self._depth == 0 else None
+        self._depth += 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - t0
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self._depth -= 1
+            if sampler is not None:
+                peak = sampler.stop()
+                if peak is not None:
+                    self.peak_rss_mb = peak if self.peak_rss_mb is None else max(self.peak_rss_mb, peak)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, **extra):
+        """JSON-ready dict of everything measured, plus any extra fields."""
+        out = dict(extra)
+        out["seconds"] = {name: round(t, 6) for name, t in self.times.items()}
+        out["calls"] = dict(self.calls)
+        out["counters"] = {name: int(n) for name, n in self.counters.items()}
+        out["peak_rss_mb"] = None if self.peak_rss_mb is None else round(self.peak_rss_mb, 1)
+        peak = process_peak_rss_mb() if self.sample_memory else None
+        out["process_peak_rss_mb"] = None if peak is None else round(peak, 1)
+        return out
+
+class NullProfiler:
+    """Stand-in when profiling is off: every call is a no-op."""
+    _null = nullcontext()
+
+    def stage(self, name):
+        return self._null
+
+    def count(self, name, n=1):
+        pass
+
+    def record(self, **extra):
+        return None
+
+NULL_PROFILER = NullProfiler()
+# Per thread, so background loaders (prefetch.py) never count into a model's profile
+_active = threading.local()
+
+def get_profiler():
+    """The profiler of the model being processed in this thread (NULL_PROFILER if none)."""
+    return getattr(_active, "profiler", NULL_PROFILER)
+
+@contextmanager
+def profiling(profiler):
+    """Make profiler the one get_profiler() returns inside the block."""
+    previous = get_profiler()
+    _active.profiler = profiler if profiler is not None else NULL_PROFILER
+    try:
+        yield _active.profiler
+    finally:
+        _active.profiler = previous
+
+def append_jsonl(records, out_path):
+    """Append one JSON object per line."""
+    with open(out_path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
\ No newline at end of file
@@ -1,8 +1,13 @@
 import vtk
 
-def read_file(filename):
+def read_file(filename, data=None):
+    """data: the file contents if already in memory (see prefetch.py), parsed instead of reading filename."""
     reader = vtk.vtkXMLPolyDataReader()
-    reader.SetFileName(filename)
+    if data is None:
+        reader.SetFileName(filename)
+    else:
+        reader.ReadFromInputStringOn()
+        reader.SetInputString(data)
     reader.Update()
     polydata = reader.GetOutput()
     print(f"[read_file] Polydata points: {polydata.GetNumberOfPoints()}")
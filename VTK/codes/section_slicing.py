@@ -0,0 +1,222 @@
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from make_mesh import make_mesh
+from inside_mesh import mesh_triangles
+from manhattan_center import slice_frame
+from slice_tracking import choose_center
+from profiling import get_profiler
+
+def slice_levels(coord, dz=1.0):
+    """Cutting planes through the middle of the slabs [z, z + dz) used by compute_slice_centerline."""
+    if len(coord) == 0:
+        return np.empty(0)
+    return np.arange(np.min(coord), np.max(coord), dz) + dz / 2
+
+def cut_triangles(vertices, triangles, levels, axis=2):
+    """
+    Intersect every triangle with the planes coord[axis] = levels (sorted).
+    A vertex on a plane counts as above it, so every crossing lies on exactly
+    one mesh edge and neighbouring triangles share their segment ends.
+    Return (level, ends, edges): the level index of every segment, its (S, 2, 3)
+    end points ordered along the contour direction given by the triangle
+    orientation, and the (S, 2) mesh edge ids the ends lie on.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64)
+    tri = vertices[triangles]
+    h = tri[:, :, axis]
+    # Planes in (min, max] cut the triangle
+    first = np.searchsorted(levels, h.min(axis=1), side='right')
+    counts = np.searchsorted(levels, h.max(axis=1), side='right') - first
+    t = np.repeat(np.arange(len(triangles)), counts)
+    level = np.arange(len(t)) - np.repeat(np.cumsum(counts) - counts, counts) + first[t]
+    c = levels[level]
+    above = h[t] >= c[:, None]
+    # The vertex alone on its side of the plane; the crossed edges run from it
+    lone = np.where(above.sum(axis=1) == 1, np.argmax(above, axis=1), np.argmin(above, axis=1))
+    ends = np.empty((len(t), 2, 3))
+    edges = np.empty((len(t), 2), dtype=np.int64)
+    n_vertices = np.int64(len(vertices))
+    for j, shift in enumerate((1, 2)):
+        other = (lone + shift) % 3
+        ha, hb = h[t, lone], h[t, other]
+        w = (c - ha) / (hb - ha)
+        pa, pb = tri[t, lone], tri[t, other]
+        ends[:, j] = pa + w[:, None] * (pb - pa)
+        ends[:, j, axis] = c  # exactly on the plane
+        ia, ib = triangles[t, lone], triangles[t, other]
+        edges[:, j] = np.minimum(ia, ib) * n_vertices + np.maximum(ia, ib)
+    # Orient along axis x normal, the same turning sense for the whole contour
+    normal = np.cross(tri[t, 1] - tri[t, 0], tri[t, 2] - tri[t, 0])
+    direction = np.cross(np.eye(3)[axis], normal)
+    flip = np.einsum('ij,ij->i', ends[:, 1] - ends[:, 0], direction) < 0
+    ends[flip] = ends[flip][:, ::-1]
+    edges[flip] = edges[flip][:, ::-1]
+    return level, ends, edges
+
+def section_rings(level, ends, edges, n_levels):
+    """
+    Group the segments of cut_triangles() into cross-section contours (rings):
+    segments of one level that share a mesh edge are connected.
+    Return (ring, nodes, node_points, degree): the ring of every segment, the
+    (S, 2) contour vertex ids of its ends, their points and how many segments
+    meet at each (1 at the ends of a contour cut open by a mesh boundary).
+    """
+    keys = edges * np.int64(max(n_levels, 1)) + level[:, None]
+    unique_keys, first, nodes = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+    nodes = nodes.reshape(-1, 2)
+    n_nodes = len(unique_keys)
+    graph = coo_matrix((np.ones(len(nodes)), (nodes[:, 0], nodes[:, 1])), shape=(n_nodes, n_nodes))
+    _, node_ring = connected_components(graph, directed=False)
+    node_points = ends.reshape(-1, 3)[first]
+    degree = np.bincount(nodes.ravel(), minlength=n_nodes)
+    return node_ring[nodes[:, 0]], nodes, node_points, degree
+
+def cross_sections(polydata, levels=None, axis=2, dz=1.0, direction=None):
+    """
+    Exact cross-sections of the surface triangles with planes along axis
+    (or along `direction`), one row per contour ring, sorted by level:
+    {"level": plane index, "height": plane coordinate, "centroid": (R, 3) area
+    centroid, "area", "radius": sqrt(area / pi), "perimeter", "closed"}.
+    Open contours (the vessel is cut where the mesh has a boundary) are closed
+    with the straight chord between their ends.
+    levels: plane coordinates in any order (sorted, duplicates dropped; "level"
+    indexes the sorted ones); by default the middles of the dz slabs.
+    polydata may also be a (vertices, triangles) pair.
+    """
+    profiler = get_profiler()
+    if isinstance(polydata, tuple):
+        vertices, triangles = polydata
+    else:
+        vertices, triangles = make_mesh(polydata), mesh_triangles(polydata)
+    vertices = np.asarray(vertices, dtype=np.float64)
+    frame = None
+    if direction is not None:
+        frame = slice_frame(direction)
+        vertices = vertices @ frame.T
+        axis = 2
+    if levels is None:
+        levels = slice_levels(vertices[:, axis], dz)
+    # cut_triangles finds the planes a triangle spans by bisection
+    levels = np.unique(np.asarray(levels, dtype=np.float64))
+    with profiler.stage("cut_sections"):
+        level, ends, edges = cut_triangles(vertices, triangles, levels, axis)
+        ring, nodes, node_points, degree = section_rings(level, ends, edges, len(levels))
+    n_rings = int(ring.max()) + 1 if len(ring) else 0
+    profiler.count("sections", n_rings)
+
+    # Green's theorem around a reference point r of each ring: the segment fans
+    # from r sum to the contour area, and to the chord-closed area of an open
+    # contour when r is the middle of its two ends
+    node_ring = np.empty(len(node_points), dtype=np.int64)
+    node_ring[nodes.ravel()] = np.repeat(ring, 2)
+    loose = degree == 1
+    n_loose = np.bincount(node_ring[loose], minlength=n_rings)
+    use = np.where(n_loose[node_ring] > 0, loose, True)
+    ref = np.stack([np.bincount(node_ring[use], weights=node_points[use, i], minlength=n_rings) for i in range(3)], axis=1)
+    ref /= np.maximum(np.bincount(node_ring[use], minlength=n_rings), 1)[:, None]
+
+    plane_axes = [i for i in range(3) if i != axis]
+    a = ends[:, 0, plane_axes] - ref[ring][:, plane_axes]
+    b = ends[:, 1, plane_axes] - ref[ring][:, plane_axes]
+    cross = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    twice_area = np.bincount(ring, weights=cross, minlength=n_rings)
+    moment = np.stack([np.bincount(ring, weights=(a[:, i] + b[:, i]) * cross, minlength=n_rings) for i in range(2)], axis=1)
+    centroid = ref.copy()
+    ok = twice_area != 0
+    centroid[np.ix_(ok, plane_axes)] += moment[ok] / (3 * twice_area[ok, None])
+    area = np.abs(twice_area) / 2
+
+    ring_level = np.zeros(n_rings, dtype=np.int64)
+    ring_level[ring] = level
+    order = np.lexsort((-area, ring_level))
+    sections = {
+        "level": ring_level[order],
+        "height": levels[ring_level[order]],
+        "centroid": centroid[order] @ frame if frame is not None else centroid[order],
+        "area": area[order],
+        "radius": np.sqrt(area[order] / np.pi),
+        "perimeter": np.bincount(ring, weights=np.linalg.norm(ends[:, 1] - ends[:, 0], axis=1), minlength=n_rings)[order],
+        "closed": (n_loose == 0)[order],
+    }
+    return sections
+
+def section_contours(polydata, level, axis=2, direction=None):
+    """Ordered (K, 3) contour polylines of the cross-section at plane coordinate `level`, e.g. for plotting."""
+    if isinstance(polydata, tuple):
+        vertices, triangles = polydata
+    else:
+        vertices, triangles = make_mesh(polydata), mesh_triangles(polydata)
+    vertices = np.asarray(vertices, dtype=np.float64)
+    frame = None
+    if direction is not None:
+        frame = slice_frame(direction)
+        vertices = vertices @ frame.T
+        axis = 2
+    seg_level, ends, edges = cut_triangles(vertices, triangles, np.array([level], dtype=np.float64), axis)
+    ring, nodes, node_points, degree = section_rings(seg_level, ends, edges, 1)
+    following = dict(zip(nodes[:, 0].tolist(), nodes[:, 1].tolist()))
+    incoming = set(nodes[:, 1].tolist())
+    contours = []
+    # Open contours from their first end, then the closed rings left
+    starts = [n for n in following if n not in incoming] + list(following)
+    for start in starts:
+        if start not in following:
+            continue
+        chain = [start]
+        node = following.pop(start)
+        while node != start:
+            chain.append(node)
+            if node not in following:
+                break
+            node = following.pop(node)
+        else:
+            chain.append(start)
+        contour = node_points[chain]
+        contours.append(contour @ frame if frame is not None else contour)
+    return contours
+
+def track_sections(sections, max_jump=10.0, min_area=0.0):
+    """
+    Follow one ring per plane like track_slice_centers follows one cluster:
+    the largest ring to start, then the ring closest to the previous center.
+    Yield (centroid, radius) per plane with a ring of at least min_area.
+    """
+    keep = sections["area"] > min_area
+    level = sections["level"][keep]
+    centroid = sections["centroid"][keep]
+    radius = sections["radius"][keep]
+    area = sections["area"][keep]
+    bounds = np.flatnonzero(np.diff(level)) + 1
+    prev_center = None
+    for lo, hi in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(level)]])):
+        if lo == hi:
+            continue
+        sizes = area[lo:hi] if prev_center is None else None
+        chosen = lo + choose_center(centroid[lo:hi], sizes, prev_center, max_jump)
+        prev_center = centroid[chosen]
+        yield prev_center, radius[chosen]
+
+def compute_section_centerline(polydata, axis=2, dz=1.0, max_jump=10.0, sigma=1.0, min_area=0.0, direction=None,
+                               return_radius=False):
+    """
+    compute_slice_centerline with exact cross-sections instead of clustered
+    vertices: the surface triangles are cut by the planes in the middle of
+    every dz slab and the area centroid of the tracked contour is taken.
+    Unlike the vertex mean this does not lean towards densely tessellated parts
+    of the wall and separate vessels need no eps, so a coarse dz stays accurate.
+    return_radius: also return the equivalent radius sqrt(area / pi) per point.
+    """
+    profiler = get_profiler()
+    sections = cross_sections(polydata, axis=axis, dz=dz, direction=direction)
+    tracked = list(track_sections(sections, max_jump, min_area))
+    centerline = np.array([c for c, _ in tracked]).reshape(-1, 3)
+    radius = np.array([r for _, r in tracked])
+    if sigma > 0 and len(centerline) > 1:
+        centerline = gaussian_filter1d(centerline, sigma=sigma, axis=0)
+    profiler.count("centerline_points", len(centerline))
+    if return_radius:
+        return centerline, radius
+    return centerline
\ No newline at end of file
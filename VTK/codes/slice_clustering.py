@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+def grid_neighbor_pairs(points, eps, return_distances=False):
+    """
+    All unordered pairs (i, j), i != j, of 2D points with |p_i - p_j| <= eps.
+    Points are hashed to an eps sized grid, so each cell is only compared with
+    itself and its forward neighbours.
+    return_distances: also return the squared distance of every pair; the pairs
+    within a smaller eps are then exactly those with d2 <= eps ** 2.
+    """
+    if len(points) == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return (empty, empty, np.empty(0)) if return_distances else (empty, empty)
+    # Slightly larger cells so rounding in the division never skips a cell
+    cells = np.floor(points / (eps * (1 + 1e-9))).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    width = cells[:, 1].max() + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+    order = np.argsort(keys, kind='stable')
+    sorted_pts = points[order]
+    ukeys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    cell_of = np.repeat(np.arange(len(ukeys)), counts)
+    eps2 = eps * eps
+    src_all, dst_all, d2_all = [], [], []
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        nkeys = ukeys + dx * width + dy
+        pos = np.minimum(np.searchsorted(ukeys, nkeys), len(ukeys) - 1)
+        hit = ukeys[pos] == nkeys
+        src = np.nonzero(hit[cell_of])[0]
+        nb = pos[cell_of[src]]
+        first = starts[nb]
+        if dx == 0 and dy == 0:
+            # Same cell: only pair with the points after this one
+            first = src + 1
+        reps = starts[nb] + counts[nb] - first
+        src = np.repeat(src, reps)
+        offs = np.arange(len(src)) - np.repeat(np.cumsum(reps) - reps, reps)
+        dst = np.repeat(first, reps) + offs
+        d = sorted_pts[src] - sorted_pts[dst]
+        # Same comparison as sklearn's tree query: squared distance vs eps**2
+        d2 = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1]
+        within = d2 <= eps2
+        src_all.append(src[within])
+        dst_all.append(dst[within])
+        d2_all.append(d2[within])
+    if return_distances:
+        return order[np.concatenate(src_all)], order[np.concatenate(dst_all)], np.concatenate(d2_all)
+    return order[np.concatenate(src_all)], order[np.concatenate(dst_all)]
+
+def labels_from_pairs(n, src, dst, min_samples):
+    """
+    DBSCAN labels from the unordered eps-neighbour pairs, numbered exactly like
+    sklearn: clusters in order of their lowest core index, border points go to
+    the first such cluster they touch, noise is -1.
+    """
+    labels = np.full(n, -1, dtype=np.intp)
+    # Every point is its own neighbour, as in sklearn
+    core = 1 + np.bincount(src, minlength=n) + np.bincount(dst, minlength=n) >= min_samples
+    if not core.any():
+        return labels
+    core_edge = core[src] & core[dst]
+    graph = coo_matrix((np.ones(core_edge.sum(), dtype=np.int8), (src[core_edge], dst[core_edge])), shape=(n, n))
+    n_comp, comp = connected_components(graph, directed=True, connection='weak')
+    core_idx = np.nonzero(core)[0]
+    first = np.full(n_comp, n)
+    np.minimum.at(first, comp[core_idx], core_idx)
+    rank = np.full(n_comp, -1, dtype=np.intp)
+    used = np.nonzero(first < n)[0]
+    rank[used[np.argsort(first[used])]] = np.arange(len(used))
+    labels[core_idx] = rank[comp[core_idx]]
+    border = np.full(n, n, dtype=np.intp)
+    for a, b in ((src, dst), (dst, src)):
+        edge = ~core[a] & core[b]
+        np.minimum.at(border, a[edge], labels[b[edge]])
+    has_cluster = border < n
+    labels[has_cluster] = border[has_cluster]
+    return labels
+
+def grid_dbscan(points, eps, min_samples):
+    """
+    DBSCAN for small 2D point sets (up to a few thousand points, one slice) using
+    a grid hash and connected components.
+    Gives the same labels as sklearn.cluster.DBSCAN for the same eps/min_samples
+    (up to distances that tie with eps within rounding).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    src, dst = grid_neighbor_pairs(points, eps)
+    return labels_from_pairs(len(points), src, dst, min_samples)
+
+def sklearn_dbscan(points, eps, min_samples):
+    """Reference backend, the per-slice sklearn call used originally."""
+    from sklearn.cluster import DBSCAN
+    return DBSCAN(eps=eps, min_samples=min_samples).fit(points).labels_
+
+CLUSTER_BACKENDS = {
+    "grid": grid_dbscan,
+    "sklearn": sklearn_dbscan,
+}
+
+def get_cluster_backend(backend):
+    """Accept a backend name from CLUSTER_BACKENDS or a callable(points, eps, min_samples) -> labels."""
+    if callable(backend):
+        return backend
+    try:
+        return CLUSTER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown cluster backend {backend!r}, expected one of {sorted(CLUSTER_BACKENDS)}")
@@ -0,0 +1,109 @@
+import numpy as np
+
+def choose_center(centroids, sizes, prev_center, max_jump=10.0):
+    """
+    Index of the candidate center to follow: the largest (sizes) to start,
+    then the one closest to the previous center, preferring those within max_jump.
+    """
+    if prev_center is None:
+        return int(np.argmax(sizes))
+    dists = np.linalg.norm(centroids - prev_center, axis=1)
+    close_clusters = np.where(dists < max_jump)[0]
+    if len(close_clusters) > 0:
+        return int(close_clusters[np.argmin(dists[close_clusters])])
+    return int(np.argmin(dists))
+
+def follow_centers(slice_clusters, max_jump=10.0, axis=2):
+    """
+    Yield one center per slice from (centroids, sizes) per slice, skipping
+    slices without a cluster. Jumps are full 3D distances, axis is unused.
+    """
+    prev_center = None
+    for centroids, sizes in slice_clusters:
+        if len(centroids) == 0:
+            continue
+        chosen_center = centroids[choose_center(centroids, None if prev_center is not None else sizes, prev_center, max_jump)]
+        yield chosen_center
+        prev_center = chosen_center
+
+def viterbi_centers(slice_clusters, max_jump=10.0, axis=2, size_weight=1.0, gap_cost=1.0, max_gap=6, far_cost=100.0):
+    """
+    Yield the centers of the globally cheapest track through the clusters of
+    all slices (dynamic programming over the slice stack), instead of
+    committing slice by slice like follow_centers. A track costs
+      (shift / max_jump) ** 2 / k between chosen clusters k slices apart,
+      shift being their offset across the slicing axis, plus far_cost when
+      shift is over max_jump (the jumps greedy only takes with nothing closer)
+      + size_weight * log(largest / size) for every chosen cluster, largest
+      being that of the clusters of its slice within max_jump of it (of the
+      whole slice for the first cluster, which greedy takes the largest of)
+      + gap_cost for every slice with clusters it skips,
+    so a stray cluster or a few bad slices are bridged over (up to max_gap
+    slices in a row; empty slices are free) rather than followed. The track
+    starts within the first and ends within the last max_gap + 1 slices.
+    Every slice's predecessors are scored in one array operation.
+    """
+    centroids, sizes = [], []
+    for slice_centroids, slice_sizes in slice_clusters:
+        if len(slice_centroids):
+            centroids.append(np.asarray(slice_centroids, dtype=np.float64))
+            sizes.append(np.asarray(slice_sizes, dtype=np.float64))
+    if not centroids:
+        return
+    n_slices = len(centroids)
+    counts = np.array([len(c) for c in centroids])
+    starts = np.concatenate([[0], np.cumsum(counts)])
+    node_slice = np.repeat(np.arange(n_slices), counts)
+    points = np.concatenate(centroids)
+    in_plane = points.copy()
+    in_plane[:, axis] = 0
+    node_cost = np.empty(len(points))
+    start_cost = np.empty(len(points))
+    for j, s in enumerate(sizes):
+        cur = slice(starts[j], starts[j + 1])
+        near = np.linalg.norm(in_plane[cur, None] - in_plane[None, cur], axis=2) <= max_jump
+        node_cost[cur] = size_weight * np.log(np.max(np.where(near, s[None, :], 0), axis=1) / s)
+        start_cost[cur] = size_weight * np.log(s.max() / s) - node_cost[cur]
+
+    best = np.empty(len(points))
+    back = np.full(len(points), -1)
+    for j in range(n_slices):
+        cur = slice(starts[j], starts[j + 1])
+        # Entering the track here skips the j slices before
+        enter = gap_cost * j + start_cost[cur] if j <= max_gap else np.full(counts[j], np.inf)
+        first = starts[max(0, j - max_gap - 1)]
+        if first < starts[j]:
+            prev = np.arange(first, starts[j])
+            steps = (j - node_slice[prev])[:, None]
+            shift = np.linalg.norm(in_plane[prev, None] - in_plane[None, cur], axis=2)
+            cost = (best[prev, None] + (shift / max_jump) ** 2 / steps + gap_cost * (steps - 1)
+                    + np.where(shift > max_jump, far_cost, 0.0))
+            k = np.argmin(cost, axis=0)
+            cheaper = cost[k, np.arange(counts[j])] < enter
+            enter = np.where(cheaper, cost[k, np.arange(counts[j])], enter)
+            back[cur] = np.where(cheaper, prev[k], -1)
+        best[cur] = enter + node_cost[cur]
+
+    # Leaving the track early skips the slices after
+    last = starts[max(0, n_slices - 1 - max_gap)]
+    node = last + int(np.argmin(best[last:] + gap_cost * (n_slices - 1 - node_slice[last:])))
+    track = []
+    while node >= 0:
+        track.append(node)
+        node = back[node]
+    for node in reversed(track):
+        yield points[node]
+
+TRACKERS = {
+    "greedy": follow_centers,
+    "viterbi": viterbi_centers,
+}
+
+def get_tracker(tracker):
+    """Accept a tracker name from TRACKERS or a callable(slice_clusters, max_jump, axis) -> centers."""
+    if callable(tracker):
+        return tracker
+    try:
+        return TRACKERS[tracker]
+    except KeyError:
+        raise ValueError(f"Unknown tracker {tracker!r}, expected one of {sorted(TRACKERS)}")
\ No newline at end of file
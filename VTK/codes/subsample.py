@@ -0,0 +1,89 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+SUBSAMPLE_METHODS = ("voxel", "poisson")
+
+def _cell_keys(points, cell):
+    cells = np.floor((points - points.min(axis=0)) / cell).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    return (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+def voxel_subsample(points, spacing):
+    """
+    One point per occupied cube of edge `spacing`: the centroid of the
+    vertices in it. Return (M, 3) float64, M <= N, in cell order.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return points.reshape(0, 3)
+    _, inverse, counts = np.unique(_cell_keys(points, spacing), return_inverse=True, return_counts=True)
+    sums = np.stack([np.bincount(inverse, weights=points[:, i], minlength=len(counts)) for i in range(3)], axis=1)
+    return sums / counts[:, None]
+
+def independent_set(n, pairs, rng):
+    """
+    Maximal independent set of a graph given as an (E, 2) pair array: random
+    priorities, every round takes the nodes that beat all their undecided
+    neighbours (Luby). Return the sorted node indices.
+    """
+    priority = rng.permutation(n)
+    state = np.zeros(n, dtype=np.int8)  # 0 undecided, 1 taken, -1 dropped
+    a, b = pairs[:, 0], pairs[:, 1]
+    while True:
+        undecided = state == 0
+        if not undecided.any():
+            break
+        live = undecided[a] & undecided[b]
+        la, lb = a[live], b[live]
+        beaten = np.zeros(n, dtype=bool)
+        b_wins = priority[lb] < priority[la]
+        beaten[la[b_wins]] = True
+        beaten[lb[~b_wins]] = True
+        taken = undecided & ~beaten
+        state[taken] = 1
+        dropped = np.zeros(n, dtype=bool)
+        dropped[lb[taken[la]]] = True
+        dropped[la[taken[lb]]] = True
+        state[dropped & (state == 0)] = -1
+    return np.nonzero(state == 1)[0]
+
+def poisson_disk_subsample(points, radius, seed=0):
+    """
+    Maximal Poisson-disk subset of the vertices: no two kept vertices are
+    within `radius`, every dropped vertex is within `radius` of a kept one.
+    Each pass draws one candidate per cell of edge radius / sqrt(3) among the
+    vertices still uncovered and keeps an independent set of them.
+    Return (M, 3) float64 vertices, in input order.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return points.reshape(0, 3)
+    rng = np.random.default_rng(seed)
+    keys = _cell_keys(points, radius / np.sqrt(3))
+    remaining = np.arange(len(points))
+    kept = []
+    while len(remaining):
+        shuffled = remaining[rng.permutation(len(remaining))]
+        _, first = np.unique(keys[shuffled], return_index=True)
+        candidates = shuffled[first]
+        pairs = cKDTree(points[candidates]).query_pairs(radius, output_type='ndarray')
+        chosen = candidates[independent_set(len(candidates), pairs, rng)]
+        kept.append(chosen)
+        dists, _ = cKDTree(points[chosen]).query(points[remaining], distance_upper_bound=radius)
+        remaining = remaining[dists > radius]
+    return points[np.sort(np.concatenate(kept))]
+
+def subsample_points(points, method="voxel", spacing=0.2, seed=0):
+    """
+    Thin a mesh point cloud before compute_slice_centerline.
+    method: "voxel" (cell centroids, fastest) or "poisson" (vertex subset with
+    minimum distance `spacing`); None returns the points unchanged.
+    spacing is in mesh units and should stay well below the DBSCAN eps.
+    """
+    if method is None:
+        return points
+    if method == "voxel":
+        return voxel_subsample(points, spacing)
+    if method == "poisson":
+        return poisson_disk_subsample(points, spacing, seed)
+    raise ValueError(f"Unknown subsample method: {method}, expected one of {SUBSAMPLE_METHODS}")
\ No newline at end of file
@@ -1,4 +1,5 @@
 import vtk
+from make_mesh import make_polyline
 
 def visualize_centerline(polydata, centerline):
     print(f"Polydata points: {polydata.GetNumberOfPoints()}")
@@ -14,22 +15,8 @@ def visualize_centerline(polydata, centerline):
     actor.GetProperty().SetOpacity(0.5)  # Or 1.0 for fully opaque
 
     # Centerline as a polyline
-    points = vtk.vtkPoints()
-    for path in centerline:
-        points.InsertNextPoint(*path)
-    print(f"Centerline vtkPoints: {points.GetNumberOfPoints()}")
-
-    lines = vtk.vtkCellArray()
-    if len(centerline) > 1:
-        line = vtk.vtkPolyLine()
-        line.GetPointIds().SetNumberOfIds(len(centerline))
-        for i in range(len(centerline)):
-            line.GetPointIds().SetId(i, i)
-        lines.InsertNextCell(line)
-
-    center_poly = vtk.vtkPolyData()
-    center_poly.SetPoints(points)
-    center_poly.SetLines(lines)
+    center_poly = make_polyline(centerline)
+    print(f"Centerline vtkPoints: {center_poly.GetNumberOfPoints()}")
 
     center_mapper = vtk.vtkPolyDataMapper()
     center_mapper.SetInputData(center_poly)
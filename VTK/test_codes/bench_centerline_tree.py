@@ -0,0 +1,61 @@
+import os
+import time
+import numpy as np
+import vtk
+from make_mesh import make_mesh, make_polyline
+from load_path import load_branches
+from manhattan_center import compute_slice_centerline
+from centerline_tree import extract_centerline_tree, label_branches
+from centerline_scoring import PolylineIndex, resample_line
+
+def branch_radius(label):
+    # The .pth coordinates are in cm
+    if label == "aorta":
+        return 0.9
+    if "iliac" in label:
+        return 0.45
+    return 0.3
+
+def vessel_tree_points(branches, step=0.03, sides=48):
+    """Surface points of one tube per GT branch, a stand-in for a segmented vessel tree."""
+    append = vtk.vtkAppendPolyData()
+    for label, line in branches.items():
+        length = np.sum(np.linalg.norm(np.diff(line, axis=0), axis=1))
+        tube = vtk.vtkTubeFilter()
+        tube.SetInputData(make_polyline(resample_line(line, max(2, int(length / step)))))
+        tube.SetRadius(branch_radius(label))
+        tube.SetNumberOfSides(sides)
+        tube.Update()
+        append.AddInputData(tube.GetOutput())
+    append.Update()
+    return make_mesh(append.GetOutput(), copy=True)
+
+def coverage(pred_lines, gt_line, tolerance):
+    if not pred_lines:
+        return 0.0
+    dists, _ = PolylineIndex(pred_lines).query(gt_line)
+    return np.mean(dists <= tolerance)
+
+def main(pth_dir, dz=0.1, eps=0.2, link_dist=0.2, tolerance=0.3):
+    gt = load_branches(pth_dir)
+    points = vessel_tree_points(gt)
+    print(f"mesh points: {len(points)}, GT branches: {len(gt)}")
+
+    t0 = time.perf_counter()
+    single = compute_slice_centerline(points, dz=dz, eps=eps, max_jump=1.0)
+    t_single = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    branches, links = extract_centerline_tree(points, dz=dz, eps=eps, link_dist=link_dist)
+    t_tree = time.perf_counter() - t0
+    named, mapping = label_branches(branches, gt)
+    print(f"single polyline: {t_single:.2f} s, tree: {t_tree:.2f} s, {len(branches)} branches, {len(links)} junctions")
+    print("links:", ", ".join(f"{mapping[a]} -> {mapping[b]}" for a, b in links))
+
+    print(f"{'GT branch':>18} {'single cov':>11} {'tree cov':>9}  labelled branches")
+    tree_lines = list(named.values())
+    for label, line in gt.items():
+        matched = [name for name in named if name == label or name.startswith(label + "_")]
+        print(f"{label:>18} {coverage([single], line, tolerance):11.2f} {coverage(tree_lines, line, tolerance):9.2f}  {', '.join(matched)}")
+
+if __name__ == "__main__":
+    main(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pths", "0140_2001", "paths"))
\ No newline at end of file
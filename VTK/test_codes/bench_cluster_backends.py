@@ -0,0 +1,37 @@
+import time
+import numpy as np
+from slice_clustering import CLUSTER_BACKENDS
+
+def ring_slices(n_slices, pts_per_ring, seed=0):
+    """2D slice point sets: one or two noisy vessel rings, like an aorta/iliac cut."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n_slices):
+        n_rings = rng.integers(1, 3)
+        rings = []
+        for r in range(n_rings):
+            phi = rng.uniform(0, 2 * np.pi, pts_per_ring)
+            radius = rng.uniform(4, 12)
+            center = np.array([25.0 * r, 0.0])
+            rings.append(center + radius * np.stack([np.cos(phi), np.sin(phi)], axis=1))
+        pts = np.concatenate(rings) + rng.normal(scale=0.1, size=(n_rings * pts_per_ring, 2))
+        out.append(pts)
+    return out
+
+def main(n_slices=300, sizes=(50, 200, 1000, 4000), eps=0.5, min_samples=5):
+    names = list(CLUSTER_BACKENDS)
+    print(f"{'pts/slice':>10} " + " ".join(f"{name + ' [s]':>12}" for name in names) + f" {'same labels':>12}")
+    for size in sizes:
+        slices = ring_slices(n_slices, size)
+        timings, labels = [], []
+        for name in names:
+            backend = CLUSTER_BACKENDS[name]
+            backend(slices[0], eps, min_samples)  # warm up imports
+            t0 = time.perf_counter()
+            labels.append([backend(pts, eps, min_samples) for pts in slices])
+            timings.append(time.perf_counter() - t0)
+        same = all(np.array_equal(a, b) for a, b in zip(labels[0], labels[1]))
+        print(f"{size:10d} " + " ".join(f"{t:12.3f}" for t in timings) + f" {str(same):>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import glob
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from synthetic_vessels import write_synthetic_model
+from read_file import read_file
+from make_mesh import make_mesh
+from load_path import load_branches
+from cohort_store import ingest_cohort, attach
+
+def memory_kb():
+    """(private, proportional) resident kB of this process from /proc/self/smaps_rollup (Linux)."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), fields.get("Pss", 0)
+
+def touch_cohort(models_dir, pth_folder, store_path=None):
+    """Load every case the way a worker does and keep it all, return (seconds, memory_kb())."""
+    t0 = time.perf_counter()
+    cases, total = [], 0.0
+    for vtp_file in sorted(glob.glob(os.path.join(models_dir, "*.vtp"))):
+        basename = os.path.splitext(os.path.basename(vtp_file))[0]
+        if store_path is None:
+            points = make_mesh(read_file(vtp_file))
+            branches = load_branches(os.path.join(pth_folder, basename, "paths"))
+        else:
+            store = attach(store_path)
+            points, branches = store.points(basename), store.branches(basename)
+        total += float(points.sum()) + sum(float(b.sum()) for b in branches.values())
+        cases.append((points, branches))
+    return time.perf_counter() - t0, memory_kb()
+
+def main(n_models=6, n_vertices=500000, workers=4):
+    """Memory and load time of `workers` processes holding the whole cohort: parsed per process vs one mapped store."""
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir, pth_folder = os.path.join(tmp, "models"), os.path.join(tmp, "pths")
+        for i in range(n_models):
+            write_synthetic_model(models_dir, pth_folder, f"synthetic_{i:03d}", n_vertices, seed=i)
+        store_path = os.path.join(tmp, "cohort_store.npz")
+        t0 = time.perf_counter()
+        ingest_cohort(models_dir, pth_folder, store_path)
+        print(f"ingest: {time.perf_counter() - t0:.2f} s, store {os.path.getsize(store_path) / 2 ** 20:.0f} MB")
+        for name, path in (("parse .vtp", None), ("cohort store", store_path)):
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(touch_cohort, [models_dir] * workers, [pth_folder] * workers, [path] * workers))
+            seconds = np.mean([r[0] for r in results])
+            private = sum(r[1][0] for r in results) / 1024
+            pss = sum(r[1][1] for r in results) / 1024
+            print(f"{name:>13}: {seconds:.2f} s per worker, {workers} workers hold {private:.0f} MB private, "
+                  f"{pss:.0f} MB proportional")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import numpy as np
+import vtk
+from make_mesh import make_mesh, make_polyline
+from manhattan_center import compute_slice_centerline
+from curved_slicing import compute_curved_centerline
+from centerline_scoring import score_all_exact
+from bench_helpers import timed
+
+METRICS = ("mean_closest", "hausdorff", "hausdorff95")
+
+def helix(turns=2.0, radius=30.0, pitch=60.0, step=0.3):
+    """Tortuous test vessel axis: a helix climbing along z at roughly 45 degrees."""
+    length = turns * np.hypot(2 * np.pi * radius, pitch)
+    t = np.linspace(0, 2 * np.pi * turns, int(length / step))
+    return np.stack([radius * np.cos(t), radius * np.sin(t), pitch * t / (2 * np.pi)], axis=1)
+
+def tube_mesh(line, radius=5.0, sides=64):
+    tube = vtk.vtkTubeFilter()
+    tube.SetInputData(make_polyline(line))
+    tube.SetRadius(radius)
+    tube.SetNumberOfSides(sides)
+    tube.Update()
+    return make_mesh(tube.GetOutput(), copy=True)
+
+def main(eps=1.0):
+    axis_line = helix()
+    points = tube_mesh(axis_line)
+    tolerances = np.linspace(0.5, 10, 20)
+    print(f"mesh points: {len(points)}")
+    print(f"{'method':>22} {'time [s]':>9} {'points':>7} " + " ".join(f"{m:>12}" for m in METRICS))
+    runs = [(f"axis dz={dz}", compute_slice_centerline, {"dz": dz}) for dz in (2.0, 1.0, 0.5, 0.25)]
+    runs += [(f"curved spacing={s}", compute_curved_centerline, {"spacing": s}) for s in (4.0, 2.0, 1.0)]
+    runs += [("curved 2 passes", compute_curved_centerline, {"spacing": 2.0, "passes": 2})]
+    for name, fn, kwargs in runs:
+        line, t = timed(fn, points, eps=eps, **kwargs)
+        if len(line) < 2:
+            print(f"{name:>22} {t:9.3f} {len(line):7d} (no centerline)")
+            continue
+        scores = score_all_exact(line, [axis_line], tolerances)
+        print(f"{name:>22} {t:9.3f} {len(line):7d} " + " ".join(f"{scores[m]:12.3f}" for m in METRICS))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
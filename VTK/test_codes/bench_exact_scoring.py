@@ -0,0 +1,34 @@
+import os
+import numpy as np
+from centerline_scoring import resample_branches, resample_line, score_all, score_all_exact
+from load_path import load_branches
+from bench_helpers import timed
+
+METRICS = ("mean_closest", "hausdorff", "avg_symmetric", "hausdorff95")
+
+def fake_prediction(aorta, spacing=1.0, noise=0.5, seed=0):
+    """Slice-like prediction: the GT aorta every `spacing` mm plus noise."""
+    rng = np.random.default_rng(seed)
+    line = resample_line(aorta, max(2, int(np.sum(np.linalg.norm(np.diff(aorta, axis=0), axis=1)) / spacing)))
+    return line + rng.normal(scale=noise, size=line.shape)
+
+def main(pth_dir, nums=(100, 1000, 10000, 100000), repeats=3):
+    branches = load_branches(pth_dir)
+    segments = list(branches.values())
+    aorta = branches.get("aorta", segments[0])
+    pred = fake_prediction(aorta)
+    tolerances = np.linspace(0.5, 10, 20)
+
+    exact, t_exact = min((timed(score_all_exact, pred, segments, tolerances) for _ in range(repeats)), key=lambda r: r[1])
+    print(f"pred points: {len(pred)}, gt points: {sum(len(s) for s in segments)} in {len(segments)} branches")
+    print(f"{'mode':>14} {'time [s]':>9} " + " ".join(f"{m:>14}" for m in METRICS))
+    print(f"{'exact':>14} {t_exact:9.4f} " + " ".join(f"{exact[m]:14.4f}" for m in METRICS))
+    for num in nums:
+        def resampled():
+            return score_all(resample_line(pred, num), resample_branches(segments, num), tolerances)
+        scores, t = min((timed(resampled) for _ in range(repeats)), key=lambda r: r[1])
+        drift = " ".join(f"{scores[m]:8.4f}({scores[m] - exact[m]:+.2f})" for m in METRICS)
+        print(f"{'resampled ' + str(num):>14} {t:9.4f} {drift}")
+
+if __name__ == "__main__":
+    main(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pths", "0140_2001", "paths"))
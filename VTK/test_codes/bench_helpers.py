@@ -0,0 +1,20 @@
+import time
+import numpy as np
+
+def timed(fn, *args, **kwargs):
+    """(fn(*args, **kwargs), seconds it took)."""
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+def tube_points(n, radius=10.0, length=300.0, noise=0.0, seed=0):
+    """n random points on a bent tube surface, roughly like an aorta mesh, jittered by `noise`."""
+    rng = np.random.default_rng(seed)
+    t = rng.uniform(0, 1, n)
+    phi = rng.uniform(0, 2 * np.pi, n)
+    center = np.stack([20 * np.sin(3 * t), 10 * np.cos(2 * t), length * t], axis=1)
+    ring = np.stack([radius * np.cos(phi), radius * np.sin(phi), np.zeros(n)], axis=1)
+    points = center + ring
+    if noise > 0:
+        points += rng.normal(scale=noise, size=(n, 3))
+    return points
\ No newline at end of file
@@ -0,0 +1,45 @@
+import numpy as np
+import vtk
+from make_mesh import make_mesh
+from inside_mesh import InsideTester, enclosed_points_mask
+from bench_helpers import timed
+
+def closed_tube(radius=10.0, length=300.0, sides=64):
+    """Capped, bent tube surface, roughly like an aorta mesh."""
+    t = np.linspace(0, 1, 150)
+    center = np.stack([20 * np.sin(3 * t), 10 * np.cos(2 * t), length * t], axis=1)
+    points = vtk.vtkPoints()
+    lines = vtk.vtkCellArray()
+    lines.InsertNextCell(len(center))
+    for i, p in enumerate(center):
+        points.InsertNextPoint(*p)
+        lines.InsertCellPoint(i)
+    line = vtk.vtkPolyData()
+    line.SetPoints(points)
+    line.SetLines(lines)
+    tube = vtk.vtkTubeFilter()
+    tube.SetInputData(line)
+    tube.SetRadius(radius)
+    tube.SetNumberOfSides(sides)
+    tube.CappingOn()
+    triangles = vtk.vtkTriangleFilter()
+    triangles.SetInputConnection(tube.GetOutputPort())
+    triangles.Update()
+    return triangles.GetOutput()
+
+def main(sizes=(50, 500, 5000, 50000), repeats=3):
+    polydata = closed_tube()
+    mesh = make_mesh(polydata)
+    lo, hi = mesh.min(axis=0), mesh.max(axis=0)
+    tester, t_build = timed(InsideTester, polydata)
+    print(f"triangles: {polydata.GetNumberOfCells()}, InsideTester build: {t_build:.3f} s")
+    print(f"{'n':>7} {'vtk [s]':>9} {'tester [s]':>11} {'disagree':>9}")
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        pts = rng.uniform(lo, hi, (n, 3))
+        ref, t_vtk = min((timed(enclosed_points_mask, pts, polydata) for _ in range(repeats)), key=lambda r: r[1])
+        mask, t_tester = min((timed(tester, pts) for _ in range(repeats)), key=lambda r: r[1])
+        print(f"{n:7d} {t_vtk:9.4f} {t_tester:11.4f} {np.sum(mask != ref):9d}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,22 @@
+import numpy as np
+from make_endpoints import make_endpoints, make_endpoints_bruteforce
+from bench_helpers import timed, tube_points
+
+def main(sizes=(1000, 5000, 20000, 50000, 200000, 1000000), brute_limit=50000, approx=0.01):
+    print(f"{'n':>9} {'brute [s]':>10} {'hull [s]':>10} {'approx [s]':>11} {'approx err':>11} {'same pair':>10}")
+    for n in sizes:
+        pts = tube_points(n, noise=0.05)
+        hull_pair, t_hull = timed(make_endpoints, pts)
+        approx_pair, t_approx = timed(make_endpoints, pts, approx=approx)
+        d_exact = np.linalg.norm(pts[hull_pair[0]] - pts[hull_pair[1]])
+        d_approx = np.linalg.norm(pts[approx_pair[0]] - pts[approx_pair[1]])
+        if n <= brute_limit:
+            brute_pair, t_brute = timed(make_endpoints_bruteforce, pts)
+            same = str(brute_pair == hull_pair)
+            t_brute = f"{t_brute:10.3f}"
+        else:
+            same, t_brute = "-", f"{'skipped':>10}"
+        print(f"{n:9d} {t_brute} {t_hull:10.3f} {t_approx:11.3f} {1 - d_approx / d_exact:11.2e} {same:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import time
+import numpy as np
+from synthetic_vessels import vessel_tree, vessel_surface
+from manhattan_center import compute_slice_centerline
+from parameter_sweep import parameter_grid, sweep_centerlines
+
+def main(n_vertices=50000, grid=None):
+    """Time the shared-work sweep against one compute_slice_centerline call per parameter set, and check they agree."""
+    points, _ = vessel_surface(vessel_tree(seed=0), n_vertices)
+    if grid is None:
+        grid = parameter_grid(dz=[0.5, 1.0, 2.0], eps=[0.05, 0.1, 0.2], min_samples=[3, 5, 10], max_jump=[5.0, 10.0],
+                              sigma=[0.0, 1.0, 2.0])
+    print(f"{len(points)} mesh points, {len(grid)} parameter sets")
+
+    t0 = time.perf_counter()
+    swept = list(sweep_centerlines(points, grid))
+    t_sweep = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    mismatches = 0
+    for params, centerline in swept:
+        if not np.array_equal(compute_slice_centerline(points, **params), centerline):
+            mismatches += 1
+            print(f"  mismatch for {params}")
+    t_naive = time.perf_counter() - t0
+    print(f"sweep_centerlines: {t_sweep:.2f} s, one call per set: {t_naive:.2f} s ({t_naive / t_sweep:.1f}x), "
+          f"{mismatches} mismatches")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,37 @@
+import os
+import time
+import tempfile
+import matplotlib
+matplotlib.use("Agg")
+from synthetic_vessels import write_synthetic_model
+import main_auto_gt
+
+def drop_page_cache():
+    """Empty the OS file cache so every run reads from disk (Linux, root only)."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", 'w') as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+def main(n_models=8, n_vertices=200000, depths=(0, 1, 2, 4), centerline_params=None):
+    """Serial main_auto_gt runs on synthetic models, with and without reading ahead."""
+    centerline_params = {"eps": 0.1} if centerline_params is None else centerline_params
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir, pth_folder = os.path.join(tmp, "models"), os.path.join(tmp, "pths")
+        for i in range(n_models):
+            write_synthetic_model(models_dir, pth_folder, f"synthetic_{i:03d}", n_vertices, seed=i)
+        print(f"{n_models} models of {n_vertices} vertices, "
+              f"{sum(os.path.getsize(os.path.join(models_dir, f)) for f in os.listdir(models_dir)) / 2 ** 20:.0f} MB of .vtp")
+        for depth in depths:
+            cold = drop_page_cache()
+            out = os.path.join(tmp, f"out_{depth}")
+            t0 = time.perf_counter()
+            main_auto_gt.main(models_dir, pth_folder, out, os.path.join(out, "scores.csv"), prefetch_depth=depth,
+                              centerline_params=centerline_params)
+            print(f"prefetch_depth={depth}: {time.perf_counter() - t0:.2f} s ({'cold' if cold else 'warm'} page cache)")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
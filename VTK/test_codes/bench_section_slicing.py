@@ -0,0 +1,63 @@
+import os
+import glob
+import numpy as np
+from synthetic_vessels import vessel_tree, vessel_surface, sample_centerline, surface_polydata
+from read_file import read_file
+from make_mesh import make_mesh
+from load_path import load_branches
+from manhattan_center import compute_slice_centerline
+from section_slicing import compute_section_centerline
+from centerline_scoring import score_all_exact
+from bench_helpers import timed
+
+METRICS = ("mean_closest", "hausdorff95")
+DZ = (0.25, 0.5, 1.0, 2.0, 4.0)
+
+def compare(name, polydata, gt_branches, dz_values=DZ, eps=0.5):
+    """Vertex-mean slices against exact cross-sections at every dz, scored against the branches."""
+    points = make_mesh(polydata)
+    tolerances = np.linspace(0.5, 10, 20)
+    print(f"\n{name}: {len(points)} vertices")
+    print(f"{'method':>18} {'time [s]':>9} {'points':>7} " + " ".join(f"{m:>12}" for m in METRICS))
+    for dz in dz_values:
+        runs = [(f"vertex dz={dz:g}", compute_slice_centerline, points, {"dz": dz, "eps": eps}),
+                (f"section dz={dz:g}", compute_section_centerline, polydata, {"dz": dz})]
+        for method, fn, data, kwargs in runs:
+            line, t = timed(fn, data, **kwargs)
+            if len(line) < 2:
+                print(f"{method:>18} {t:9.3f} {len(line):7d} (no centerline)")
+                continue
+            scores = score_all_exact(line, list(gt_branches.values()), tolerances, workers=1)
+            print(f"{method:>18} {t:9.3f} {len(line):7d} " + " ".join(f"{scores[m]:12.3f}" for m in METRICS))
+
+def synthetic_radius_error(polydata, tree, dz=1.0):
+    """Median relative error of the section radius along the aorta, whose radius is known."""
+    line, radius = compute_section_centerline(polydata, dz=dz, return_radius=True)
+    aorta, _ = sample_centerline(tree["aorta"][0], 0.1)
+    # Only the stretch above the renal and iliac origins has a single round section
+    upper = line[:, 2] > aorta[:, 2].max() - 10.0
+    return float(np.median(np.abs(radius[upper] / tree["aorta"][1] - 1)))
+
+def main(input_folder=None, pth_folder=None, n_vertices=200000, dz_values=DZ):
+    """
+    Accuracy and time of compute_slice_centerline (clustered vertex mean)
+    and section_slicing.compute_section_centerline (area centroid of the cut
+    contour) over dz, on a synthetic tree and on the models with .pth ground truth.
+    """
+    tree = vessel_tree(seed=0)
+    polydata = surface_polydata(*vessel_surface(tree, n_vertices))
+    gt = {label: sample_centerline(curve, 0.1)[0] for label, (curve, _, _) in tree.items()}
+    compare("synthetic tree", polydata, gt, dz_values, eps=0.1)
+    print(f"aorta radius median relative error: {synthetic_radius_error(polydata, tree):.4f}")
+    if input_folder is None:
+        return
+    for vtp_file in sorted(glob.glob(os.path.join(input_folder, "*.vtp"))):
+        basename = os.path.splitext(os.path.basename(vtp_file))[0]
+        model_pth_dir = os.path.join(pth_folder, basename, "paths")
+        if os.path.exists(model_pth_dir):
+            compare(basename, read_file(vtp_file), load_branches(model_pth_dir), dz_values)
+
+if __name__ == "__main__":
+    input_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\models"
+    pth_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\pths"
+    main(input_folder, pth_folder)
\ No newline at end of file
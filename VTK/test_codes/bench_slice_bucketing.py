@@ -0,0 +1,36 @@
+import numpy as np
+from manhattan_center import slice_blocks
+from bench_helpers import timed, tube_points
+
+def mask_slices(points, axis, dz):
+    """The per-slice boolean mask loop compute_slice_centerline used before."""
+    coord = points[:, axis]
+    out = []
+    for z in np.arange(np.min(coord), np.max(coord), dz):
+        mask = (coord >= z) & (coord < z + dz)
+        out.append(points[mask])
+    return out
+
+def bucketed_slices(points, axis, dz):
+    slices, order, bounds, extra = slice_blocks(points[:, axis], dz)
+    sorted_pts = points[order]
+    out = []
+    for k in range(len(slices)):
+        block = sorted_pts[bounds[k]:bounds[k + 1]]
+        if k in extra:
+            block = points[np.union1d(order[bounds[k]:bounds[k + 1]], extra[k])]
+        out.append(block)
+    return out
+
+def main(sizes=(10000, 100000, 1000000), dzs=(2.0, 1.0, 0.5, 0.25, 0.1), axis=2):
+    print(f"{'n':>9} {'dz':>6} {'slices':>7} {'mask [s]':>9} {'bucket [s]':>10} {'speedup':>8} {'identical':>10}")
+    for n in sizes:
+        pts = tube_points(n)
+        for dz in dzs:
+            ref, t_mask = timed(mask_slices, pts, axis, dz)
+            new, t_bucket = timed(bucketed_slices, pts, axis, dz)
+            same = len(ref) == len(new) and all(np.array_equal(a, b) for a, b in zip(ref, new))
+            print(f"{n:9d} {dz:6.2f} {len(ref):7d} {t_mask:9.3f} {t_bucket:10.3f} {t_mask / t_bucket:8.1f} {str(same):>10}")
+
+if __name__ == "__main__":
+    main()
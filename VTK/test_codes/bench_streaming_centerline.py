@@ -0,0 +1,43 @@
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+from manhattan_center import compute_slice_centerline, iter_slice_centerline
+
+def write_tube_npy(path, n, radius=10.0, length=1000.0, chunk=1 << 20, seed=0):
+    """Write noisy tube surface points to an (n, 3) float32 .npy without holding them in memory."""
+    rng = np.random.default_rng(seed)
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n, 3))
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        t = rng.uniform(0, 1, m)
+        phi = rng.uniform(0, 2 * np.pi, m)
+        out[start:start + m] = np.stack([20 * np.sin(3 * t) + radius * np.cos(phi),
+                                         10 * np.cos(2 * t) + radius * np.sin(phi),
+                                         length * t], axis=1)
+    out.flush()
+    del out
+
+def measured(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+def main(sizes=(200000, 1000000, 3000000), chunk_size=1 << 18):
+    print(f"{'n':>9} {'batch [s]':>10} {'batch [MB]':>11} {'stream [s]':>11} {'stream [MB]':>12} {'identical':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"tube_{n}.npy")
+            write_tube_npy(path, n)
+            batch, t_batch, mb_batch = measured(lambda: compute_slice_centerline(np.load(path), eps=1.0))
+            stream, t_stream, mb_stream = measured(lambda: np.array(list(iter_slice_centerline(path, eps=1.0, chunk_size=chunk_size))))
+            same = batch.shape == stream.shape and np.array_equal(batch, stream)
+            print(f"{n:9d} {t_batch:10.2f} {mb_batch:11.1f} {t_stream:11.2f} {mb_stream:12.1f} {str(same):>10}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
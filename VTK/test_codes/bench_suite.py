@@ -0,0 +1,182 @@
+import os
+import glob
+import json
+import time
+import tempfile
+import subprocess
+import numpy as np
+from scipy.spatial import cKDTree
+from synthetic_vessels import write_synthetic_model
+from read_file import read_file
+from make_mesh import make_mesh
+from make_endpoints import make_endpoints
+from manhattan_center import compute_slice_centerline
+from load_path import load_pth_centerline
+from centerline_scoring import resample_branches, resample_line, score_all, score_all_exact, score_branches
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results")
+SIZES = (10000, 50000, 200000, 1000000, 5000000)
+# Models in mm like the sample data (aorta radius 10), the scale the compute_slice_centerline defaults are for
+MODEL_SCALE = 10.0
+
+def git_revision():
+    """Short commit hash of the tree, with a -dirty suffix for uncommitted tracked changes."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "-uno"], cwd=here, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return rev + ("-dirty" if dirty else "")
+
+def best_of(fn, repeat):
+    """Fastest of `repeat` calls, and the last result."""
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+def slice_params(points, dz=1.0, eps=0.5):
+    """
+    compute_slice_centerline dz/eps for a synthetic model: the defaults, widened
+    to twice the vertex spacing on meshes too coarse for them (the small
+    sizes), so every slice still holds whole vessel rings.
+    """
+    sample = points[::max(1, len(points) // 10000)]
+    spacing = np.percentile(cKDTree(points).query(sample, k=2)[0][:, 1], 90)
+    return {"dz": float(max(dz, 2 * spacing)), "eps": float(max(eps, 2 * spacing))}
+
+def bench_model(models_dir, pth_folder, n_vertices, repeat, tolerances):
+    """
+    Time every pipeline stage on one synthetic model (in mm, see MODEL_SCALE).
+    Return ({stage: seconds}, {quality metric: value}).
+    """
+    name = f"synthetic_{n_vertices}"
+    vtp_file, gt = write_synthetic_model(models_dir, pth_folder, name, n_vertices, scale=MODEL_SCALE)
+    pth_files = sorted(glob.glob(os.path.join(pth_folder, name, "paths", "*.pth")))
+    times = {}
+    polydata, times["read_file"] = best_of(lambda: read_file(vtp_file), repeat)
+    points, times["make_mesh"] = best_of(lambda: make_mesh(polydata), repeat)
+    _, times["make_endpoints"] = best_of(lambda: make_endpoints(points), repeat)
+    params = slice_params(points)
+    centerline, times["compute_slice_centerline"] = best_of(lambda: compute_slice_centerline(points, **params), repeat)
+    _, times["load_pth_centerline"] = best_of(lambda: [load_pth_centerline(f, use_cache=False) for f in pth_files], repeat)
+    scores, times["score_all"] = best_of(
+        lambda: score_all(resample_line(centerline, 100), resample_branches(gt.values(), 100), tolerances, workers=1), repeat)
+    exact, times["score_all_exact"] = best_of(lambda: score_all_exact(centerline, list(gt.values()), tolerances, workers=1), repeat)
+    rows, times["score_branches"] = best_of(lambda: score_branches(centerline, gt, workers=1), repeat)
+    quality = {
+        "mesh_points": len(points),
+        "dz": params["dz"],
+        "eps": params["eps"],
+        "centerline_points": len(centerline),
+        "mean_closest": float(scores["mean_closest"]),
+        "exact_mean_closest": float(exact["mean_closest"]),
+        "aorta_coverage": float(next(r["coverage"] for r in rows if r["branch"] == "aorta")),
+    }
+    return times, quality
+
+def run_suite(sizes=SIZES, repeat=3, large=1000000):
+    """Benchmark every size; models of `large` vertices and more are timed once."""
+    tolerances = np.linspace(0.5, 10, 20)
+    results = {"revision": git_revision(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "sizes": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            times, quality = bench_model(os.path.join(tmp, "models"), os.path.join(tmp, "pths"), n,
+                                         1 if n >= large else repeat, tolerances)
+            results["sizes"][str(n)] = {"seconds": times, "quality": quality}
+            print(f"{n:>9} vertices: " + ", ".join(f"{stage} {fmt_seconds(t).strip()}" for stage, t in times.items()))
+    return results
+
+def fmt_seconds(t):
+    return f"{t:10.4f}"
+
+def save_results(results, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    out_path = os.path.join(results_dir, f"{results['revision']}.json")
+    with open(out_path, 'w') as f:
+        json.dump(results, f, indent=1)
+    return out_path
+
+def load_baseline(results, results_dir=RESULTS_DIR, revision=None):
+    """Results of `revision`, or of the most recent other run in results_dir."""
+    if revision is not None:
+        with open(os.path.join(results_dir, f"{revision}.json")) as f:
+            return json.load(f)
+    runs = []
+    for path in glob.glob(os.path.join(results_dir, "*.json")):
+        with open(path) as f:
+            run = json.load(f)
+        if run["revision"] != results["revision"]:
+            runs.append(run)
+    return max(runs, key=lambda run: run["timestamp"]) if runs else None
+
+def scaling_table(results):
+    """Print seconds per stage and size, with the log-log slope (1 = linear) over the sizes."""
+    sizes = sorted(results["sizes"], key=int)
+    stages = list(results["sizes"][sizes[0]]["seconds"])
+    print(f"\n{'stage':>26} " + " ".join(f"{int(n):>10}" for n in sizes) + f" {'slope':>6}")
+    for stage in stages:
+        t = [results["sizes"][n]["seconds"][stage] for n in sizes]
+        slope = np.nan
+        if len(sizes) > 1:
+            slope = np.polyfit(np.log(np.array(sizes, dtype=np.float64)), np.log(np.maximum(t, 1e-9)), 1)[0]
+        print(f"{stage:>26} " + " ".join(fmt_seconds(x) for x in t) + f" {slope:6.2f}")
+
+def find_regressions(results, baseline, threshold=1.2, min_delta=0.005):
+    """(size, stage, baseline s, current s) for stages more than threshold times and min_delta s slower."""
+    regressions = []
+    for n, current in results["sizes"].items():
+        if n not in baseline["sizes"]:
+            continue
+        before = baseline["sizes"][n]["seconds"]
+        for stage, t in current["seconds"].items():
+            if before.get(stage) is None:
+                continue
+            if t > threshold * before[stage] and t - before[stage] > min_delta:
+                regressions.append((int(n), stage, before[stage], t))
+    return regressions
+
+def plot_scaling(results, out_path):
+    import matplotlib.pyplot as plt
+    sizes = sorted(results["sizes"], key=int)
+    plt.figure()
+    for stage in results["sizes"][sizes[0]]["seconds"]:
+        plt.loglog([int(n) for n in sizes], [results["sizes"][n]["seconds"][stage] for n in sizes], marker='o', label=stage)
+    plt.xlabel('Mesh vertices')
+    plt.ylabel('Time [s]')
+    plt.title(f"Scaling at {results['revision']}")
+    plt.grid(True, which='both')
+    plt.legend(fontsize='small')
+    plt.savefig(out_path, dpi=120)
+    plt.close()
+
+def main(sizes=SIZES, repeat=3, baseline_revision=None, threshold=1.2, plot=False):
+    """
+    Run the suite on synthetic models, store bench_results/<revision>.json,
+    print the scaling table and compare with the baseline run (the given
+    revision, or the latest other one). Return the regressions found.
+    """
+    results = run_suite(sizes, repeat)
+    out_path = save_results(results)
+    print(f"Saved {out_path}")
+    scaling_table(results)
+    if plot:
+        plot_scaling(results, os.path.splitext(out_path)[0] + ".png")
+
+    baseline = load_baseline(results, revision=baseline_revision)
+    if baseline is None:
+        print("\nNo earlier run to compare with.")
+        return []
+    regressions = find_regressions(results, baseline, threshold)
+    print(f"\nCompared with {baseline['revision']} ({baseline['timestamp']}):")
+    for n, stage, before, now in regressions:
+        print(f"  REGRESSION {stage} at {n} vertices: {before:.4f} s -> {now:.4f} s ({now / before:.2f}x)")
+    if not regressions:
+        print(f"  no stage more than {threshold:.2f}x slower")
+    return regressions
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,5 +1,7 @@
 import vtk
-import numpy as np
+from make_mesh import make_polyline
+from load_path import load_pth_centerline
+from centerline_io import load_centerline
 
 def load_vtk_model(filename):
     if filename.endswith('.vtp'):
@@ -13,37 +15,11 @@ def load_vtk_model(filename):
     return reader.GetOutput()
 
 def load_csv_centerline(filename):
-    return np.loadtxt(filename, delimiter=',', skiprows=1)  # skip header
-
-import xml.etree.ElementTree as ET
-def load_pth_centerline(pth_file):
-    with open(pth_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    start = content.find("<path")
-    end = content.rfind("</path>") + len("</path>")
-    xml_str = content[start:end]
-    root = ET.fromstring(xml_str)
-    points = []
-    for path_point in root.findall(".//path_points/path_point"):
-        pos = path_point.find("pos")
-        x = float(pos.attrib['x'])
-        y = float(pos.attrib['y'])
-        z = float(pos.attrib['z'])
-        points.append([x, y, z])
-    return np.array(points)
+    """Read a saved centerline, .npy (memory-mapped) or .csv."""
+    return load_centerline(filename)
 
 def make_polydata_from_points(pts):
-    vtk_points = vtk.vtkPoints()
-    for pt in pts:
-        vtk_points.InsertNextPoint(pt)
-    lines = vtk.vtkCellArray()
-    lines.InsertNextCell(len(pts))
-    for j in range(len(pts)):
-        lines.InsertCellPoint(j)
-    poly_data = vtk.vtkPolyData()
-    poly_data.SetPoints(vtk_points)
-    poly_data.SetLines(lines)
-    return poly_data
+    return make_polyline(pts)
 
 def show_model_with_centerlines(model_file, auto_csv, pth_gt):
     # Load model surface
@@ -93,6 +69,6 @@ def show_model_with_centerlines(model_file, auto_csv, pth_gt):
 if __name__ == "__main__":
     # Provide your file paths here
     model_file = r"/VTK/models/0161_0001.vtp"
-    auto_csv = r"C:\Users\robik\PyCharmMiscProject\VTK\centerlines_auto\0161_0001_centerline.csv"
+    auto_csv = r"C:\Users\robik\PyCharmMiscProject\VTK\centerlines_auto\0161_0001_centerline.npy"  # .csv files from older runs work too
     pth_gt = r"C:\Users\robik\PyCharmMiscProject\VTK\pths\0161_0001\paths\aorta.pth"
     show_model_with_centerlines(model_file, auto_csv, pth_gt)
\ No newline at end of file
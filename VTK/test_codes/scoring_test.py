@@ -1,26 +1,8 @@
 import os
 import glob
 import numpy as np
-import xml.etree.ElementTree as ET
-
-def load_pth_centerline(pth_file):
-    with open(pth_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    start = content.find("<path")
-    end = content.rfind("</path>") + len("</path>")
-    if start == -1 or end == -1:
-        raise ValueError(f"Could not find <path> in {pth_file}")
-    xml_str = content[start:end]
-    root = ET.fromstring(xml_str)
-
-    points = []
-    for path_point in root.findall(".//path_points/path_point"):
-        pos = path_point.find("pos")
-        x = float(pos.attrib['x'])
-        y = float(pos.attrib['y'])
-        z = float(pos.attrib['z'])
-        points.append([x, y, z])
-    return np.array(points)
+from load_path import load_all_segments
+from prefetch import prefetch, read_pth_dir
 
 def resample_line(line, num=100):
     from scipy.interpolate import interp1d
@@ -57,26 +39,11 @@ def average_symmetric_distance(pred, gt):
 def save_centerline_csv(centerline, out_path):
     np.savetxt(out_path, centerline, delimiter=",", header="x,y,z", comments='')
 
-def load_all_segments(model_pth_dir):
-    """
-    Load and concatenate all segment .pth files in a directory.
-    Return a single (N,3) array of all path points.
-    """
-    segment_files = sorted(glob.glob(os.path.join(model_pth_dir, "*.pth")))
-    if not segment_files:
-        raise FileNotFoundError(f"No .pth files found in {model_pth_dir}")
-    all_points = []
-    for seg in segment_files:
-        try:
-            seg_points = load_pth_centerline(seg)
-            all_points.append(seg_points)
-        except Exception as e:
-            print(f"Failed to load {seg}: {e}")
-    if not all_points:
-        raise ValueError(f"No valid centerline points loaded from {model_pth_dir}")
-    return np.concatenate(all_points, axis=0)
-
-def main(input_folder, pth_folder, output_folder, output_scores_csv):
+def model_pth_dir(pth_folder, vtp_file):
+    basename = os.path.splitext(os.path.basename(vtp_file))[0]
+    return os.path.join(pth_folder, basename, "paths")
+
+def main(input_folder, pth_folder, output_folder, output_scores_csv, prefetch_depth=2):
     os.makedirs(output_folder, exist_ok=True)
     vtp_files = glob.glob(os.path.join(input_folder, "*.vtp"))
     print(f"Found {len(vtp_files)} .vtp files in {input_folder}")
@@ -88,7 +55,9 @@ def main(input_folder, pth_folder, output_folder, output_scores_csv):
 
     with open(output_scores_csv, 'w') as score_file:
         score_file.write("filename,mean_closest,hausdorff,avg_symmetric\n")
-        for vtp_file in vtp_files:
+        # Read the .pth files of the next models while this one is scored
+        read_gt = lambda vtp_file: read_pth_dir(model_pth_dir(pth_folder, vtp_file))
+        for vtp_file, gt_contents in prefetch(vtp_files, read_gt, prefetch_depth):
             print(f"Processing: {vtp_file}")
             # polydata = read_file(vtp_file)
             # points = make_mesh(polydata)
@@ -99,13 +68,13 @@ def main(input_folder, pth_folder, output_folder, output_scores_csv):
             # out_csv = os.path.join(output_folder, f"{basename}_centerline.csv")
             # save_centerline_csv(centerline, out_csv)
 
-            model_pth_dir = os.path.join(pth_folder, basename, "paths")
-            if not os.path.exists(model_pth_dir):
+            gt_dir = model_pth_dir(pth_folder, vtp_file)
+            if not os.path.exists(gt_dir):
                 print(f"Ground truth dir not found for {basename}")
                 score_file.write(f"{basename},,,\n")
                 continue
             try:
-                gt_centerline = load_all_segments(model_pth_dir)
+                gt_centerline = load_all_segments(gt_dir, gt_contents.result())
             except Exception as e:
                 print(f"Failed to load segments for {basename}: {e}")
                 score_file.write(f"{basename},,,\n")
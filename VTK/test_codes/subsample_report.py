@@ -0,0 +1,110 @@
+import os
+import glob
+import time
+import tempfile
+import numpy as np
+from synthetic_vessels import write_synthetic_model
+from read_file import read_file
+from make_mesh import make_mesh
+from manhattan_center import compute_slice_centerline
+from load_path import load_branches
+from subsample import subsample_points
+from centerline_scoring import resample_branches, resample_line, score_all
+
+SETTINGS = [None] + [{"method": "voxel", "spacing": s} for s in (0.05, 0.1, 0.2, 0.3, 0.4)] \
+    + [{"method": "poisson", "spacing": s} for s in (0.05, 0.1, 0.2, 0.3)]
+
+def setting_name(setting):
+    return "none" if setting is None else f"{setting['method']} {setting['spacing']:g}"
+
+def hd95_vs_gt(centerline, gt_branches, tolerances):
+    """hausdorff95_distance as main_auto_gt scores it (both lines resampled to 100 points, the GT per branch)."""
+    if len(centerline) < 2:
+        return np.inf
+    scores = score_all(resample_line(centerline, 100), resample_branches(gt_branches, 100), tolerances, workers=1)
+    return float(scores["hausdorff95"])
+
+def time_setting(points, setting, centerline_params, repeat):
+    """Best time of subsample + compute_slice_centerline over `repeat` runs, with the last centerline and point count."""
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        kept = points if setting is None else subsample_points(points, **setting)
+        centerline = compute_slice_centerline(kept, **centerline_params)
+        best = min(best, time.perf_counter() - t0)
+    return centerline, len(kept), best
+
+def evaluate(input_folder, pth_folder, settings=SETTINGS, centerline_params=None, repeat=3):
+    """
+    Run every setting on every model with ground truth in pth_folder.
+    Return {setting name: {"points", "seconds", "hd95"}} with one value per model.
+    """
+    centerline_params = centerline_params or {}
+    tolerances = np.linspace(0.5, 10, 20)
+    results = {setting_name(s): {"points": [], "seconds": [], "hd95": []} for s in settings}
+    for vtp_file in sorted(glob.glob(os.path.join(input_folder, "*.vtp"))):
+        basename = os.path.splitext(os.path.basename(vtp_file))[0]
+        model_pth_dir = os.path.join(pth_folder, basename, "paths")
+        if not os.path.exists(model_pth_dir):
+            print(f"Ground truth dir not found for {basename}")
+            continue
+        points = make_mesh(read_file(vtp_file))
+        gt_branches = list(load_branches(model_pth_dir).values())
+        for setting in settings:
+            centerline, n_points, seconds = time_setting(points, setting, centerline_params, repeat)
+            row = results[setting_name(setting)]
+            row["points"].append(n_points)
+            row["seconds"].append(seconds)
+            row["hd95"].append(hd95_vs_gt(centerline, gt_branches, tolerances))
+        print(f"{basename}: {len(points)} points")
+    return results
+
+def operating_point(results, max_hd95_change=0.1):
+    """Fastest setting whose hd95 differs from "none" by at most max_hd95_change on every model."""
+    base = results["none"]
+    best = "none"
+    for name, row in results.items():
+        change = np.max(np.abs(np.subtract(row["hd95"], base["hd95"])))
+        if change <= max_hd95_change and np.sum(row["seconds"]) < np.sum(results[best]["seconds"]):
+            best = name
+    return best
+
+def report(results, max_hd95_change=0.1, target_speedup=10.0):
+    base = results["none"]
+    base_seconds = np.sum(base["seconds"])
+    print(f"\n{'setting':>12} {'points':>10} {'seconds':>9} {'speedup':>8} {'hd95':>8} {'max |d hd95|':>13}")
+    for name, row in results.items():
+        change = np.max(np.abs(np.subtract(row["hd95"], base["hd95"])))
+        print(f"{name:>12} {np.mean(row['points']):10.0f} {np.sum(row['seconds']):9.3f} "
+              f"{base_seconds / np.sum(row['seconds']):7.1f}x {np.mean(row['hd95']):8.3f} {change:13.3f}")
+    best = operating_point(results, max_hd95_change)
+    speedup = base_seconds / np.sum(results[best]["seconds"])
+    print(f"\nFastest setting within {max_hd95_change} of the full-mesh hd95: {best} ({speedup:.1f}x)")
+    if speedup < target_speedup:
+        print(f"  below the {target_speedup:.0f}x target: the meshes are already near the spacing that keeps hd95")
+    return best
+
+def synthetic_cohort(tmp, n_models=3, n_vertices=200000):
+    models_dir, pth_folder = os.path.join(tmp, "models"), os.path.join(tmp, "pths")
+    for i in range(n_models):
+        write_synthetic_model(models_dir, pth_folder, f"synthetic_{i:03d}", n_vertices, seed=i)
+    return models_dir, pth_folder
+
+def main(input_folder=None, pth_folder=None, settings=SETTINGS, centerline_params=None, repeat=3, max_hd95_change=0.1):
+    """
+    Accuracy against the .pth ground truth versus compute time of
+    subsample_points + compute_slice_centerline, to pick the `subsample`
+    argument of main_auto_gt.main(). Without folders it runs on synthetic models.
+    """
+    if input_folder is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            input_folder, pth_folder = synthetic_cohort(tmp)
+            results = evaluate(input_folder, pth_folder, settings, centerline_params, repeat)
+    else:
+        results = evaluate(input_folder, pth_folder, settings, centerline_params, repeat)
+    return report(results, max_hd95_change)
+
+if __name__ == "__main__":
+    input_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\models"
+    pth_folder = r"C:\Users\robik\PyCharmMiscProject\VTK\pths"
+    main(input_folder, pth_folder)
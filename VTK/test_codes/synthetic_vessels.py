@@ -0,0 +1,198 @@
+import os
+import numpy as np
+import vtk
+from vtk.util.numpy_support import numpy_to_vtkIdTypeArray
+from make_mesh import make_vtk_points, VTK_ID_DTYPE
+
+def _line(origin, direction, bend, length):
+    """Curve t -> origin + length * t * direction + a sideways bend growing with t^2."""
+    origin = np.asarray(origin, dtype=np.float64)
+    direction = np.asarray(direction, dtype=np.float64)
+    direction = direction / np.linalg.norm(direction)
+    bend = np.asarray(bend, dtype=np.float64)
+
+    def curve(t):
+        t = np.asarray(t, dtype=np.float64)[:, None]
+        return origin + length * t * direction + t ** 2 * bend
+    return curve
+
+def _scaled(curve, scale):
+    return lambda t: scale * curve(t)
+
+def vessel_tree(seed=None, scale=1.0):
+    """
+    Analytic abdominal-aorta-like tree (aorta running down z): aorta, two
+    renals and the iliac bifurcation, with an aorta of radius 1 and length 40.
+    Return {label: (curve, radius, parent label)}, curve(t) -> (N, 3) for t in [0, 1].
+    seed: jitter the bends by up to 20% for a different but similar model.
+    scale: multiply every length; scale=10 gives the mm geometry of the sample
+    models (aorta radius 10, theirs is about 9), which the defaults of
+    compute_slice_centerline (dz=1.0, eps=0.5) are meant for.
+    """
+    rng = np.random.default_rng(seed)
+    jitter = (lambda: 1.0) if seed is None else (lambda: rng.uniform(0.8, 1.2))
+
+    sway, arch = 1.5 * jitter(), 0.8 * jitter()
+
+    def aorta(t):
+        t = np.asarray(t, dtype=np.float64)
+        return np.stack([sway * np.sin(1.5 * np.pi * t), arch * (1 - np.cos(np.pi * t)), -40.0 * t], axis=1)
+    renal_origin = aorta([0.3])[0]
+    bifurcation = aorta([1.0])[0]
+    tree = {
+        "aorta": (aorta, 1.0, None),
+        "renal_left": (_line(renal_origin, (-1, 0.2, -0.3), (0, 0.5 * jitter(), -0.6), 8.0), 0.3, "aorta"),
+        "renal_right": (_line(renal_origin, (1, 0.2, -0.2), (0, 0.5 * jitter(), -0.6), 8.0), 0.3, "aorta"),
+        "iliac_left": (_line(bifurcation, (-0.45, 0.1, -1), (-1.5 * jitter(), 1.0, 0), 15.0), 0.5, "aorta"),
+        "iliac_right": (_line(bifurcation, (0.45, 0.1, -1), (1.5 * jitter(), 1.0, 0), 15.0), 0.5, "aorta"),
+    }
+    if scale == 1.0:
+        return tree
+    return {label: (_scaled(curve, scale), radius * scale, parent) for label, (curve, radius, parent) in tree.items()}
+
+def curve_length(curve, samples=2048):
+    pts = curve(np.linspace(0, 1, samples))
+    return np.sum(np.linalg.norm(np.diff(pts, axis=0), axis=1))
+
+def curve_tangents(curve, t, h=1e-5):
+    t = np.asarray(t, dtype=np.float64)
+    d = curve(np.minimum(t + h, 1.0)) - curve(np.maximum(t - h, 0.0))
+    return d / np.linalg.norm(d, axis=1, keepdims=True)
+
+def sample_centerline(curve, spacing=0.1):
+    """Points and unit tangents of curve about `spacing` apart (the .pth path_point density)."""
+    n = max(2, int(np.ceil(curve_length(curve) / spacing)) + 1)
+    t = np.linspace(0, 1, n)
+    return curve(t), curve_tangents(curve, t)
+
+def ring_frames(tangents):
+    """Unit vectors (u, v) across the tangents, built from the axis least aligned with the branch."""
+    ref = np.eye(3)[np.argmin(np.abs(tangents.mean(axis=0)))]
+    u = np.cross(tangents, ref)
+    u /= np.linalg.norm(u, axis=1, keepdims=True)
+    return u, np.cross(tangents, u)
+
+def tube_surface(curve, radius, rings, sides, t0=0.0, cap_start=True, cap_end=True, noise=0.0, rng=None):
+    """
+    Triangulated tube of `rings` circles of `sides` vertices around curve(t), t in [t0, 1].
+    Ends are closed with a fan around their center when capped.
+    Return (vertices (M, 3), triangles (K, 3)).
+    """
+    t = np.linspace(t0, 1.0, rings)
+    centers = curve(t)
+    u, v = ring_frames(curve_tangents(curve, t))
+    phi = 2 * np.pi * np.arange(sides) / sides
+    r = np.full((rings, sides), float(radius))
+    if noise > 0:
+        r *= 1 + noise * rng.standard_normal((rings, sides))
+    vertices = (centers[:, None] + r[..., None] * (np.cos(phi)[None, :, None] * u[:, None]
+                                                     + np.sin(phi)[None, :, None] * v[:, None])).reshape(-1, 3)
+    i, j = np.meshgrid(np.arange(rings - 1), np.arange(sides), indexing='ij')
+    a = i * sides + j
+    b = i * sides + (j + 1) % sides
+    triangles = [np.stack([a, b, b + sides], axis=-1).reshape(-1, 3),
+                 np.stack([a, b + sides, a + sides], axis=-1).reshape(-1, 3)]
+    extra = []
+    j = np.arange(sides)
+    for capped, ring, center in ((cap_start, 0, centers[0]), (cap_end, rings - 1, centers[-1])):
+        if not capped:
+            continue
+        c = len(vertices) + len(extra)
+        extra.append(center)
+        first = ring * sides
+        fan = np.stack([np.full(sides, c), first + (j + 1) % sides, first + j], axis=1)
+        triangles.append(fan if ring == 0 else fan[:, [0, 2, 1]])
+    if extra:
+        vertices = np.concatenate([vertices, extra])
+    return vertices, np.concatenate(triangles)
+
+def vessel_surface(tree, n_vertices=50000, noise=0.0, seed=0):
+    """
+    Surface mesh of all branches with about n_vertices vertices.
+    Every branch has the same number of sides, rings are spread over the
+    branches by length. A child tube starts on the wall of its parent and is
+    left open there: the tubes overlap, they are not merged by a boolean union.
+    Return (vertices float64 (N, 3), triangles (K, 3)).
+    """
+    rng = np.random.default_rng(seed)
+    sides = int(np.clip(np.sqrt(n_vertices / 10), 12, 400))
+    lengths = {label: curve_length(curve) for label, (curve, _, _) in tree.items()}
+    total = sum(lengths.values())
+    vertices, triangles, n = [], [], 0
+    for label, (curve, radius, parent) in tree.items():
+        rings = max(2, int(round((n_vertices / sides) * lengths[label] / total)))
+        t0 = 0.0
+        if parent is not None:
+            t0 = min(0.5, tree[parent][1] / lengths[label])
+        v, f = tube_surface(curve, radius, rings, sides, t0=t0, cap_start=parent is None, noise=noise, rng=rng)
+        vertices.append(v)
+        triangles.append(f + n)
+        n += len(v)
+    return np.concatenate(vertices), np.concatenate(triangles)
+
+def surface_polydata(vertices, triangles):
+    """vtkPolyData from vertex and triangle arrays, loaded in bulk."""
+    offsets = np.arange(0, 3 * len(triangles) + 1, 3, dtype=VTK_ID_DTYPE)
+    cells = vtk.vtkCellArray()
+    cells.SetData(numpy_to_vtkIdTypeArray(offsets, deep=True),
+                  numpy_to_vtkIdTypeArray(np.ascontiguousarray(triangles, dtype=VTK_ID_DTYPE).ravel(), deep=True))
+    polydata = vtk.vtkPolyData()
+    polydata.SetPoints(make_vtk_points(vertices))
+    polydata.SetPolys(cells)
+    return polydata
+
+def write_vtp(polydata, out_path):
+    writer = vtk.vtkXMLPolyDataWriter()
+    writer.SetFileName(out_path)
+    writer.SetInputData(polydata)
+    writer.SetDataModeToAppended()
+    writer.EncodeAppendedDataOff()
+    if not writer.Write():
+        raise OSError(f"Could not write {out_path}")
+
+def _xyz(p):
+    return f'x="{p[0]:.6f}" y="{p[1]:.6f}" z="{p[2]:.6f}"'
+
+def write_pth(points, tangents, rotations, out_path, path_id=0):
+    """Write a polyline as a SimVascular .pth path (readable by load_path.load_pth_arrays)."""
+    control = points[np.unique(np.linspace(0, len(points) - 1, min(len(points), 16)).astype(int))]
+    lines = ['<?xml version="1.0" encoding="UTF-8" ?>',
+             '<format version="1.0" />',
+             f'<path id="{path_id}" method="0" calculation_number="{len(points)}" spacing="0">',
+             '    <timestep id="0">',
+             f'        <path_element method="0" calculation_number="{len(points)}" spacing="0">',
+             '            <control_points>']
+    lines += [f'                <point id="{i}" {_xyz(p)} />' for i, p in enumerate(control)]
+    lines += ['            </control_points>', '            <path_points>']
+    for i, (p, t, r) in enumerate(zip(points, tangents, rotations)):
+        lines += [f'                <path_point id="{i}">',
+                  f'                    <pos {_xyz(p)} />',
+                  f'                    <tangent {_xyz(t)} />',
+                  f'                    <rotation {_xyz(r)} />',
+                  '                </path_point>']
+    lines += ['            </path_points>', '        </path_element>', '    </timestep>', '</path>']
+    with open(out_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_synthetic_model(models_dir, pth_folder, name, n_vertices=50000, seed=None, noise=0.0, spacing=0.1, scale=1.0):
+    """
+    Write <models_dir>/<name>.vtp and one <pth_folder>/<name>/paths/<branch>.pth
+    per branch, the layout main_auto_gt.main() reads.
+    The .pth polylines sample the analytic centerlines every `spacing` (in the
+    units of the model, see vessel_tree for scale).
+    Return (vtp path, {branch: (N, 3) GT polyline}).
+    """
+    tree = vessel_tree(seed, scale)
+    vertices, triangles = vessel_surface(tree, n_vertices, noise, seed=0 if seed is None else seed)
+    os.makedirs(models_dir, exist_ok=True)
+    vtp_file = os.path.join(models_dir, f"{name}.vtp")
+    write_vtp(surface_polydata(vertices, triangles), vtp_file)
+
+    paths_dir = os.path.join(pth_folder, name, "paths")
+    os.makedirs(paths_dir, exist_ok=True)
+    branches = {}
+    for path_id, (label, (curve, _, _)) in enumerate(tree.items()):
+        points, tangents = sample_centerline(curve, spacing)
+        write_pth(points, tangents, ring_frames(tangents)[0], os.path.join(paths_dir, f"{label}.pth"), path_id)
+        branches[label] = points
+    return vtp_file, branches
\ No newline at end of file
@@ -0,0 +1,51 @@
+import os
+import shutil
+import numpy as np
+from artifact_cache import ArtifactCache, bytes_hash, file_hash, files_hash, make_key
+from main_auto_gt import load_model_branches
+
+def test_int_and_float_params_share_a_key():
+    assert make_key("centerline", {"dz": 1, "eps": 0.5}) == make_key("centerline", {"dz": 1.0, "eps": np.float64(0.5)})
+    assert make_key({"dz": 1.0}) != make_key({"dz": 2.0})
+
+def test_hashes_of_read_contents_match_the_files(tmp_path):
+    paths = [str(tmp_path / name) for name in ("a.pth", "b.pth")]
+    for path, data in zip(paths, (b"first", b"second")):
+        with open(path, 'wb') as f:
+            f.write(data)
+    assert bytes_hash(b"first") == file_hash(paths[0])
+    assert files_hash(paths, {paths[0]: b"first", paths[1]: b"second"}) == files_hash(paths)
+    # Files missing from contents are still read
+    assert files_hash(paths, {paths[1]: b"second"}) == files_hash(paths)
+
+def test_cache_hit_keeps_the_branch_order(tmp_path):
+    # load_branches orders by path, "a-b.pth" before "a.pth" ('-' < '.'), sorted labels would put "a" first
+    pth_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pths", "0140_2001", "paths")
+    model_dir = tmp_path / "paths"
+    model_dir.mkdir()
+    for label, source in (("a", "aorta.pth"), ("a-b", "SMA.pth")):
+        shutil.copy(os.path.join(pth_dir, source), model_dir / f"{label}.pth")
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    stored = load_model_branches(str(model_dir), cache)
+    assert list(load_model_branches(str(model_dir), cache)) == list(stored) == ["a-b", "a"]
+
+def test_writes_of_other_processes_are_evicted(tmp_path):
+    entry = np.zeros(1000)
+    cache = ArtifactCache(str(tmp_path), max_bytes=20 * entry.nbytes, low_water=0.5)
+    # Fewer own writes than max_bytes: only the listings catch the other writer
+    for i in range(19):
+        cache.put(make_key("own", i), data=entry)
+        # A pool worker writing to the same folder, which this process does not count
+        other = os.path.join(str(tmp_path), "zz", f"{make_key('other', i)}.npz")
+        os.makedirs(os.path.dirname(other), exist_ok=True)
+        np.savez(other, data=entry)
+    total = sum(size for _, size, _ in cache.entries())
+    assert total <= 1.5 * cache.max_bytes
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_int_and_float_params_share_a_key()
+    for test in (test_hashes_of_read_contents_match_the_files, test_cache_hit_keeps_the_branch_order, test_writes_of_other_processes_are_evicted):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
+    print("ok")
\ No newline at end of file
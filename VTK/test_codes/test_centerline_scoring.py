@@ -0,0 +1,52 @@
+import numpy as np
+from centerline_scoring import PolylineIndex, point_segment_distances, resample_branches
+
+def brute_force_distances(points, line):
+    """Distance of every point to every segment of line, the closest kept."""
+    seg_a, seg_b = line[:-1], line[1:]
+    n = len(seg_a)
+    d = point_segment_distances(np.repeat(points, n, axis=0), np.tile(seg_a, (len(points), 1)), np.tile(seg_b, (len(points), 1)))
+    return d.reshape(len(points), n).min(axis=1)
+
+def test_point_past_collinear_end():
+    # The ball around the query rounded below the true distance and found no segment
+    dists, segments = PolylineIndex(np.array([[0, 0, 0], [0, 0, 0.3], [0, 0, 0.6]])).query(np.array([[0, 0, 0.7]]))
+    assert np.isclose(dists[0], 0.1)
+    assert segments[0] == 1
+
+def test_collinear_stress():
+    rng = np.random.default_rng(0)
+    for _ in range(3000):
+        direction = rng.normal(size=3)
+        direction /= np.linalg.norm(direction)
+        origin = rng.uniform(-100, 100, size=3)
+        steps = np.cumsum(rng.uniform(0.01, 1.0, size=rng.integers(2, 8)))
+        line = origin + np.concatenate([[0.0], steps])[:, None] * direction
+        # Points on the line, before, inside and past the polyline
+        t = rng.uniform(-2.0, steps[-1] + 2.0, size=4)
+        points = origin + t[:, None] * direction
+        dists, _ = PolylineIndex(line).query(points)
+        assert np.allclose(dists, brute_force_distances(points, line), atol=1e-9)
+
+def test_random_polylines():
+    rng = np.random.default_rng(1)
+    line = np.cumsum(rng.normal(size=(200, 3)), axis=0)
+    points = rng.uniform(line.min(axis=0), line.max(axis=0), size=(500, 3))
+    dists, _ = PolylineIndex(line).query(points)
+    assert np.allclose(dists, brute_force_distances(points, line))
+
+def test_resample_branches_skips_the_gaps():
+    # Two parallel branches 10 apart: nothing between them, points split 70/30 by length
+    left = np.array([[0.0, 0, 0], [0, 0, 70]])
+    right = np.array([[10.0, 0, 0], [10, 0, 30]])
+    points = resample_branches([left, right], 100)
+    assert len(points) == 100
+    assert np.sum(points[:, 0] == 0) == 70
+    assert np.all((points[:, 0] == 0) | (points[:, 0] == 10))
+
+if __name__ == "__main__":
+    test_point_past_collinear_end()
+    test_collinear_stress()
+    test_random_polylines()
+    test_resample_branches_skips_the_gaps()
+    print("ok")
\ No newline at end of file
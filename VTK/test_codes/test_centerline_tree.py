@@ -0,0 +1,54 @@
+import os
+import re
+import numpy as np
+from load_path import load_branches
+from centerline_tree import extract_centerline_tree, label_branches
+from bench_centerline_tree import vessel_tree_points
+
+PTH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pths", "0140_2001", "paths")
+
+# Side vessels and the vessel they leave, as the tree links them (upstream -> downstream in slice order)
+PARENTS = {
+    "renal_left": "aorta",
+    "renal_right": "aorta",
+    "SMA": "aorta",
+    "IMA": "aorta",
+    "ext_iliac_left": "aorta",
+    "int_iliac_right": "aorta",  # the aorta .pth runs on into the right iliac
+    "int_iliac_left": "ext_iliac_left",
+}
+
+def base_name(label):
+    return re.sub(r"_\d+$", "", label)
+
+def synthetic_tree():
+    gt = load_branches(PTH_DIR)
+    branches, links = extract_centerline_tree(vessel_tree_points(gt), dz=0.1, eps=0.2, link_dist=0.2)
+    named, mapping = label_branches(branches, gt)
+    return gt, named, [(mapping[a], mapping[b]) for a, b in links]
+
+def test_branch_count():
+    gt, named, _ = synthetic_tree()
+    assert len(named) <= 18
+    assert all(any(base_name(name) == label for name in named) for label in gt)
+    # One aorta spanning the GT aorta; other aorta pieces are stubs at side vessel origins
+    aorta_z = np.ptp(gt["aorta"][:, 2])
+    assert np.ptp(named["aorta"][:, 2]) > 0.9 * aorta_z
+    stubs = [line for name, line in named.items() if base_name(name) == "aorta" and name != "aorta"]
+    assert all(np.ptp(line[:, 2]) < 1.0 for line in stubs)
+
+def test_parent_links():
+    _, _, links = synthetic_tree()
+    for label, parent in PARENTS.items():
+        assert (label, parent) in links, f"{label} is not linked to {parent}: {links}"
+    for a, b in links:
+        a, b = base_name(a), base_name(b)
+        if a == b or "aorta" in (a, b) or PARENTS.get(a) == b:
+            continue
+        # The celiac trunk has no .pth of its own, its pieces go to either celiac branch
+        assert a.startswith("celiac") and b.startswith("celiac"), f"impossible link {a} -> {b}"
+
+if __name__ == "__main__":
+    test_branch_count()
+    test_parent_links()
+    print("ok")
\ No newline at end of file
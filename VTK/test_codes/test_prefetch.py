@@ -0,0 +1,32 @@
+import time
+import threading
+from prefetch import prefetch
+
+def started_loads(depth, n_items=10):
+    """Number of loads started while the first item is being processed."""
+    started = []
+    lock = threading.Lock()
+
+    def load(item):
+        with lock:
+            started.append(item)
+        return item
+
+    for item, future in prefetch(range(n_items), load, depth):
+        assert future.result() == item
+        time.sleep(0.2)  # let the background loads run as far ahead as they may
+        with lock:
+            return len(started)
+
+def test_depth_bounds_loads_ahead():
+    # The item in hand plus `depth` ahead of it, never one more
+    for depth in (1, 2, 3):
+        assert started_loads(depth) == 1 + depth
+
+def test_results_in_order():
+    assert [future.result() for _, future in prefetch(range(20), lambda x: x * x, depth=2)] == [x * x for x in range(20)]
+
+if __name__ == "__main__":
+    test_depth_bounds_loads_ahead()
+    test_results_in_order()
+    print("ok")
\ No newline at end of file
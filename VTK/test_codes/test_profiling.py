@@ -0,0 +1,24 @@
+import numpy as np
+from profiling import StageProfiler, current_rss_mb, profiling
+
+def run_model(n_bytes):
+    profiler = StageProfiler()
+    with profiling(profiler), profiler.stage("total"):
+        with profiler.stage("inner"):
+            block = np.ones(n_bytes // 8)
+            block.sum()
+            del block
+    return profiler.record()
+
+def test_peak_is_per_model():
+    if current_rss_mb() is None:
+        return
+    big = run_model(300 * 2 ** 20)
+    small = run_model(10 * 2 ** 20)
+    # The second model does not inherit the first one's peak, the process peak does
+    assert big["peak_rss_mb"] - small["peak_rss_mb"] > 200
+    assert small["process_peak_rss_mb"] >= big["peak_rss_mb"] - 1
+
+if __name__ == "__main__":
+    test_peak_is_per_model()
+    print("ok")
\ No newline at end of file
@@ -0,0 +1,18 @@
+import numpy as np
+from synthetic_vessels import tube_surface
+from section_slicing import cross_sections
+
+def straight_tube(radius=2.0, length=30.0):
+    return tube_surface(lambda t: np.stack([np.zeros_like(t), np.zeros_like(t), length * t], axis=1), radius, 61, 64)
+
+def test_unsorted_levels():
+    # Planes given out of order used to lose rings in the bisection of cut_triangles
+    tube = straight_tube()
+    sections = cross_sections(tube, levels=[0.5, 20.0, 10.0, 20.0])
+    assert np.allclose(sections["height"], [0.5, 10.0, 20.0])
+    assert np.array_equal(sections["level"], [0, 1, 2])
+    assert np.allclose(sections["centroid"][:, :2], 0, atol=1e-9)
+
+if __name__ == "__main__":
+    test_unsorted_levels()
+    print("ok")
\ No newline at end of file
@@ -0,0 +1,49 @@
+import numpy as np
+from bench_helpers import tube_points
+from manhattan_center import compute_slice_centerline
+from slice_tracking import follow_centers, viterbi_centers
+
+def test_viterbi_matches_greedy_on_a_clean_tube():
+    # eps wide enough for every slice of this sparse tube to be one ring
+    points = tube_points(200000)
+    greedy = compute_slice_centerline(points, eps=1.0, tracker="greedy")
+    viterbi = compute_slice_centerline(points, eps=1.0, tracker="viterbi")
+    assert np.array_equal(viterbi, greedy)
+
+def test_viterbi_matches_greedy_beside_larger_clusters():
+    # A vessel along z with a larger branch running in the slice plane 15 away (slices 20-24) and an
+    # unrelated structure ten times its size at the top (slices 50-59): greedy follows the vessel,
+    # the track must neither detour onto the branch nor stop short of the top
+    slices = []
+    for z in range(60):
+        centroids, sizes = [[0.1 * np.sin(z), 0, z]], [50]
+        if 20 <= z <= 24:
+            centroids.append([15.0, 0, z])
+            sizes.append(200)
+        if z >= 50:
+            centroids.append([40.0, 0, z])
+            sizes.append(500)
+        slices.append((np.array(centroids), np.array(sizes)))
+    greedy = np.array(list(follow_centers(slices)))
+    assert np.array_equal(np.array(list(viterbi_centers(slices))), greedy)
+
+def test_stray_cluster_in_a_gap_is_bridged():
+    # A vessel along z at x = 0, missing in slices 10-12 where only a stray cluster 30 off to the side is left
+    slices = []
+    for z in range(40):
+        if 10 <= z <= 12:
+            slices.append((np.array([[30.0, 0, z]]), np.array([50])))
+        else:
+            slices.append((np.array([[0.1 * np.sin(z), 0, z]]), np.array([50])))
+    greedy = np.array(list(follow_centers(slices)))
+    viterbi = np.array(list(viterbi_centers(slices)))
+    assert np.any(greedy[:, 0] == 30)
+    assert len(viterbi) == 37
+    assert np.all(np.abs(viterbi[:, 0]) < 1)
+    assert viterbi[0, 2] == 0 and viterbi[-1, 2] == 39
+
+if __name__ == "__main__":
+    test_viterbi_matches_greedy_on_a_clean_tube()
+    test_viterbi_matches_greedy_beside_larger_clusters()
+    test_stray_cluster_in_a_gap_is_bridged()
+    print("ok")
\ No newline at end of file